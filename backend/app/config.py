@@ -13,6 +13,7 @@ if _env_path.exists():
 
 class Settings(BaseSettings):
     anthropic_api_key: str = ""
+    anthropic_base_url: str = ""  # Override the API endpoint (e.g. tests/batch_api_stub.py)
     newsapi_key: str = ""
     fred_api_key: str = ""
     bls_api_key: str = ""
@@ -24,9 +25,82 @@ class Settings(BaseSettings):
         "https://www.jamesincognito.com",
         "https://jamesincognito.com",
     ]
+    # "all": API and scheduled pipeline (in whichever process holds the
+    # leader lease); "api": serve the API only, with the pipeline in a
+    # separate `python -m app.worker` process
+    app_role: str = "all"
+    # How often the pipeline leader renews its lease and picks up job
+    # requests and dirty scores from other processes
+    worker_poll_seconds: float = 5.0
+    # Leadership fails over this long after the leader stops renewing
+    leader_lease_seconds: int = 30
+    # Read-only SQLite connections serving GET routes (writes use one writer)
+    db_read_pool_size: int = 4
+    # How long a connection waits for another process's write lock before
+    # failing with "database is locked"
+    db_busy_timeout_ms: int = 10000
+    # Group commit: queued small writes wait at most this long, or until
+    # this many are queued, before being committed together
+    write_queue_max_delay_ms: float = 20.0
+    write_queue_max_batch: int = 200
+    # Polling interval for sources with no publishing history yet
     ingestion_interval_hours: int = 2
+    # Adaptive polling: each source is polled when about target_new_per_poll
+    # new articles are expected at its observed rate (smoothed over
+    # rate_window_hours), within these bounds. The scheduler looks for due
+    # sources every ingestion_min_interval_minutes.
+    ingestion_min_interval_minutes: int = 15
+    ingestion_max_interval_minutes: int = 12 * 60
+    ingestion_target_new_per_poll: float = 5.0
+    ingestion_rate_window_hours: float = 24.0
+    # Feeds fetched at once (overall and per host), and each feed's time limit
+    ingestion_concurrency: int = 8
+    ingestion_per_host_concurrency: int = 2
+    ingestion_source_timeout_seconds: float = 45.0
+    # Feed parsing processes, and parses allowed to queue for them before
+    # fetchers wait
+    feed_parse_workers: int = 2
+    feed_parse_queue_depth: int = 8
     analysis_interval_minutes: int = 15
+    # Analyze new articles as soon as they're ingested (the scheduled job
+    # becomes a catch-up sweep); ids wait up to linger_seconds to be batched
+    analysis_stream_enabled: bool = True
+    analysis_stream_linger_seconds: float = 2.0
+    analysis_stream_batch_size: int = 50
+    analysis_stream_max_queued: int = 1000
     aggregation_interval_hours: int = 6
+    # Concurrent Claude requests per analysis run
+    analysis_concurrency: int = 8
+    # Initial request budget; replaced by the API's rate-limit headers
+    analysis_requests_per_minute: int = 50
+    # Retries per article on 429 (rate limited) / 529 (overloaded)
+    analysis_max_retries: int = 5
+    # Work queue: claim lease, attempts before dead-lettering, retry backoff
+    analysis_lease_seconds: int = 600
+    analysis_max_attempts: int = 5
+    analysis_retry_base_seconds: int = 300
+    analysis_retry_max_seconds: int = 6 * 3600
+    # Headline-only articles sent together in one request (1 disables packing)
+    analysis_pack_size: int = 10
+    # Reuse of analysis results for duplicate stories (see services/result_cache.py)
+    analysis_cache_ttl_days: int = 30
+    analysis_cache_max_entries: int = 20000
+    # Local keyword/TF-IDF pre-filter; tune the threshold with
+    # GET /api/ingest/relevance-report before enabling
+    relevance_filter_enabled: bool = False
+    relevance_filter_threshold: float = 0.1
+    # The fitted IDF model is reused between claims for up to this long
+    relevance_refit_seconds: int = 3600
+    # Near-duplicate clustering at ingestion (Jaccard of title/summary tokens)
+    cluster_similarity_threshold: float = 0.75
+    cluster_window_days: int = 3
+    # How often backfill.py --batch polls a submitted Message Batch
+    analysis_batch_poll_seconds: float = 60.0
+    # Cross-check the incremental score accumulator against the full
+    # 30-day window query on every roll (slower; for diagnosing drift)
+    score_accumulator_verify: bool = False
+    # Coalesce score recomputation requests from write paths
+    score_refresh_debounce_seconds: float = 5.0
     port: int = 8000
 
     @property
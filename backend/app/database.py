@@ -1,5 +1,8 @@
+import asyncio
 import logging
 import shutil
+import sqlite3
+from contextlib import asynccontextmanager
 
 import aiosqlite
 import json
@@ -28,6 +31,14 @@ CREATE TABLE IF NOT EXISTS sources (
     config          TEXT,
     enabled         INTEGER NOT NULL DEFAULT 1,
     last_fetched_at TEXT,
+    -- Conditional polling: validators and body hash of the last stored fetch
+    http_etag          TEXT,
+    http_last_modified TEXT,
+    content_hash       TEXT,
+    -- Adaptive polling: observed new articles/hour and the resulting schedule
+    new_item_rate         REAL,
+    poll_interval_minutes REAL,
+    next_poll_at          TEXT,
     created_at      TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
@@ -42,6 +53,12 @@ CREATE TABLE IF NOT EXISTS articles (
     published_at    TEXT,
     ingested_at     TEXT NOT NULL DEFAULT (datetime('now')),
     analysis_status TEXT NOT NULL DEFAULT 'pending',
+    batch_id        TEXT,
+    cluster_id      INTEGER,
+    claimed_by      TEXT,
+    lease_until     TEXT,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TEXT,
     UNIQUE(external_id)
 );
 
@@ -60,7 +77,9 @@ CREATE TABLE IF NOT EXISTS signals (
     created_at      TEXT NOT NULL DEFAULT (datetime('now')),
     is_manual       INTEGER NOT NULL DEFAULT 0,
     signal_type     TEXT NOT NULL DEFAULT 'news',
-    data_point_id   INTEGER REFERENCES data_points(id)
+    data_point_id   INTEGER REFERENCES data_points(id),
+    title_key       TEXT,
+    quote_key       TEXT
 );
 
 CREATE TABLE IF NOT EXISTS daily_scores (
@@ -110,16 +129,158 @@ CREATE TABLE IF NOT EXISTS page_views (
     created_at      TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Message Batches submitted for analysis, tracked until their results
+-- are ingested (articles in a batch have analysis_status = 'batched')
+CREATE TABLE IF NOT EXISTS analysis_batches (
+    id              TEXT PRIMARY KEY,
+    status          TEXT NOT NULL DEFAULT 'in_progress',
+    article_count   INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    ended_at        TEXT
+);
+
+-- MinHash LSH band index over recent article titles/summaries
+-- (see app.services.clustering)
+CREATE TABLE IF NOT EXISTS article_lsh (
+    band_key        TEXT NOT NULL,
+    article_id      INTEGER NOT NULL REFERENCES articles(id),
+    PRIMARY KEY (band_key, article_id)
+) WITHOUT ROWID;
+
+-- Analysis results keyed by prompt version + normalized title/content,
+-- reused for duplicate copies of the same story
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key       TEXT PRIMARY KEY,
+    article_id      INTEGER,
+    result_json     TEXT NOT NULL,
+    created_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    last_used_at    TEXT NOT NULL DEFAULT (datetime('now')),
+    hit_count       INTEGER NOT NULL DEFAULT 0
+);
+
+-- Scheduler jobs as seen by other processes: next_run_at is published by
+-- the pipeline leader, requested_at set by the API to run a job now
+-- (see app.services.pipeline)
+CREATE TABLE IF NOT EXISTS pipeline_jobs (
+    job_id          TEXT PRIMARY KEY,
+    next_run_at     TEXT,
+    requested_at    TEXT,
+    updated_at      TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Named leases electing one process (e.g. the pipeline leader) among all
+-- that share this database (see app.services.leader)
+CREATE TABLE IF NOT EXISTS leader_leases (
+    name            TEXT PRIMARY KEY,
+    holder          TEXT NOT NULL,
+    lease_until     TEXT NOT NULL,
+    acquired_at     TEXT NOT NULL
+);
+
+-- Signal days whose daily_scores (that day through +30 days) are stale.
+-- Filled by the triggers below; drained by AggregationService.
+CREATE TABLE IF NOT EXISTS score_dirty_dates (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    thesis_id   TEXT NOT NULL,
+    signal_date TEXT NOT NULL,
+    marked_at   TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Running decayed sums per thesis, maintained by ScoreAccumulator.
+-- max_signal_id / dirty_watermark record what the state has already seen.
+CREATE TABLE IF NOT EXISTS score_accumulators (
+    thesis_id        TEXT PRIMARY KEY REFERENCES theses(id),
+    as_of_date       TEXT NOT NULL,
+    weighted_sum     REAL NOT NULL,
+    weight_total     REAL NOT NULL,
+    supporting_count INTEGER NOT NULL,
+    weakening_count  INTEGER NOT NULL,
+    max_signal_id    INTEGER NOT NULL,
+    dirty_watermark  INTEGER NOT NULL,
+    updated_at       TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Single-row counter bumped by the dashboard triggers (see
+-- DASHBOARD_TABLE_EVENTS); the dashboard cache is keyed on it
+CREATE TABLE IF NOT EXISTS dashboard_generation (
+    id          INTEGER PRIMARY KEY CHECK (id = 1),
+    generation  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO dashboard_generation (id, generation) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_signals_dirty_insert
+AFTER INSERT ON signals
+BEGIN
+    INSERT INTO score_dirty_dates (thesis_id, signal_date)
+    VALUES (NEW.thesis_id, substr(NEW.signal_date, 1, 10));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_signals_dirty_delete
+AFTER DELETE ON signals
+BEGIN
+    INSERT INTO score_dirty_dates (thesis_id, signal_date)
+    VALUES (OLD.thesis_id, substr(OLD.signal_date, 1, 10));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_signals_dirty_update
+AFTER UPDATE OF thesis_id, direction, strength, confidence, signal_date ON signals
+BEGIN
+    INSERT INTO score_dirty_dates (thesis_id, signal_date)
+    VALUES (OLD.thesis_id, substr(OLD.signal_date, 1, 10)),
+           (NEW.thesis_id, substr(NEW.signal_date, 1, 10));
+END;
+
 CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(analysis_status);
 CREATE INDEX IF NOT EXISTS idx_articles_external_id ON articles(external_id);
 CREATE INDEX IF NOT EXISTS idx_signals_thesis ON signals(thesis_id, signal_date);
 CREATE INDEX IF NOT EXISTS idx_signals_article ON signals(article_id);
+CREATE INDEX IF NOT EXISTS idx_signals_date ON signals(signal_date);
 CREATE INDEX IF NOT EXISTS idx_daily_scores_thesis_date ON daily_scores(thesis_id, score_date);
 CREATE INDEX IF NOT EXISTS idx_data_points_series_date ON data_points(series_id, date);
 CREATE INDEX IF NOT EXISTS idx_page_views_created ON page_views(created_at);
 CREATE INDEX IF NOT EXISTS idx_page_views_visitor ON page_views(visitor_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_used ON analysis_cache(last_used_at);
 """
 
+# Changes that alter the /api/dashboard payload. Each one bumps
+# dashboard_generation, so commits the dashboard doesn't show (leader
+# lease renewals, analysis claims, page views, poll schedules) leave its
+# cache valid. "UPDATE OF" events only fire when a listed column's value
+# actually changes.
+DASHBOARD_TABLE_EVENTS = {
+    "theses": ("INSERT", "DELETE", "UPDATE OF name, description"),
+    "articles": ("INSERT", "DELETE"),
+    "signals": ("INSERT", "DELETE", "UPDATE"),
+    "daily_scores": ("INSERT", "DELETE", "UPDATE"),
+    "score_dirty_dates": ("DELETE",),
+    "data_points": ("INSERT", "DELETE", "UPDATE"),
+    "data_series": ("INSERT", "DELETE", "UPDATE OF provider, enabled, last_fetched_at"),
+    "sources": ("DELETE", "UPDATE OF last_fetched_at"),
+    "pipeline_jobs": ("INSERT", "UPDATE OF next_run_at"),
+}
+
+
+def _dashboard_trigger_sql() -> str:
+    statements = []
+    for table, events in DASHBOARD_TABLE_EVENTS.items():
+        for event in events:
+            kind = event.split()[0]
+            condition = f"AFTER {event} ON {table}"
+            if event.startswith("UPDATE OF "):
+                columns = [c.strip() for c in event[len("UPDATE OF "):].split(",")]
+                condition += " WHEN " + " OR ".join(
+                    f"OLD.{c} IS NOT NEW.{c}" for c in columns
+                )
+            statements.append(
+                f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_dashboard_{kind.lower()}
+{condition}
+BEGIN
+    UPDATE dashboard_generation SET generation = generation + 1;
+END;"""
+            )
+    return "\n".join(statements)
+
+
 SEED_THESES = [
     {
         "id": "ai_job_displacement",
@@ -190,20 +351,113 @@ async def get_db() -> aiosqlite.Connection:
     _maybe_copy_seed_db()
     db = await aiosqlite.connect(str(db_path))
     db.row_factory = aiosqlite.Row
+    await db.execute(f"PRAGMA busy_timeout = {settings.db_busy_timeout_ms}")
     await db.execute("PRAGMA journal_mode=WAL")
     await db.execute("PRAGMA foreign_keys=ON")
     return db
 
 
+async def get_read_db() -> aiosqlite.Connection:
+    """Open a read-only connection (the writer must have created the file)."""
+    uri = settings.db_path.resolve().as_uri() + "?mode=ro"
+    db = await aiosqlite.connect(uri, uri=True)
+    db.row_factory = aiosqlite.Row
+    await db.execute(f"PRAGMA busy_timeout = {settings.db_busy_timeout_ms}")
+    await db.execute("PRAGMA query_only=ON")
+    return db
+
+
+class ReadPool:
+    """Fixed set of read-only connections for API reads.
+
+    aiosqlite serializes each connection's statements on its own thread, so
+    reads sharing the writer connection wait behind its commits. In WAL
+    mode these connections read concurrently with the writer and with each
+    other, each seeing the last committed state.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._connections: list[aiosqlite.Connection] = []
+        self._idle: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+
+    async def open(self):
+        for _ in range(self.size):
+            db = await get_read_db()
+            self._connections.append(db)
+            self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def acquire(self):
+        db = await self._idle.get()
+        try:
+            yield db
+        finally:
+            self._idle.put_nowait(db)
+
+    async def close(self):
+        for db in self._connections:
+            await db.close()
+        self._connections.clear()
+
+
+_BEGIN_ATTEMPTS = 5
+
+
+@asynccontextmanager
+async def immediate_transaction(db: aiosqlite.Connection):
+    """Hold SQLite's write lock (BEGIN IMMEDIATE) until the block commits.
+
+    Taking the write lock up front makes concurrent startups queue up
+    instead of interleaving their migrations. Each wait is bounded by the
+    connection's busy_timeout; if the lock is still taken, BEGIN is retried
+    a few times before giving up.
+    """
+    for attempt in range(1, _BEGIN_ATTEMPTS + 1):
+        try:
+            await db.execute("BEGIN IMMEDIATE")
+            break
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or attempt == _BEGIN_ATTEMPTS:
+                raise
+            logger.warning(f"Database busy, retrying BEGIN IMMEDIATE ({attempt}): {e}")
+            await asyncio.sleep(attempt)
+    try:
+        yield
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+
+
+async def _execute_script(db: aiosqlite.Connection, script: str):
+    """Run each statement of script in the current transaction.
+
+    executescript() would commit first, ending an immediate_transaction.
+    """
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            await db.execute(statement)
+            statement = ""
+
+
 async def init_database(db: aiosqlite.Connection):
-    await db.executescript(SCHEMA_SQL)
-    await db.commit()
+    """Create and migrate the schema in one write transaction."""
+    async with immediate_transaction(db):
+        await _create_schema(db)
+
+
+async def _create_schema(db: aiosqlite.Connection):
+    """Create and migrate the schema (idempotent; doesn't commit)."""
+    await _execute_script(db, SCHEMA_SQL)
+    await _execute_script(db, _dashboard_trigger_sql())
 
     # ── Migrations for existing databases ──
     # Add signal_type column (news vs data) if missing
     try:
         await db.execute("ALTER TABLE signals ADD COLUMN signal_type TEXT NOT NULL DEFAULT 'news'")
-        await db.commit()
         logger.info("Migration: added signal_type column to signals")
     except Exception:
         pass  # Column already exists
@@ -211,11 +465,89 @@ async def init_database(db: aiosqlite.Connection):
     # Add data_point_id column if missing
     try:
         await db.execute("ALTER TABLE signals ADD COLUMN data_point_id INTEGER REFERENCES data_points(id)")
-        await db.commit()
         logger.info("Migration: added data_point_id column to signals")
     except Exception:
         pass  # Column already exists
 
+    # Add write-time dedup key columns (see app.services.signal_keys)
+    for column in ("title_key", "quote_key"):
+        try:
+            await db.execute(f"ALTER TABLE signals ADD COLUMN {column} TEXT")
+            logger.info(f"Migration: added {column} column to signals")
+        except Exception:
+            pass  # Column already exists
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_signals_title_key ON signals(thesis_id, title_key)"
+    )
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_signals_quote_key ON signals(thesis_id, quote_key)"
+    )
+
+    # Add batch_id column (Message Batches analysis) if missing
+    try:
+        await db.execute("ALTER TABLE articles ADD COLUMN batch_id TEXT")
+        logger.info("Migration: added batch_id column to articles")
+    except Exception:
+        pass  # Column already exists
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_articles_batch ON articles(batch_id)"
+    )
+
+    # Add cluster_id column (near-duplicate clustering) if missing
+    try:
+        await db.execute("ALTER TABLE articles ADD COLUMN cluster_id INTEGER")
+        logger.info("Migration: added cluster_id column to articles")
+    except Exception:
+        pass  # Column already exists
+    await db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_articles_cluster ON articles(cluster_id)"
+    )
+
+    # Add analysis work-queue columns (leases, attempts, backoff) if missing
+    for column, definition in (
+        ("claimed_by", "TEXT"),
+        ("lease_until", "TEXT"),
+        ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+        ("next_attempt_at", "TEXT"),
+    ):
+        try:
+            await db.execute(f"ALTER TABLE articles ADD COLUMN {column} {definition}")
+            logger.info(f"Migration: added {column} column to articles")
+        except Exception:
+            pass  # Column already exists
+    # The old 'error' status (reset after an hour) is now a backed-off retry
+    await db.execute(
+        """UPDATE articles SET analysis_status = 'pending', attempts = 1,
+                               next_attempt_at = datetime('now')
+           WHERE analysis_status = 'error'"""
+    )
+
+    # Add conditional-GET columns to sources if missing
+    for column in ("http_etag", "http_last_modified", "content_hash"):
+        try:
+            await db.execute(f"ALTER TABLE sources ADD COLUMN {column} TEXT")
+            logger.info(f"Migration: added {column} column to sources")
+        except Exception:
+            pass  # Column already exists
+
+    # Add adaptive polling columns to sources if missing
+    for column, definition in (
+        ("new_item_rate", "REAL"),
+        ("poll_interval_minutes", "REAL"),
+        ("next_poll_at", "TEXT"),
+    ):
+        try:
+            await db.execute(f"ALTER TABLE sources ADD COLUMN {column} {definition}")
+            logger.info(f"Migration: added {column} column to sources")
+        except Exception:
+            pass  # Column already exists
+
+    from app.services.signal_keys import backfill_signal_keys
+
+    backfilled = await backfill_signal_keys(db)
+    if backfilled:
+        logger.info(f"Migration: computed dedup keys for {backfilled} signals")
+
 
 SEED_SOURCES = [
     # ── AI Job Displacement feeds ──
@@ -593,17 +925,17 @@ SEED_DATA_SERIES = [
 
 
 async def seed_theses(db: aiosqlite.Connection):
+    """Insert any missing default theses (doesn't commit)."""
     for thesis in SEED_THESES:
         await db.execute(
             """INSERT OR IGNORE INTO theses (id, name, description, keywords)
                VALUES (:id, :name, :description, :keywords)""",
             thesis,
         )
-    await db.commit()
 
 
 async def seed_data_series(db: aiosqlite.Connection):
-    """Seed default data series definitions if none exist yet."""
+    """Seed default data series definitions if none exist yet (doesn't commit)."""
     cursor = await db.execute("SELECT COUNT(*) as cnt FROM data_series")
     row = await cursor.fetchone()
     if row["cnt"] > 0:
@@ -616,11 +948,10 @@ async def seed_data_series(db: aiosqlite.Connection):
                VALUES (:id, :name, :description, :thesis_id, :provider, :series_config, :unit, :direction_logic)""",
             series,
         )
-    await db.commit()
 
 
 async def seed_sources(db: aiosqlite.Connection):
-    """Seed default RSS sources if none exist yet."""
+    """Seed default RSS sources if none exist yet (doesn't commit)."""
     cursor = await db.execute("SELECT COUNT(*) as cnt FROM sources")
     row = await cursor.fetchone()
     if row["cnt"] > 0:
@@ -632,9 +963,31 @@ async def seed_sources(db: aiosqlite.Connection):
                VALUES (:name, :source_type, :url, 1)""",
             source,
         )
-    await db.commit()
 
 
 async def load_seed_data(db: aiosqlite.Connection):
     """No-op — seed data is now loaded via seed.db copy in get_db()."""
     pass
+
+
+async def prepare_database(db: aiosqlite.Connection):
+    """Create/migrate the schema and seed defaults (API and worker startup).
+
+    Every uvicorn worker and app.worker process runs this at startup. It is
+    one immediate transaction, so they take turns: the first does the work
+    and the rest find it done. It runs before anything else writes on the
+    connection, so it commits without taking writer_lock.
+    """
+    logger.info("Initializing database...")
+    async with immediate_transaction(db):
+        await _create_schema(db)
+        await seed_theses(db)
+        await seed_sources(db)
+        await seed_data_series(db)
+    logger.info("Database initialized and seeded")
+
+    try:
+        await load_seed_data(db)
+        logger.info("Seed data loaded")
+    except Exception as e:
+        logger.error(f"Seed data loading failed (non-fatal): {e}")
@@ -0,0 +1,23 @@
+"""
+FastAPI dependencies for database access.
+
+GET routes take a connection from the read-only pool (app.state.read_pool),
+so they never queue behind commits. Routes that write use the single writer
+connection, app.state.db, which background jobs in this process share.
+"""
+import aiosqlite
+from fastapi import Request
+
+
+async def read_db(request: Request):
+    pool = getattr(request.app.state, "read_pool", None)
+    if pool is None:
+        # Startup failed before the pool opened; serve reads from the writer
+        yield request.app.state.db
+        return
+    async with pool.acquire() as db:
+        yield db
+
+
+def write_db(request: Request) -> aiosqlite.Connection:
+    return request.app.state.db
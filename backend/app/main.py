@@ -18,82 +18,45 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def _initial_ingestion(db):
-    """Run initial ingestion as a background task (doesn't block server start)."""
-    await asyncio.sleep(5)  # Let the server fully start first
-    try:
-        from app.services.ingestion import IngestionService
-
-        logger.info("Running initial article ingestion (background)...")
-        ingestion_svc = IngestionService(db)
-        stats = await ingestion_svc.run_full_ingestion()
-        logger.info(f"Initial ingestion complete: {stats}")
-    except Exception as e:
-        logger.error(f"Initial ingestion failed (will retry on schedule): {e}")
-
-    # Generate data signals from existing data points
-    try:
-        from app.services.data_signals import DataSignalGenerator
-
-        logger.info("Generating data signals (background)...")
-        generator = DataSignalGenerator(db)
-        ds_stats = await generator.generate_all()
-        logger.info(f"Data signal generation complete: {ds_stats}")
-    except Exception as e:
-        logger.error(f"Data signal generation failed (will retry on schedule): {e}")
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     db = None
-    scheduler = None
-    ingestion_task = None
+    read_pool = None
+    pipeline_stop = asyncio.Event()
+    pipeline_task = None
 
     try:
         # ── Database init ──
-        from app.database import (
-            get_db, init_database, seed_theses, seed_sources,
-            seed_data_series, load_seed_data,
-        )
+        from app.database import get_db, prepare_database
 
-        logger.info("Initializing database...")
         db = await get_db()
-        await init_database(db)
-        logger.info("Database initialized")
-
-        await seed_theses(db)
-        logger.info("Theses seeded")
-
-        await seed_sources(db)
-        logger.info("Sources seeded")
+        await prepare_database(db)
 
-        await seed_data_series(db)
-        logger.info("Data series seeded")
+        app.state.db = db
 
-        try:
-            await load_seed_data(db)
-            logger.info("Seed data loaded")
-        except Exception as e:
-            logger.error(f"Seed data loading failed (non-fatal): {e}")
+        # ── Read-only connections for GET routes ──
+        from app.database import ReadPool
 
-        app.state.db = db
+        read_pool = ReadPool(settings.db_read_pool_size)
+        await read_pool.open()
+        app.state.read_pool = read_pool
 
-        # ── Scheduler ──
-        try:
-            from app.services.scheduler import create_scheduler
+        # ── Scheduler + score refresh ──
+        # With several uvicorn workers, only the one holding the pipeline
+        # leader lease runs them (the others see app.state.scheduler = None)
+        app.state.scheduler = None
+        app.state.score_refresher = None
+        if settings.app_role == "api":
+            logger.info("API-only mode: pipeline jobs run in the worker (python -m app.worker)")
+        else:
+            from app.services.pipeline import PipelineHost
 
-            scheduler = create_scheduler(db)
-            scheduler.start()
-            app.state.scheduler = scheduler
-            logger.info("Scheduler started")
-        except Exception as e:
-            logger.error(f"Scheduler failed to start (non-fatal): {e}")
+            pipeline_task = asyncio.create_task(
+                PipelineHost(db, state=app.state).run(pipeline_stop)
+            )
 
         logger.info("Signal Dashboard backend started — ready for requests")
 
-        # Kick off initial ingestion without blocking the server
-        ingestion_task = asyncio.create_task(_initial_ingestion(db))
-
     except Exception as e:
         logger.error(f"CRITICAL startup error: {e}", exc_info=True)
         # Still yield so the health endpoint can respond (for debugging)
@@ -103,11 +66,15 @@ async def lifespan(app: FastAPI):
     yield
 
     # ── Shutdown ──
-    if ingestion_task is not None:
-        ingestion_task.cancel()
-    if scheduler is not None:
-        scheduler.shutdown(wait=False)
+    if pipeline_task is not None:
+        pipeline_stop.set()
+        await pipeline_task
+    if read_pool is not None:
+        await read_pool.close()
     if db is not None:
+        from app.services.write_queue import close_write_queue
+
+        await close_write_queue(db)
         await db.close()
     logger.info("Signal Dashboard backend stopped")
 
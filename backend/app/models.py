@@ -148,6 +148,9 @@ class DashboardResponse(BaseModel):
     total_data_points: int
     data_points_24h: int
     prediction_market_series: int = 0
+    # Score freshness: scores are only recomputed after writes, never on read
+    scores_computed_at: str | None = None
+    scores_refresh_pending: bool = False
 
 
 class SourceResponse(BaseModel):
@@ -159,6 +162,10 @@ class SourceResponse(BaseModel):
     enabled: bool
     last_fetched_at: str | None
     created_at: str
+    # Adaptive polling (new articles/hour and the schedule derived from it)
+    new_item_rate: float | None = None
+    poll_interval_minutes: float | None = None
+    next_poll_at: str | None = None
 
 
 class ArticleResponse(BaseModel):
@@ -178,3 +185,7 @@ class IngestionStatusResponse(BaseModel):
     articles_pending: int
     articles_analyzed: int
     sources_enabled: int
+    # Ingestion to first signal, over articles ingested in the last 24h
+    signal_latency_samples: int = 0
+    signal_latency_p50_seconds: float | None = None
+    signal_latency_p95_seconds: float | None = None
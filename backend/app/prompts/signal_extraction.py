@@ -1,3 +1,6 @@
+import hashlib
+
+
 def build_system_prompt(theses: list[dict]) -> str:
     thesis_descriptions = "\n\n".join(
         f"**{t['id']}** - {t['name']}:\n{t['description']}" for t in theses
@@ -41,12 +44,28 @@ Respond with valid JSON matching this exact schema:
 Include one entry per thesis (3 total). Return ONLY valid JSON, no markdown formatting."""
 
 
+def prompt_version(system_prompt: str) -> str:
+    """Short fingerprint of the exact system prompt.
+
+    Changes whenever thesis names/descriptions or the instructions change;
+    cached analysis results are keyed on it.
+    """
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:12]
+
+
+def is_headline_only(article: dict) -> bool:
+    """True if the content is missing, very short, or just the title repeated."""
+    content = (article.get("content") or "")[:4000]
+    title = article.get("title", "Unknown")
+    return not content or content.strip() == title.strip() or len(content) < 20
+
+
 def build_user_content(article: dict) -> str:
     content = (article.get("content") or "")[:4000]
     title = article.get("title", "Unknown")
 
     # If content is just the title repeated or very short, note that
-    if not content or content.strip() == title.strip() or len(content) < 20:
+    if is_headline_only(article):
         content_section = "(Headline only — no additional content available)"
     else:
         content_section = content
@@ -59,3 +78,20 @@ DATE: {article.get('published_at', 'Unknown')}
 
 CONTENT:
 {content_section}"""
+
+
+def build_packed_user_content(articles: list[dict]) -> str:
+    """Several headline-only articles in one request, answered per article."""
+    items = "\n\n".join(
+        f"""ARTICLE {i}:
+TITLE: {article.get('title', 'Unknown')}
+SOURCE: {article.get('url', 'Unknown')}
+DATE: {article.get('published_at', 'Unknown')}"""
+        for i, article in enumerate(articles, 1)
+    )
+
+    return f"""Analyze each of these {len(articles)} articles separately for investment signals. They are headlines only — no additional content available.
+
+{items}
+
+Respond with valid JSON of the form {{"results": [...]}} containing one object per article, in order. Each object has an "article" field with the article number, plus the "signals" and "summary" fields from the schema above. Return ONLY valid JSON, no markdown formatting."""
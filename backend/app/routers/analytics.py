@@ -10,9 +10,13 @@ import logging
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, Query, Request
+import aiosqlite
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import Response
 
+from app.dependencies import read_db, write_db
+from app.services.write_queue import get_write_queue
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -39,9 +43,12 @@ def _extract_domain(referer: str) -> str:
 
 
 @router.get("/pixel")
-async def tracking_pixel(request: Request, path: str = "/"):
+async def tracking_pixel(
+    request: Request,
+    path: str = "/",
+    db: aiosqlite.Connection = Depends(write_db),
+):
     """1x1 transparent GIF tracking pixel. Called by the frontend on every page load."""
-    db = request.app.state.db
     ip = request.client.host if request.client else "unknown"
     ua = request.headers.get("user-agent", "")
     referer = request.headers.get("referer", "")
@@ -49,12 +56,13 @@ async def tracking_pixel(request: Request, path: str = "/"):
 
     referer_domain = _extract_domain(referer)
 
-    await db.execute(
+    # Fire-and-forget: page views ride along in the next group commit
+    await get_write_queue(db).execute(
         """INSERT INTO page_views (visitor_id, ip_addr, path, user_agent, referer, referer_domain)
            VALUES (?, ?, ?, ?, ?, ?)""",
         (visitor_id, ip, path, ua[:500], referer[:500], referer_domain),
+        wait=False,
     )
-    await db.commit()
 
     # Return a 1x1 transparent GIF
     gif = (
@@ -72,16 +80,15 @@ async def tracking_pixel(request: Request, path: str = "/"):
 
 @router.get("/logs")
 async def analytics_logs(
-    request: Request,
     hours: int = Query(default=24, ge=1, le=8760),
     limit: int = Query(default=200, ge=1, le=1000),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
     """
     Raw page view log. Returns individual hits with visitor ID, IP,
     path, user agent, referrer domain, and timestamp.
     Requires admin API key.
     """
-    db = request.app.state.db
     cutoff = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
 
     cursor = await db.execute(
@@ -117,14 +124,13 @@ async def analytics_logs(
 
 @router.get("/digest")
 async def analytics_digest(
-    request: Request,
     hours: int = Query(default=1, ge=1, le=720),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
     """
     Get visitor analytics digest for the past N hours.
     Requires admin API key (enforced by middleware for GET on /analytics/digest).
     """
-    db = request.app.state.db
     cutoff = (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
 
     # Unique visitors in the window
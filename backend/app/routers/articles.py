@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Query, Request
+import aiosqlite
+from fastapi import APIRouter, Depends, Query
+
+from app.dependencies import read_db
 
 from app.models import ArticleResponse
 
@@ -7,12 +10,11 @@ router = APIRouter(prefix="/articles", tags=["articles"])
 
 @router.get("", response_model=list[ArticleResponse])
 async def list_articles(
-    request: Request,
     status: str | None = None,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
-    db = request.app.state.db
     conditions = []
     params: list = []
 
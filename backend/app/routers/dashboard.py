@@ -1,9 +1,11 @@
 import json
-import re
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Query, Request
+import aiosqlite
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
 
+from app.dependencies import read_db
 from app.models import (
     DashboardResponse,
     SignalResponse,
@@ -11,142 +13,159 @@ from app.models import (
     TrendPoint,
 )
 from app.services.aggregation import AggregationService
+from app.services.dashboard_cache import (
+    dashboard_cache,
+    dashboard_version_key,
+    etag_matches,
+)
+from app.services.pipeline import scheduled_runs
+
 
+# A candidate is kept only if none of its dedup keys were already kept:
+#   - same source_url (exact)
+#   - same title_key (same article from different RSS feeds)
+#   - same quote_key (near-identical quotes, e.g. "cash flow" vs "cash-flow")
+# `seen` is a newline-delimited list of the keys kept so far for the thesis.
+_UNSEEN = """(c.url = '' OR instr(w.seen, char(10) || 'u' || c.url || char(10)) = 0)
+         AND (c.tkey = '' OR instr(w.seen, char(10) || 't' || c.tkey || char(10)) = 0)
+         AND (c.qkey = '' OR instr(w.seen, char(10) || 'q' || c.qkey || char(10)) = 0)"""
 
-def _normalize_quote(quote: str) -> str:
-    """Normalize a quote for fuzzy dedup: lowercase, strip punctuation/hyphens, collapse whitespace."""
-    if not quote:
-        return ""
-    q = quote.lower()
-    q = re.sub(r"[^a-z0-9\s]", " ", q)  # strip non-alphanumeric
-    q = re.sub(r"\s+", " ", q).strip()
-    return q
-
-
-def _normalize_title(title: str) -> str:
-    """Normalize a title for dedup: strip trailing source attribution
-    (e.g. ' - Fortune', ' - AOL.com', ' | WSJ'), lowercase, strip punctuation."""
-    if not title:
-        return ""
-    # Strip trailing " - Source Name" or " | Source Name"
-    t = re.sub(r"\s*[\-–—|]\s*[A-Za-z][A-Za-z0-9 .,'&]+$", "", title)
-    t = t.lower()
-    t = re.sub(r"[^a-z0-9\s]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+# Top 10 distinct signals per thesis from the trailing 24 hours. Walks each
+# thesis's 50 strongest signals in order (strength DESC, confidence DESC), so
+# the strongest signal of every duplicate group is the one that survives.
+_TOP_SIGNALS_SQL = f"""
+WITH RECURSIVE
+candidates AS MATERIALIZED (
+    SELECT id, thesis_id, direction, strength, confidence,
+           evidence_quote, reasoning, source_title, source_url,
+           signal_date, is_manual, signal_type, created_at,
+           COALESCE(source_url, '') AS url,
+           COALESCE(title_key, '') AS tkey,
+           COALESCE(quote_key, '') AS qkey,
+           ROW_NUMBER() OVER (
+               PARTITION BY thesis_id
+               ORDER BY strength DESC, confidence DESC
+           ) AS rn
+    FROM signals
+    WHERE signal_date >= ?
+),
+walk(thesis_id, rn, id, kept_row, kept, seen) AS (
+    SELECT DISTINCT thesis_id, 0, NULL, 0, 0, char(10) FROM candidates
+    UNION ALL
+    SELECT c.thesis_id, c.rn, c.id,
+           {_UNSEEN},
+           w.kept + ({_UNSEEN}),
+           CASE WHEN {_UNSEEN}
+                THEN w.seen
+                     || CASE WHEN c.url <> '' THEN 'u' || c.url || char(10) ELSE '' END
+                     || CASE WHEN c.tkey <> '' THEN 't' || c.tkey || char(10) ELSE '' END
+                     || CASE WHEN c.qkey <> '' THEN 'q' || c.qkey || char(10) ELSE '' END
+                ELSE w.seen
+           END
+    FROM walk w
+    JOIN candidates c ON c.thesis_id = w.thesis_id AND c.rn = w.rn + 1
+    WHERE w.kept < 10 AND c.rn <= 50
+)
+SELECT c.id, c.thesis_id, c.direction, c.strength, c.confidence,
+       c.evidence_quote, c.reasoning, c.source_title, c.source_url,
+       c.signal_date, c.is_manual, c.signal_type, c.created_at
+FROM walk w
+JOIN candidates c ON c.id = w.id
+WHERE w.kept_row
+ORDER BY c.thesis_id, c.rn
+"""
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("", response_model=DashboardResponse)
-async def get_dashboard(request: Request, days: int = Query(default=270, ge=7, le=365)):
-    db = request.app.state.db
-    agg = AggregationService(db)
+async def get_dashboard(
+    request: Request,
+    days: int = Query(default=270, ge=7, le=365),
+    db: aiosqlite.Connection = Depends(read_db),
+):
+    """Serve the dashboard from the versioned cache, honouring If-None-Match."""
+    version = await dashboard_version_key(db)
+
+    cached = dashboard_cache.get(days, version)
+    if cached is not None:
+        body, etag = cached
+    else:
+        payload = await _build_dashboard(request, db, days)
+        body = payload.model_dump_json().encode()
+        etag = dashboard_cache.put(days, version, body)
+
+    # no-cache: browsers may store the body but must revalidate (cheap 304)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
-    # Recompute today's scores before returning
-    await agg.compute_daily_scores()
 
+async def _build_dashboard(
+    request: Request, db: aiosqlite.Connection, days: int
+) -> DashboardResponse:
+    agg = AggregationService(db)
+
+    # Pure read: scores are recomputed by ScoreRefresher after writes.
     cursor = await db.execute("SELECT id, name, description FROM theses ORDER BY id")
     theses = await cursor.fetchall()
 
+    # Everything below is fetched for all theses at once, so the number of
+    # queries stays constant as theses are added.
+    scores = await agg.get_all_current_and_previous()
+    trends = await agg.get_all_trend_data(days)
+
+    # signal_date is date-only ("2026-02-24"), so use date-only cutoffs
+    # to avoid string comparison mismatch with datetime cutoffs.
+    cutoff_24h = (datetime.utcnow() - timedelta(hours=24)).strftime("%Y-%m-%d")
+    cutoff_7d = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
+
+    sig_cursor = await db.execute(_TOP_SIGNALS_SQL, (cutoff_24h,))
+    signals_by_thesis: dict[str, list[SignalResponse]] = {}
+    for r in await sig_cursor.fetchall():
+        signals_by_thesis.setdefault(r["thesis_id"], []).append(
+            SignalResponse(
+                id=r["id"],
+                thesis_id=r["thesis_id"],
+                direction=r["direction"],
+                strength=r["strength"],
+                confidence=r["confidence"],
+                evidence_quote=r["evidence_quote"],
+                reasoning=r["reasoning"],
+                source_title=r["source_title"],
+                source_url=r["source_url"],
+                signal_date=r["signal_date"],
+                is_manual=bool(r["is_manual"]),
+                signal_type=r["signal_type"] or "news",
+                created_at=r["created_at"],
+            )
+        )
+
+    # Per-thesis signal counts split by type (news vs data), 7d and 24h
+    count_cursor = await db.execute(
+        """SELECT thesis_id,
+             SUM(CASE WHEN signal_type='news' THEN 1 ELSE 0 END) as news_7d,
+             SUM(CASE WHEN signal_type='data' THEN 1 ELSE 0 END) as data_7d,
+             SUM(CASE WHEN signal_type='news' AND signal_date >= :c24
+                      THEN 1 ELSE 0 END) as news_24h,
+             SUM(CASE WHEN signal_type='data' AND signal_date >= :c24
+                      THEN 1 ELSE 0 END) as data_24h
+           FROM signals WHERE signal_date >= :c7
+           GROUP BY thesis_id""",
+        {"c24": cutoff_24h, "c7": cutoff_7d},
+    )
+    counts = {r["thesis_id"]: dict(r) for r in await count_cursor.fetchall()}
+
     thesis_data = []
     for thesis in theses:
         tid = thesis["id"]
 
-        current = await agg.get_current_score(tid)
-        previous = await agg.get_previous_score(tid)
-        trend_data = await agg.get_trend_data(tid, days)
+        current, previous = scores.get(tid, (5.0, None))
+        trend_data = trends.get(tid, [])
         trend_dir = AggregationService.compute_trend_direction(trend_data)
 
-        # Top 10 strongest signals from the trailing 24 hours,
-        # deduplicated so each source_url / evidence_quote appears at most
-        # once per thesis. Fetch extra rows then dedup in Python.
-        # signal_date is date-only ("2026-02-24"), so use date-only cutoff
-        # to avoid string comparison mismatch with datetime cutoffs.
-        cutoff_24h = (datetime.utcnow() - timedelta(hours=24)).strftime("%Y-%m-%d")
-        sig_cursor = await db.execute(
-            """SELECT id, thesis_id, direction, strength, confidence,
-                      evidence_quote, reasoning, source_title, source_url,
-                      signal_date, is_manual, signal_type, created_at
-               FROM signals
-               WHERE thesis_id = ? AND signal_date >= ?
-               ORDER BY strength DESC, confidence DESC
-               LIMIT 50""",
-            (tid, cutoff_24h),
-        )
-        sig_rows = await sig_cursor.fetchall()
-
-        # Deduplicate: skip signals that share any of:
-        #   - same source_url (exact)
-        #   - same normalized source_title (catches same article from different RSS feeds)
-        #   - same normalized evidence_quote (catches near-identical quotes with
-        #     minor punctuation differences like "cash flow" vs "cash-flow")
-        # Keeps the strongest signal since rows are sorted by strength DESC.
-        seen_urls: set[str] = set()
-        seen_titles: set[str] = set()
-        seen_quotes: set[str] = set()
-        recent_signals: list[SignalResponse] = []
-        for r in sig_rows:
-            if len(recent_signals) >= 10:
-                break
-            url = r["source_url"] or ""
-            title = r["source_title"] or ""
-            quote = r["evidence_quote"] or ""
-            norm_title = _normalize_title(title)
-            norm_quote = _normalize_quote(quote)
-            # Skip if we've already seen this article (by URL or title)
-            # or this exact evidence (by normalized quote)
-            if url and url in seen_urls:
-                continue
-            if norm_title and norm_title in seen_titles:
-                continue
-            if norm_quote and norm_quote in seen_quotes:
-                continue
-            if url:
-                seen_urls.add(url)
-            if norm_title:
-                seen_titles.add(norm_title)
-            if norm_quote:
-                seen_quotes.add(norm_quote)
-            recent_signals.append(
-                SignalResponse(
-                    id=r["id"],
-                    thesis_id=r["thesis_id"],
-                    direction=r["direction"],
-                    strength=r["strength"],
-                    confidence=r["confidence"],
-                    evidence_quote=r["evidence_quote"],
-                    reasoning=r["reasoning"],
-                    source_title=r["source_title"],
-                    source_url=r["source_url"],
-                    signal_date=r["signal_date"],
-                    is_manual=bool(r["is_manual"]),
-                    signal_type=r["signal_type"] or "news",
-                    created_at=r["created_at"],
-                )
-            )
-
-        # Per-thesis signal counts split by type (news vs data).
-        # Use date-only cutoff to match signal_date format.
-        cutoff_7d = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
-        count_cursor = await db.execute(
-            """SELECT
-                 SUM(CASE WHEN signal_type='news'  THEN 1 ELSE 0 END) as news_7d,
-                 SUM(CASE WHEN signal_type='data'  THEN 1 ELSE 0 END) as data_7d
-               FROM signals WHERE thesis_id = ? AND signal_date >= ?""",
-            (tid, cutoff_7d),
-        )
-        count_row = await count_cursor.fetchone()
-
-        # 24h signal counts split by type
-        count_24h_cursor = await db.execute(
-            """SELECT
-                 SUM(CASE WHEN signal_type='news'  THEN 1 ELSE 0 END) as news_24h,
-                 SUM(CASE WHEN signal_type='data'  THEN 1 ELSE 0 END) as data_24h
-               FROM signals WHERE thesis_id = ? AND signal_date >= ?""",
-            (tid, cutoff_24h),
-        )
-        count_24h_row = await count_24h_cursor.fetchone()
+        count_row = counts.get(tid, {})
 
         thesis_data.append(
             ThesisDashboardData(
@@ -157,11 +176,11 @@ async def get_dashboard(request: Request, days: int = Query(default=270, ge=7, l
                 previous_score=previous,
                 score_trend=trend_dir,
                 trend_data=[TrendPoint(**p) for p in trend_data],
-                recent_signals=recent_signals,
-                news_signals_7d=count_row["news_7d"] or 0,
-                news_signals_24h=count_24h_row["news_24h"] or 0,
-                data_signals_7d=count_row["data_7d"] or 0,
-                data_signals_24h=count_24h_row["data_24h"] or 0,
+                recent_signals=signals_by_thesis.get(tid, []),
+                news_signals_7d=count_row.get("news_7d") or 0,
+                news_signals_24h=count_row.get("news_24h") or 0,
+                data_signals_7d=count_row.get("data_7d") or 0,
+                data_signals_24h=count_row.get("data_24h") or 0,
             )
         )
 
@@ -226,14 +245,31 @@ async def get_dashboard(request: Request, days: int = Query(default=270, ge=7, l
     )
     ds_row = await ds_cursor.fetchone()
 
+    # Score freshness: when daily_scores were last written, and whether a
+    # refresh is queued or signal changes are still waiting to be scored
+    fresh_cursor = await db.execute(
+        """SELECT (SELECT MAX(computed_at) FROM daily_scores) as computed_at,
+                  EXISTS(SELECT 1 FROM score_dirty_dates) as dirty"""
+    )
+    fresh_row = await fresh_cursor.fetchone()
+    refresher = getattr(request.app.state, "score_refresher", None)
+    scores_refresh_pending = bool(fresh_row["dirty"]) or bool(
+        refresher is not None and refresher.pending
+    )
+
     # Next scheduled ingestion times from APScheduler
     # APScheduler returns tz-aware datetimes; convert to UTC for consistency
     next_ingestion_str = None
     next_data_fetch_str = None
     try:
         from datetime import timezone
-        scheduler = request.app.state.scheduler
-        if scheduler:
+        scheduler = getattr(request.app.state, "scheduler", None)
+        if scheduler is None:
+            # API-only mode: the worker publishes its schedule to the database
+            next_runs = await scheduled_runs(db)
+            next_ingestion_str = next_runs.get("ingestion")
+            next_data_fetch_str = next_runs.get("data_series")
+        elif scheduler:
             ing_job = scheduler.get_job("ingestion")
             if ing_job and ing_job.next_run_time:
                 utc_time = ing_job.next_run_time.astimezone(timezone.utc)
@@ -260,4 +296,6 @@ async def get_dashboard(request: Request, days: int = Query(default=270, ge=7, l
         total_data_points=dp_total,
         data_points_24h=dp_24h,
         prediction_market_series=pm_count,
+        scores_computed_at=fresh_row["computed_at"],
+        scores_refresh_pending=scores_refresh_pending,
     )
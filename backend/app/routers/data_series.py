@@ -1,6 +1,11 @@
 import json
 
-from fastapi import APIRouter, Request, Query
+import aiosqlite
+from fastapi import APIRouter, Depends, Request, Query
+from fastapi.responses import JSONResponse
+
+from app.dependencies import read_db, write_db
+from app.services.pipeline import request_jobs, runs_pipeline
 
 router = APIRouter(prefix="/data-series", tags=["data-series"])
 
@@ -37,9 +42,11 @@ def _build_source_url(provider: str, series_config: str) -> str | None:
 
 
 @router.get("")
-async def list_data_series(request: Request, thesis_id: str | None = None):
+async def list_data_series(
+    thesis_id: str | None = None,
+    db: aiosqlite.Connection = Depends(read_db),
+):
     """List all data series, optionally filtered by thesis."""
-    db = request.app.state.db
 
     # Join with data_points to get the most recent observation date per series
     base_query = """
@@ -65,12 +72,11 @@ async def list_data_series(request: Request, thesis_id: str | None = None):
 
 @router.get("/{series_id}/points")
 async def get_data_points(
-    request: Request,
     series_id: str,
     days: int = Query(default=365, ge=30, le=1825),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
     """Get data points for a specific series."""
-    db = request.app.state.db
 
     from datetime import datetime, timedelta
     start_date = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
@@ -87,12 +93,11 @@ async def get_data_points(
 
 @router.get("/by-thesis/{thesis_id}")
 async def get_series_with_data(
-    request: Request,
     thesis_id: str,
     days: int = Query(default=365, ge=30, le=1825),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
     """Get all data series for a thesis, each with their recent data points."""
-    db = request.app.state.db
 
     from datetime import datetime, timedelta
     start_date = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
@@ -164,9 +169,14 @@ async def get_series_with_data(
 
 
 @router.post("/fetch")
-async def trigger_data_fetch(request: Request):
+async def trigger_data_fetch(
+    request: Request,
+    db: aiosqlite.Connection = Depends(write_db),
+):
     """Manually trigger data series fetching."""
-    db = request.app.state.db
+    if not runs_pipeline(request.app):
+        await request_jobs(db, ["data_series"])
+        return JSONResponse(status_code=202, content={"queued": ["data_series"]})
     from app.services.data_series import DataSeriesFetcher
     fetcher = DataSeriesFetcher(db)
     stats = await fetcher.fetch_all()
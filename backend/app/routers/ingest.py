@@ -1,8 +1,15 @@
 import logging
 
-from fastapi import APIRouter, Request
+import aiosqlite
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse
 
+from app.dependencies import read_db, write_db
 from app.models import IngestionStatusResponse
+from app.services.analysis_stream import signal_latency
+from app.services.ingestion import reset_poll_schedule
+from app.services.pipeline import request_jobs, runs_pipeline
+from app.services.score_refresh import request_score_refresh
 
 logger = logging.getLogger(__name__)
 
@@ -10,9 +17,17 @@ router = APIRouter(prefix="/ingest", tags=["ingestion"])
 
 
 @router.post("/run")
-async def trigger_ingestion(request: Request):
+async def trigger_ingestion(
+    request: Request,
+    db: aiosqlite.Connection = Depends(write_db),
+):
     """Trigger a manual ingestion + analysis cycle."""
-    db = request.app.state.db
+    if not runs_pipeline(request.app):
+        jobs = ["ingestion", "analysis"]
+        # The scheduled job only polls due sources; a manual run polls all
+        await reset_poll_schedule(db)
+        await request_jobs(db, jobs)
+        return JSONResponse(status_code=202, content={"queued": jobs})
 
     # Import here to avoid circular imports
     from app.services.ingestion import IngestionService
@@ -23,6 +38,7 @@ async def trigger_ingestion(request: Request):
 
     analysis_svc = AnalysisService(db)
     analysis_stats = await analysis_svc.analyze_pending(batch_size=50)
+    request_score_refresh(request.app)
 
     return {
         "ingestion": stats,
@@ -31,9 +47,17 @@ async def trigger_ingestion(request: Request):
 
 
 @router.post("/refresh-all")
-async def refresh_all(request: Request):
+async def refresh_all(
+    request: Request,
+    db: aiosqlite.Connection = Depends(write_db),
+):
     """Refresh everything: RSS feeds + analysis + data series."""
-    db = request.app.state.db
+    if not runs_pipeline(request.app):
+        jobs = ["ingestion", "analysis", "data_series"]
+        # The scheduled job only polls due sources; a manual run polls all
+        await reset_poll_schedule(db)
+        await request_jobs(db, jobs)
+        return JSONResponse(status_code=202, content={"queued": jobs})
     result: dict = {}
 
     # 1) RSS ingestion + analysis
@@ -74,12 +98,12 @@ async def refresh_all(request: Request):
         logger.error(f"Data signal generation failed: {e}")
         result["data_signals_error"] = str(e)
 
+    request_score_refresh(request.app)
     return result
 
 
 @router.get("/status", response_model=IngestionStatusResponse)
-async def get_ingestion_status(request: Request):
-    db = request.app.state.db
+async def get_ingestion_status(db: aiosqlite.Connection = Depends(read_db)):
 
     # Total articles
     total = (await (await db.execute("SELECT COUNT(*) as cnt FROM articles")).fetchone())["cnt"]
@@ -97,6 +121,7 @@ async def get_ingestion_status(request: Request):
         "SELECT last_fetched_at FROM sources WHERE last_fetched_at IS NOT NULL ORDER BY last_fetched_at DESC LIMIT 1"
     )
     last_row = await last_cursor.fetchone()
+    latency = await signal_latency(db)
 
     return IngestionStatusResponse(
         last_run=last_row["last_fetched_at"] if last_row else None,
@@ -104,4 +129,20 @@ async def get_ingestion_status(request: Request):
         articles_pending=pending,
         articles_analyzed=analyzed,
         sources_enabled=sources_enabled,
+        signal_latency_samples=latency["samples"],
+        signal_latency_p50_seconds=latency["p50_seconds"],
+        signal_latency_p95_seconds=latency["p95_seconds"],
     )
+
+
+@router.get("/relevance-report")
+async def get_relevance_report(
+    thresholds: list[float] = Query(default=[0.05, 0.1, 0.2, 0.3, 0.5]),
+    db: aiosqlite.Connection = Depends(read_db),
+):
+    """Replay the local relevance filter against Claude's past labels (admin)."""
+    from app.services.relevance import RelevanceFilter
+
+    relevance = RelevanceFilter(db)
+    await relevance.prepare()
+    return await relevance.report(thresholds)
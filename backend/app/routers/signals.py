@@ -1,23 +1,28 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Query, Request, HTTPException
+import aiosqlite
+from fastapi import APIRouter, Depends, Query, Request, HTTPException
 
+from app.dependencies import read_db, write_db
 from app.models import ManualSignalCreate, SignalResponse
+from app.services.dashboard_cache import bump_generation
+from app.services.score_refresh import request_score_refresh
+from app.services.signal_keys import quote_key, title_key
+from app.services.write_queue import get_write_queue
 
 router = APIRouter(prefix="/signals", tags=["signals"])
 
 
 @router.get("", response_model=list[SignalResponse])
 async def list_signals(
-    request: Request,
     thesis_id: str | None = None,
     direction: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    db: aiosqlite.Connection = Depends(read_db),
 ):
-    db = request.app.state.db
     conditions = []
     params: list = []
 
@@ -66,8 +71,11 @@ async def list_signals(
 
 
 @router.post("/manual", response_model=SignalResponse, status_code=201)
-async def create_manual_signal(request: Request, body: ManualSignalCreate):
-    db = request.app.state.db
+async def create_manual_signal(
+    request: Request,
+    body: ManualSignalCreate,
+    db: aiosqlite.Connection = Depends(write_db),
+):
 
     # Validate thesis exists
     cursor = await db.execute("SELECT id FROM theses WHERE id = ?", (body.thesis_id,))
@@ -76,12 +84,13 @@ async def create_manual_signal(request: Request, body: ManualSignalCreate):
 
     signal_date = body.signal_date or datetime.utcnow().strftime("%Y-%m-%d")
 
-    cursor = await db.execute(
+    # Returns once the insert is committed (durable)
+    written = await get_write_queue(db).execute(
         """INSERT INTO signals
                (article_id, thesis_id, direction, strength, confidence,
                 evidence_quote, reasoning, source_title, source_url,
-                signal_date, is_manual)
-           VALUES (NULL, ?, ?, ?, 1.0, ?, ?, ?, ?, ?, 1)""",
+                signal_date, is_manual, title_key, quote_key)
+           VALUES (NULL, ?, ?, ?, 1.0, ?, ?, ?, ?, ?, 1, ?, ?)""",
         (
             body.thesis_id,
             body.direction,
@@ -91,10 +100,13 @@ async def create_manual_signal(request: Request, body: ManualSignalCreate):
             body.source_title,
             body.source_url,
             signal_date,
+            title_key(body.source_title),
+            quote_key(body.evidence_quote),
         ),
     )
-    await db.commit()
-    signal_id = cursor.lastrowid
+    signal_id = written.lastrowid
+    bump_generation()
+    request_score_refresh(request.app)
 
     row = await (
         await db.execute(
@@ -123,9 +135,15 @@ async def create_manual_signal(request: Request, body: ManualSignalCreate):
 
 
 @router.delete("/{signal_id}", status_code=204)
-async def delete_signal(request: Request, signal_id: int):
-    db = request.app.state.db
-    cursor = await db.execute("DELETE FROM signals WHERE id = ?", (signal_id,))
-    await db.commit()
-    if cursor.rowcount == 0:
+async def delete_signal(
+    request: Request,
+    signal_id: int,
+    db: aiosqlite.Connection = Depends(write_db),
+):
+    written = await get_write_queue(db).execute(
+        "DELETE FROM signals WHERE id = ?", (signal_id,)
+    )
+    if written.rowcount == 0:
         raise HTTPException(status_code=404, detail="Signal not found")
+    bump_generation()
+    request_score_refresh(request.app)
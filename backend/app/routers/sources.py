@@ -1,16 +1,20 @@
-from fastapi import APIRouter, Request, HTTPException
+import aiosqlite
+from fastapi import APIRouter, Depends, HTTPException
 
+from app.dependencies import read_db, write_db
 from app.models import SourceCreate, SourceUpdate, SourceResponse
+from app.services.dashboard_cache import bump_generation
+from app.services.write_queue import writer_lock
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
 
 @router.get("", response_model=list[SourceResponse])
-async def list_sources(request: Request):
-    db = request.app.state.db
+async def list_sources(db: aiosqlite.Connection = Depends(read_db)):
     cursor = await db.execute(
         """SELECT id, name, source_type, url, config, enabled,
-                  last_fetched_at, created_at
+                  last_fetched_at, created_at,
+                  new_item_rate, poll_interval_minutes, next_poll_at
            FROM sources ORDER BY created_at DESC"""
     )
     rows = await cursor.fetchall()
@@ -24,26 +28,34 @@ async def list_sources(request: Request):
             enabled=bool(r["enabled"]),
             last_fetched_at=r["last_fetched_at"],
             created_at=r["created_at"],
+            new_item_rate=r["new_item_rate"],
+            poll_interval_minutes=r["poll_interval_minutes"],
+            next_poll_at=r["next_poll_at"],
         )
         for r in rows
     ]
 
 
 @router.post("", response_model=SourceResponse, status_code=201)
-async def create_source(request: Request, body: SourceCreate):
-    db = request.app.state.db
-    cursor = await db.execute(
-        """INSERT INTO sources (name, source_type, url, config, enabled)
-           VALUES (?, ?, ?, ?, ?)""",
-        (body.name, body.source_type, body.url, body.config, int(body.enabled)),
-    )
-    await db.commit()
+async def create_source(
+    body: SourceCreate,
+    db: aiosqlite.Connection = Depends(write_db),
+):
+    async with writer_lock(db):
+        cursor = await db.execute(
+            """INSERT INTO sources (name, source_type, url, config, enabled)
+               VALUES (?, ?, ?, ?, ?)""",
+            (body.name, body.source_type, body.url, body.config, int(body.enabled)),
+        )
+        await db.commit()
+    bump_generation()
     source_id = cursor.lastrowid
 
     row = await (
         await db.execute(
             """SELECT id, name, source_type, url, config, enabled,
-                      last_fetched_at, created_at
+                      last_fetched_at, created_at,
+                  new_item_rate, poll_interval_minutes, next_poll_at
                FROM sources WHERE id = ?""",
             (source_id,),
         )
@@ -58,12 +70,18 @@ async def create_source(request: Request, body: SourceCreate):
         enabled=bool(row["enabled"]),
         last_fetched_at=row["last_fetched_at"],
         created_at=row["created_at"],
+        new_item_rate=row["new_item_rate"],
+        poll_interval_minutes=row["poll_interval_minutes"],
+        next_poll_at=row["next_poll_at"],
     )
 
 
 @router.put("/{source_id}", response_model=SourceResponse)
-async def update_source(request: Request, source_id: int, body: SourceUpdate):
-    db = request.app.state.db
+async def update_source(
+    source_id: int,
+    body: SourceUpdate,
+    db: aiosqlite.Connection = Depends(write_db),
+):
 
     existing = await (
         await db.execute("SELECT id FROM sources WHERE id = ?", (source_id,))
@@ -79,6 +97,9 @@ async def update_source(request: Request, source_id: int, body: SourceUpdate):
     if body.url is not None:
         updates.append("url = ?")
         params.append(body.url)
+        # Validators and polling history belong to the old URL
+        updates.append("http_etag = NULL, http_last_modified = NULL, content_hash = NULL")
+        updates.append("new_item_rate = NULL, poll_interval_minutes = NULL, next_poll_at = NULL")
     if body.config is not None:
         updates.append("config = ?")
         params.append(body.config)
@@ -88,15 +109,18 @@ async def update_source(request: Request, source_id: int, body: SourceUpdate):
 
     if updates:
         params.append(source_id)
-        await db.execute(
-            f"UPDATE sources SET {', '.join(updates)} WHERE id = ?", params
-        )
-        await db.commit()
+        async with writer_lock(db):
+            await db.execute(
+                f"UPDATE sources SET {', '.join(updates)} WHERE id = ?", params
+            )
+            await db.commit()
+        bump_generation()
 
     row = await (
         await db.execute(
             """SELECT id, name, source_type, url, config, enabled,
-                      last_fetched_at, created_at
+                      last_fetched_at, created_at,
+                  new_item_rate, poll_interval_minutes, next_poll_at
                FROM sources WHERE id = ?""",
             (source_id,),
         )
@@ -111,13 +135,20 @@ async def update_source(request: Request, source_id: int, body: SourceUpdate):
         enabled=bool(row["enabled"]),
         last_fetched_at=row["last_fetched_at"],
         created_at=row["created_at"],
+        new_item_rate=row["new_item_rate"],
+        poll_interval_minutes=row["poll_interval_minutes"],
+        next_poll_at=row["next_poll_at"],
     )
 
 
 @router.delete("/{source_id}", status_code=204)
-async def delete_source(request: Request, source_id: int):
-    db = request.app.state.db
-    cursor = await db.execute("DELETE FROM sources WHERE id = ?", (source_id,))
-    await db.commit()
+async def delete_source(
+    source_id: int,
+    db: aiosqlite.Connection = Depends(write_db),
+):
+    async with writer_lock(db):
+        cursor = await db.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+        await db.commit()
+    bump_generation()
     if cursor.rowcount == 0:
         raise HTTPException(status_code=404, detail="Source not found")
@@ -2,44 +2,138 @@ import math
 from datetime import datetime, timedelta
 
 import aiosqlite
+import numpy as np
+
+from app.config import settings
+from app.services.dashboard_cache import bump_generation
+from app.services.write_queue import writer_lock
+
+# Scores use a trailing 30-day window with exp(-0.05 · days_ago) decay
+WINDOW_DAYS = 30
+DECAY_RATE = 0.05
+
+_UPSERT_DAILY_SCORE_SQL = """INSERT INTO daily_scores
+       (thesis_id, score_date, composite_score,
+        signal_count, supporting_count, weakening_count)
+   VALUES (?, ?, ?, ?, ?, ?)
+   ON CONFLICT(thesis_id, score_date) DO UPDATE SET
+       composite_score = excluded.composite_score,
+       signal_count = excluded.signal_count,
+       supporting_count = excluded.supporting_count,
+       weakening_count = excluded.weakening_count,
+       computed_at = datetime('now')"""
+
+
+def _unrounded_composite(weighted_sum: float, weight_total: float) -> float:
+    raw_score = weighted_sum / weight_total if weight_total > 0 else 0.0
+    # Map [-10, +10] to [1, 10]: -10→1, 0→5.5, +10→10
+    return 5.5 + (raw_score * 4.5 / 10.0)
+
+
+def composite_from_sums(weighted_sum: float, weight_total: float) -> float:
+    """Turn decayed signal sums into the [1, 10] gauge score."""
+    composite = _unrounded_composite(weighted_sum, weight_total)
+    return max(1.0, min(10.0, round(composite, 2)))
+
+
+def is_rounding_tie(weighted_sum: float, weight_total: float) -> bool:
+    """True when the composite for these sums sits on a .xx5 boundary.
+
+    Rounding to 2 decimals is the only step sensitive to floating-point
+    summation order, so callers that sum in a different order than
+    ``_score_signals`` fall back to the scalar formula for these values.
+    """
+    cents = _unrounded_composite(weighted_sum, weight_total) * 100.0
+    return abs(cents - math.floor(cents) - 0.5) < 1e-6
+
+
+def _merge_dirty_ranges(
+    marks: list[tuple[str, str]], today: str
+) -> list[tuple[str, str, str]]:
+    """Merge (thesis_id, signal_date) marks into (thesis_id, start, end) ranges.
+
+    Each mark invalidates [signal_date, signal_date + 30 days]; overlapping
+    or adjacent spans are coalesced and everything is clipped to today.
+    """
+    spans: list[tuple[str, datetime, datetime]] = []
+    by_thesis: dict[str, list[datetime]] = {}
+    for thesis_id, signal_date in marks:
+        try:
+            day = datetime.strptime(signal_date[:10], "%Y-%m-%d")
+        except (TypeError, ValueError):
+            continue
+        by_thesis.setdefault(thesis_id, []).append(day)
+
+    last_day = datetime.strptime(today, "%Y-%m-%d")
+    for thesis_id, days in by_thesis.items():
+        days.sort()
+        span_start = span_end = None
+        for day in days:
+            if day > last_day:
+                break
+            day_end = min(day + timedelta(days=WINDOW_DAYS), last_day)
+            if span_end is not None and day <= span_end + timedelta(days=1):
+                span_end = max(span_end, day_end)
+                continue
+            if span_start is not None:
+                spans.append((thesis_id, span_start, span_end))
+            span_start, span_end = day, day_end
+        if span_start is not None:
+            spans.append((thesis_id, span_start, span_end))
+
+    return [
+        (tid, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+        for tid, start, end in spans
+    ]
 
 
 class AggregationService:
     def __init__(self, db: aiosqlite.Connection):
         self.db = db
 
-    async def compute_daily_scores(self):
-        """Recompute composite scores for all theses for today."""
+    async def compute_daily_scores(self, verify: bool | None = None):
+        """Recompute composite scores for all theses for today.
+
+        Scores come from each thesis's persisted ScoreAccumulator state, so
+        only signals added since the last run (or entering/leaving the
+        window) are read. verify=True cross-checks every thesis against the
+        full window query; it defaults to settings.score_accumulator_verify.
+        """
+        from app.services.score_accumulator import ScoreAccumulator
+
+        if verify is None:
+            verify = settings.score_accumulator_verify
+
         cursor = await self.db.execute("SELECT id FROM theses")
         theses = await cursor.fetchall()
         today = datetime.utcnow().strftime("%Y-%m-%d")
+        accumulator = ScoreAccumulator(self.db)
 
-        for thesis in theses:
-            result = await self._compute_score(thesis["id"], today)
-            await self.db.execute(
-                """INSERT INTO daily_scores
-                       (thesis_id, score_date, composite_score,
-                        signal_count, supporting_count, weakening_count)
-                   VALUES (?, ?, ?, ?, ?, ?)
-                   ON CONFLICT(thesis_id, score_date) DO UPDATE SET
-                       composite_score = excluded.composite_score,
-                       signal_count = excluded.signal_count,
-                       supporting_count = excluded.supporting_count,
-                       weakening_count = excluded.weakening_count,
-                       computed_at = datetime('now')""",
-                (
-                    thesis["id"],
-                    today,
-                    result["composite_score"],
-                    result["signal_count"],
-                    result["supporting_count"],
-                    result["weakening_count"],
-                ),
-            )
-        await self.db.commit()
+        # roll_forward saves accumulator state as it goes
+        async with writer_lock(self.db):
+            for thesis in theses:
+                result = await accumulator.roll_forward(thesis["id"], today, verify)
+                await self.db.execute(
+                    _UPSERT_DAILY_SCORE_SQL,
+                    (
+                        thesis["id"],
+                        today,
+                        result["composite_score"],
+                        result["signal_count"],
+                        result["supporting_count"],
+                        result["weakening_count"],
+                    ),
+                )
+            await self.db.commit()
+        bump_generation()
 
     async def backfill_daily_scores(self):
-        """Compute daily_scores for ALL historical dates that have signals."""
+        """Compute daily_scores for ALL historical dates that have signals.
+
+        Uses the vectorized history engine: each thesis's signals are loaded
+        once and every day is scored in a single pass, then all rows are
+        written back with one bulk upsert.
+        """
         cursor = await self.db.execute("SELECT id FROM theses")
         theses = await cursor.fetchall()
 
@@ -51,40 +145,113 @@ class AggregationService:
         if not row or not row["mn"]:
             return
 
-        start = datetime.strptime(row["mn"][:10], "%Y-%m-%d")
-        end = datetime.utcnow()
-        total_days = (end - start).days + 1
+        start_date = row["mn"][:10]
+        end_date = datetime.utcnow().strftime("%Y-%m-%d")
+
+        # A full rescan supersedes any pending dirty-range marks
+        cur = await self.db.execute(
+            "SELECT MAX(id) as max_id FROM score_dirty_dates"
+        )
+        dirty_max_id = (await cur.fetchone())["max_id"]
 
+        rows: list[tuple] = []
         for thesis in theses:
-            tid = thesis["id"]
-            computed = 0
-            d = start
-            while d <= end:
-                date_str = d.strftime("%Y-%m-%d")
-                result = await self._compute_score(tid, date_str)
+            history = await self._compute_score_history(
+                thesis["id"], start_date, end_date
+            )
+            rows.extend(
+                (
+                    thesis["id"],
+                    score_date,
+                    result["composite_score"],
+                    result["signal_count"],
+                    result["supporting_count"],
+                    result["weakening_count"],
+                )
+                for score_date, result in history
+            )
+
+        async with writer_lock(self.db):
+            await self.db.executemany(_UPSERT_DAILY_SCORE_SQL, rows)
+            if dirty_max_id is not None:
                 await self.db.execute(
-                    """INSERT INTO daily_scores
-                           (thesis_id, score_date, composite_score,
-                            signal_count, supporting_count, weakening_count)
-                       VALUES (?, ?, ?, ?, ?, ?)
-                       ON CONFLICT(thesis_id, score_date) DO UPDATE SET
-                           composite_score = excluded.composite_score,
-                           signal_count = excluded.signal_count,
-                           supporting_count = excluded.supporting_count,
-                           weakening_count = excluded.weakening_count,
-                           computed_at = datetime('now')""",
-                    (
-                        tid,
-                        date_str,
-                        result["composite_score"],
-                        result["signal_count"],
-                        result["supporting_count"],
-                        result["weakening_count"],
-                    ),
+                    "DELETE FROM score_dirty_dates WHERE id <= ?", (dirty_max_id,)
                 )
-                computed += 1
-                d += timedelta(days=1)
+                # Accumulators rely on those marks to notice edits; rebuild them
+                await self.db.execute("DELETE FROM score_accumulators")
             await self.db.commit()
+        bump_generation()
+
+    async def recompute_dirty_scores(self) -> dict:
+        """Recompute only the daily_scores invalidated by signal changes.
+
+        Triggers on `signals` record the signal_date of every insert, update
+        and delete in score_dirty_dates. A signal dated D affects scores for
+        D through D+30, so the marks are merged into per-thesis date ranges
+        (clipped to today) and each range is rescored with the history engine.
+        """
+        cur = await self.db.execute(
+            "SELECT MAX(id) as max_id FROM score_dirty_dates"
+        )
+        row = await cur.fetchone()
+        max_id = row["max_id"] if row else None
+        if max_id is None:
+            return {"theses": 0, "ranges": 0, "days": 0}
+
+        cur = await self.db.execute(
+            """SELECT DISTINCT d.thesis_id, d.signal_date
+               FROM score_dirty_dates d
+               JOIN theses t ON t.id = d.thesis_id
+               WHERE d.id <= ?
+               ORDER BY d.thesis_id, d.signal_date""",
+            (max_id,),
+        )
+        marks = await cur.fetchall()
+
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        ranges = _merge_dirty_ranges(
+            [(m["thesis_id"], m["signal_date"]) for m in marks], today
+        )
+
+        rows: list[tuple] = []
+        for thesis_id, start_date, end_date in ranges:
+            history = await self._compute_score_history(
+                thesis_id, start_date, end_date
+            )
+            rows.extend(
+                (
+                    thesis_id,
+                    score_date,
+                    result["composite_score"],
+                    result["signal_count"],
+                    result["supporting_count"],
+                    result["weakening_count"],
+                )
+                for score_date, result in history
+            )
+
+        async with writer_lock(self.db):
+            if rows:
+                await self.db.executemany(_UPSERT_DAILY_SCORE_SQL, rows)
+            # Accumulator state covering a dirty date can no longer see the
+            # mark once it is drained, so drop it and let the next roll rebuild
+            await self.db.executemany(
+                """DELETE FROM score_accumulators
+                   WHERE thesis_id = ? AND as_of_date >= ?""",
+                [(thesis_id, start_date) for thesis_id, start_date, _ in ranges],
+            )
+            # Marks added while we were computing have higher ids and survive
+            await self.db.execute(
+                "DELETE FROM score_dirty_dates WHERE id <= ?", (max_id,)
+            )
+            await self.db.commit()
+        bump_generation()
+
+        return {
+            "theses": len({r[0] for r in ranges}),
+            "ranges": len(ranges),
+            "days": len(rows),
+        }
 
     async def _compute_score(self, thesis_id: str, as_of_date: str) -> dict:
         """
@@ -98,7 +265,7 @@ class AggregationService:
         Result is rescaled from [-10, +10] to [1, 10] gauge range.
         """
         cutoff = (
-            datetime.strptime(as_of_date, "%Y-%m-%d") - timedelta(days=30)
+            datetime.strptime(as_of_date, "%Y-%m-%d") - timedelta(days=WINDOW_DAYS)
         ).strftime("%Y-%m-%d")
 
         cursor = await self.db.execute(
@@ -108,7 +275,11 @@ class AggregationService:
             (thesis_id, cutoff, as_of_date),
         )
         signals = await cursor.fetchall()
+        return self._score_signals(signals, as_of_date)
 
+    @staticmethod
+    def _score_signals(signals, as_of_date: str) -> dict:
+        """Score an already-filtered window of signals as of ``as_of_date``."""
         if not signals:
             return {
                 "composite_score": 5.0,
@@ -127,7 +298,7 @@ class AggregationService:
         for sig in signals:
             sig_date = datetime.strptime(sig["signal_date"][:10], "%Y-%m-%d")
             days_ago = max((ref_date - sig_date).days, 0)
-            decay = math.exp(-0.05 * days_ago)
+            decay = math.exp(-DECAY_RATE * days_ago)
             weight = sig["confidence"] * decay
             direction_sign = 1.0 if sig["direction"] == "supporting" else -1.0
 
@@ -139,65 +310,200 @@ class AggregationService:
             else:
                 weakening_count += 1
 
-        if weight_total > 0:
-            raw_score = weighted_sum / weight_total
-        else:
-            raw_score = 0.0
-
-        # Map [-10, +10] to [1, 10]: -10→1, 0→5.5, +10→10
-        composite = 5.5 + (raw_score * 4.5 / 10.0)
-        composite = max(1.0, min(10.0, round(composite, 2)))
-
         return {
-            "composite_score": composite,
+            "composite_score": composite_from_sums(weighted_sum, weight_total),
             "signal_count": supporting_count + weakening_count,
             "supporting_count": supporting_count,
             "weakening_count": weakening_count,
         }
 
-    async def get_trend_data(
-        self, thesis_id: str, days: int = 30
-    ) -> list[dict]:
-        """Get daily composite scores for trend chart."""
-        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+    async def _compute_score_history(
+        self, thesis_id: str, start_date: str, end_date: str
+    ) -> list[tuple[str, dict]]:
+        """
+        Score every day in [start_date, end_date] for one thesis in one pass.
+
+        Loads the thesis's signals once, bins them into per-day NumPy arrays
+        (signed strength×confidence, confidence, supporting/weakening counts)
+        and convolves each with the 30-day exp(-0.05·d) kernel. Produces the
+        same values as calling ``_compute_score`` for each day.
+
+        Returns a list of (score_date, result) pairs in date order.
+        """
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d")
+        if end < start:
+            return []
+        cutoff = (start - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+
+        # Same ordering as the (thesis_id, signal_date) index scan used by
+        # _compute_score, so the scalar fallback below sums in the same order.
         cursor = await self.db.execute(
-            """SELECT score_date, composite_score, signal_count
-               FROM daily_scores
-               WHERE thesis_id = ? AND score_date >= ?
-               ORDER BY score_date ASC""",
-            (thesis_id, cutoff),
+            """SELECT direction, strength, confidence, signal_date
+               FROM signals
+               WHERE thesis_id = ? AND signal_date >= ? AND signal_date <= ?
+               ORDER BY signal_date, id""",
+            (thesis_id, cutoff, end_date),
         )
-        rows = await cursor.fetchall()
-        return [
-            {
-                "date": row["score_date"],
-                "score": row["composite_score"],
-                "count": row["signal_count"],
-            }
-            for row in rows
+        signals = await cursor.fetchall()
+
+        n_days = (end - start).days + 1
+        dates = [
+            (start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(n_days)
         ]
+        if not signals:
+            return [(d, self._score_signals([], d)) for d in dates]
+
+        # Day index relative to the first day that can reach `start`.
+        origin = np.datetime64(cutoff, "D")
+        day_idx = (
+            np.array([s["signal_date"][:10] for s in signals], dtype="datetime64[D]")
+            - origin
+        ).astype(np.int64)
+        # signal_date is compared as a string, so a value carrying a time
+        # ("2026-02-24 12:00:00") sorts after its own date and only enters
+        # the window from the following day.
+        lag_start = np.array(
+            [1 if len(s["signal_date"]) > 10 else 0 for s in signals], dtype=np.int64
+        )
+        strength = np.array([s["strength"] for s in signals], dtype=np.float64)
+        confidence = np.array([s["confidence"] for s in signals], dtype=np.float64)
+        supporting = np.array(
+            [s["direction"] == "supporting" for s in signals], dtype=bool
+        )
+        sign = np.where(supporting, 1.0, -1.0)
+
+        length = WINDOW_DAYS + n_days
+        lags = np.arange(WINDOW_DAYS + 1)
+        decay_kernel = np.exp(-DECAY_RATE * lags)
+        box_kernel = np.ones(WINDOW_DAYS + 1)
+
+        weighted_sum = np.zeros(length)
+        weight_total = np.zeros(length)
+        supporting_count = np.zeros(length)
+        weakening_count = np.zeros(length)
+
+        for first_lag in (0, 1):
+            mask = lag_start == first_lag
+            if not mask.any():
+                continue
+            idx = day_idx[mask]
+            decay_k = decay_kernel.copy()
+            box_k = box_kernel.copy()
+            decay_k[:first_lag] = 0.0
+            box_k[:first_lag] = 0.0
+
+            def _binned(values):
+                return np.bincount(idx, weights=values, minlength=length)[:length]
+
+            weighted_sum += np.convolve(
+                _binned(strength[mask] * confidence[mask] * sign[mask]), decay_k
+            )[:length]
+            weight_total += np.convolve(_binned(confidence[mask]), decay_k)[:length]
+            supporting_count += np.convolve(
+                _binned(supporting[mask].astype(np.float64)), box_k
+            )[:length]
+            weakening_count += np.convolve(
+                _binned((~supporting[mask]).astype(np.float64)), box_k
+            )[:length]
 
-    async def get_current_score(self, thesis_id: str) -> float:
-        """Get the latest composite score for a thesis."""
+        weighted_sum = weighted_sum[WINDOW_DAYS:]
+        weight_total = weight_total[WINDOW_DAYS:]
+        supporting_count = np.rint(supporting_count[WINDOW_DAYS:]).astype(np.int64)
+        weakening_count = np.rint(weakening_count[WINDOW_DAYS:]).astype(np.int64)
+
+        raw_score = np.divide(
+            weighted_sum,
+            weight_total,
+            out=np.zeros(n_days),
+            where=weight_total > 0,
+        )
+        composite = 5.5 + (raw_score * 4.5 / 10.0)
+
+        # Days sitting on a .xx5 rounding boundary are re-scored with the
+        # scalar loop so the stored value is identical to _compute_score.
+        cents = composite * 100.0
+        near_tie = np.abs(cents - np.floor(cents) - 0.5) < 1e-6
+
+        history = []
+        for i, score_date in enumerate(dates):
+            n_sup = int(supporting_count[i])
+            n_weak = int(weakening_count[i])
+            if n_sup + n_weak == 0:
+                history.append((score_date, self._score_signals([], score_date)))
+                continue
+            if near_tie[i]:
+                window_cutoff = (
+                    start + timedelta(days=i - WINDOW_DAYS)
+                ).strftime("%Y-%m-%d")
+                window = [
+                    s for s in signals
+                    if window_cutoff <= s["signal_date"] <= score_date
+                ]
+                history.append((score_date, self._score_signals(window, score_date)))
+                continue
+            history.append(
+                (
+                    score_date,
+                    {
+                        "composite_score": max(
+                            1.0, min(10.0, round(float(composite[i]), 2))
+                        ),
+                        "signal_count": n_sup + n_weak,
+                        "supporting_count": n_sup,
+                        "weakening_count": n_weak,
+                    },
+                )
+            )
+        return history
+
+    async def get_all_trend_data(self, days: int = 30) -> dict[str, list[dict]]:
+        """Trend points for every thesis in one ordered scan, keyed by thesis_id."""
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
         cursor = await self.db.execute(
-            """SELECT composite_score FROM daily_scores
-               WHERE thesis_id = ?
-               ORDER BY score_date DESC LIMIT 1""",
-            (thesis_id,),
+            """SELECT thesis_id, score_date, composite_score, signal_count
+               FROM daily_scores
+               WHERE score_date >= ?
+               ORDER BY thesis_id, score_date ASC""",
+            (cutoff,),
         )
-        row = await cursor.fetchone()
-        return row["composite_score"] if row else 5.0
+        trends: dict[str, list[dict]] = {}
+        for row in await cursor.fetchall():
+            trends.setdefault(row["thesis_id"], []).append(
+                {
+                    "date": row["score_date"],
+                    "score": row["composite_score"],
+                    "count": row["signal_count"],
+                }
+            )
+        return trends
 
-    async def get_previous_score(self, thesis_id: str) -> float | None:
-        """Get the composite score from yesterday."""
+    async def get_all_current_and_previous(
+        self,
+    ) -> dict[str, tuple[float, float | None]]:
+        """(current, previous) score for every thesis with daily_scores rows.
+
+        Current is the score on the latest score_date and previous the one
+        before it, for all theses in one query.
+        """
         cursor = await self.db.execute(
-            """SELECT composite_score FROM daily_scores
-               WHERE thesis_id = ?
-               ORDER BY score_date DESC LIMIT 1 OFFSET 1""",
-            (thesis_id,),
+            """SELECT thesis_id, composite_score, rn FROM (
+                   SELECT thesis_id, composite_score,
+                          ROW_NUMBER() OVER (
+                              PARTITION BY thesis_id ORDER BY score_date DESC
+                          ) as rn
+                   FROM daily_scores
+               ) WHERE rn <= 2"""
         )
-        row = await cursor.fetchone()
-        return row["composite_score"] if row else None
+        scores: dict[str, tuple[float, float | None]] = {}
+        for row in await cursor.fetchall():
+            current, previous = scores.get(row["thesis_id"], (5.0, None))
+            if row["rn"] == 1:
+                current = row["composite_score"]
+            else:
+                previous = row["composite_score"]
+            scores[row["thesis_id"]] = (current, previous)
+        return scores
 
     @staticmethod
     def compute_trend_direction(trend_data: list[dict], window: int = 7) -> str:
@@ -1,139 +1,722 @@
+import asyncio
 import json
 import logging
+import os
 import re
+import socket
+import uuid
 from datetime import datetime
 
 import aiosqlite
 
 from app.config import settings
 from app.models import ArticleAnalysisResult
-from app.prompts.signal_extraction import build_system_prompt, build_user_content
+from app.prompts.signal_extraction import (
+    build_packed_user_content,
+    build_system_prompt,
+    build_user_content,
+    is_headline_only,
+    prompt_version,
+)
+from app.services.dashboard_cache import bump_generation
+from app.services.rate_limit import get_anthropic_limiter
+from app.services.relevance import get_relevance_filter
+from app.services.result_cache import AnalysisResultCache
+from app.services.signal_keys import quote_key, title_key
+from app.services.write_queue import get_write_queue, writer_lock
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_MODEL = "claude-haiku-4-5-20251001"
+
+# Token counters reported in response usage, summed into run stats
+USAGE_FIELDS = ("input_tokens", "output_tokens")
+
+
+def _add_usage(stats: dict, usage):
+    for field in USAGE_FIELDS:
+        stats[field] = stats.get(field, 0) + (getattr(usage, field, None) or 0)
+
 
 class AnalysisService:
     def __init__(self, db: aiosqlite.Connection):
         self.db = db
+        # Identifies this instance's leases in the articles work queue
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 
-    async def analyze_pending(self, batch_size: int = 10) -> dict:
-        """Process pending articles through Claude for signal extraction."""
+    async def analyze_pending(
+        self, batch_size: int = 10, article_ids: list[int] | None = None
+    ) -> dict:
+        """Process pending articles through Claude for signal extraction.
+
+        article_ids limits the run to those articles (see AnalysisStream);
+        ones already claimed or finished elsewhere are left alone.
+        """
         if not settings.anthropic_api_key:
             logger.warning("Anthropic API key not configured, skipping analysis")
-            return {"analyzed": 0, "skipped": 0, "errors": 0}
+            return {"analyzed": 0, "skipped": 0, "filtered": 0, "errors": 0}
 
-        # Lazy import to avoid issues when key is not set
-        import anthropic
+        # Retries are handled here (with the shared rate limiter), not by the SDK
+        client = self._client(max_retries=0)
+
+        articles, skipped, filtered = await self._claim_pending(batch_size, article_ids)
+        stats = {"analyzed": 0, "skipped": skipped, "filtered": filtered, "errors": 0}
+
+        # Rebuilt every run, so edited theses produce a new prompt (and a
+        # new prompt_version) without any explicit invalidation
+        system_prompt = build_system_prompt(await self._load_theses())
+        stats["prompt_version"] = prompt_version(system_prompt)
+        stats.update({field: 0 for field in USAGE_FIELDS})
+        limiter = get_anthropic_limiter()
+        semaphore = asyncio.Semaphore(max(1, settings.analysis_concurrency))
+
+        stats["packed_requests"] = 0
+        stats["pack_retries"] = 0
+
+        # Articles whose normalized title/content was already analyzed under
+        # this prompt reuse that result; duplicates within this run wait for
+        # the first copy instead of being sent alongside it.
+        cache = AnalysisResultCache(self.db)
+        cache_keys = {
+            a["id"]: cache.key_for(dict(a), stats["prompt_version"]) for a in articles
+        }
+        cached = await cache.get_many(set(cache_keys.values()))
+        hits, followers, to_analyze = [], [], []
+        leading_keys = set()
+        for article in articles:
+            key = cache_keys[article["id"]]
+            if key in cached:
+                hits.append(article)
+            elif key in leading_keys:
+                followers.append(article)
+            else:
+                leading_keys.add(key)
+                to_analyze.append(article)
+        stats["cache_misses"] = len(to_analyze)
+        stats["cache_hits"] = 0
+
+        # Articles finishing around the same time share one commit
+        write_queue = get_write_queue(self.db)
+
+        async def store(article, result, from_cache: bool = False):
+            key = cache_keys[article["id"]]
 
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+            async def write():
+                await self._store_signals(article, result)
+                if from_cache:
+                    await cache.record_hit(key)
+                else:
+                    await cache.put(key, article["id"], result)
+
+            await write_queue.transaction(write)
+            if from_cache:
+                stats["cache_hits"] += 1
+            bump_generation()
+            stats["analyzed"] += 1
+            logger.info(
+                f"Analyzed article {article['id']}: "
+                f"{sum(1 for s in result.signals if s.is_relevant)} signals found"
+            )
+
+        async def try_store(article, result, from_cache: bool = False) -> bool:
+            try:
+                await store(article, result, from_cache)
+                return True
+            except Exception as e:
+                kind = "cached result for article" if from_cache else "article"
+                logger.error(f"Error storing {kind} {article['id']}: {e}")
+                return False
+
+        async def analyze(article):
+            async with semaphore:
+                try:
+                    result = await self._analyze_article(
+                        client, limiter, system_prompt, article, stats
+                    )
+                    await store(article, result)
+                except Exception as e:
+                    logger.error(f"Error analyzing article {article['id']}: {e}")
+                    async with writer_lock(self.db):
+                        await self._record_failures([article["id"]])
+                        await self.db.commit()
+                    stats["errors"] += 1
+
+        async def analyze_pack(pack):
+            async with semaphore:
+                try:
+                    results = await self._analyze_pack(
+                        client, limiter, system_prompt, pack, stats
+                    )
+                except Exception as e:
+                    logger.warning(f"Packed analysis of {len(pack)} articles failed: {e}")
+                    results = {}
+                stats["packed_requests"] += 1
+            usable = [a for a in pack if a["id"] in results]
+            stored = await asyncio.gather(*(try_store(a, results[a["id"]]) for a in usable))
+            retry = [a for a in pack if a["id"] not in results]
+            retry += [a for a, ok in zip(usable, stored) if not ok]
+            # Only the items that didn't come back usable go out on their own
+            stats["pack_retries"] += len(retry)
+            await asyncio.gather(*(analyze(article) for article in retry))
+
+        # Headline-only articles are cheap to classify, so several share one
+        # request (and one copy of the system prompt)
+        pack_size = settings.analysis_pack_size
+        headlines = [a for a in to_analyze if is_headline_only(dict(a))] if pack_size > 1 else []
+        headline_ids = {a["id"] for a in headlines}
+        singles = [a for a in to_analyze if a["id"] not in headline_ids]
+        packs = [headlines[i : i + pack_size] for i in range(0, len(headlines), pack_size)]
+        if packs and len(packs[-1]) == 1:
+            singles.extend(packs.pop())
+
+        stored = await asyncio.gather(
+            *(try_store(a, cached[cache_keys[a["id"]]], from_cache=True) for a in hits)
+        )
+        failed = [a["id"] for a, ok in zip(hits, stored) if not ok]
+        if failed:
+            async with writer_lock(self.db):
+                await self._record_failures(failed)
+                await self.db.commit()
+            stats["errors"] += len(failed)
+        await asyncio.gather(
+            *(analyze(article) for article in singles),
+            *(analyze_pack(pack) for pack in packs),
+        )
 
-        # Auto-retry: reset articles that errored more than 1 hour ago
-        retry_cursor = await self.db.execute(
-            """UPDATE articles SET analysis_status = 'pending'
-               WHERE analysis_status = 'error'
-                 AND ingested_at < datetime('now', '-1 hour')"""
+        # Followers whose first copy failed go back to the queue as-is
+        cached = await cache.get_many({cache_keys[a["id"]] for a in followers})
+        served = [a for a in followers if cache_keys[a["id"]] in cached]
+        stored = await asyncio.gather(
+            *(try_store(a, cached[cache_keys[a["id"]]], from_cache=True) for a in served)
         )
-        if retry_cursor.rowcount > 0:
+        unserved = [a["id"] for a in followers if cache_keys[a["id"]] not in cached]
+        unserved += [a["id"] for a, ok in zip(served, stored) if not ok]
+        if unserved:
+            async with writer_lock(self.db):
+                await self._release(unserved)
+                await self.db.commit()
+
+        stats["derived"] = await self._derive_cluster_members()
+
+        if articles:
+            async with writer_lock(self.db):
+                evicted = await cache.evict()
+            lookups = stats["cache_hits"] + stats["cache_misses"]
+            logger.info(
+                f"Result cache: {stats['cache_hits']}/{lookups} hits, "
+                f"{evicted} evicted, lifetime {await cache.stats()}"
+            )
+            logger.info(
+                f"Prompt {stats['prompt_version']}: "
+                f"{stats['input_tokens']} input tokens, {stats['output_tokens']} output tokens"
+            )
+        return stats
+
+    # ── Message Batches mode ──
+    #
+    # For backfills and large backlogs: pending articles are submitted as one
+    # asynchronous batch job and marked 'batched' with their batch id, so the
+    # interactive path leaves them alone. The batch is tracked in
+    # analysis_batches until its results have been ingested, which lets
+    # poll_batches() pick up where a restarted process left off.
+
+    async def submit_batch(self, max_articles: int = 500) -> str | None:
+        """Submit pending articles as a single Message Batch; returns its id."""
+        if not settings.anthropic_api_key:
+            logger.warning("Anthropic API key not configured, skipping batch analysis")
+            return None
+
+        articles, _, _ = await self._claim_pending(max_articles)
+        if not articles:
+            return None
+
+        system_prompt = build_system_prompt(await self._load_theses())
+        client = self._client()
+        batch = await client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": f"article-{article['id']}",
+                    "params": self._message_params(system_prompt, article),
+                }
+                for article in articles
+            ]
+        )
+
+        async with writer_lock(self.db):
+            await self.db.execute(
+                """INSERT INTO analysis_batches (id, status, article_count)
+                   VALUES (?, 'in_progress', ?)""",
+                (batch.id, len(articles)),
+            )
+            await self.db.executemany(
+                """UPDATE articles SET analysis_status = 'batched', batch_id = ?,
+                                       claimed_by = NULL, lease_until = NULL
+                   WHERE id = ?""",
+                [(batch.id, article["id"]) for article in articles],
+            )
             await self.db.commit()
-            logger.info(f"Reset {retry_cursor.rowcount} errored articles for retry")
 
-        # Fetch pending articles — title alone is enough (min 10 chars)
+        logger.info(f"Submitted analysis batch {batch.id} ({len(articles)} articles)")
+        return batch.id
+
+    async def poll_batches(self) -> dict:
+        """Ingest results for any tracked batches that have finished processing."""
+        stats = {"batches": 0, "in_progress": 0, "analyzed": 0, "errors": 0, "requeued": 0}
+        stats.update({field: 0 for field in USAGE_FIELDS})
+
         cursor = await self.db.execute(
-            """SELECT id, title, url, content, published_at
-               FROM articles
-               WHERE analysis_status = 'pending'
-                 AND title IS NOT NULL AND LENGTH(title) > 10
-               ORDER BY ingested_at ASC
-               LIMIT ?""",
-            (batch_size,),
+            "SELECT id FROM analysis_batches WHERE status = 'in_progress' ORDER BY created_at"
         )
-        articles = await cursor.fetchall()
+        batch_ids = [r["id"] for r in await cursor.fetchall()]
+        if not batch_ids:
+            return stats
+        if not settings.anthropic_api_key:
+            logger.warning("Anthropic API key not configured, cannot poll batches")
+            stats["in_progress"] = len(batch_ids)
+            return stats
+
+        client = self._client()
+        for batch_id in batch_ids:
+            batch = await client.messages.batches.retrieve(batch_id)
+            if batch.processing_status != "ended":
+                stats["in_progress"] += 1
+                continue
+            batch_stats = await self._ingest_batch(client, batch_id)
+            logger.info(f"Ingested analysis batch {batch_id}: {batch_stats}")
+            stats["batches"] += 1
+            for key, value in batch_stats.items():
+                stats[key] += value
+
+        if stats["batches"]:
+            stats["derived"] = await self._derive_cluster_members()
+        return stats
 
-        # Skip articles with no meaningful title
-        skip_cursor = await self.db.execute(
-            """UPDATE articles SET analysis_status = 'skipped'
-               WHERE analysis_status = 'pending'
-                 AND (title IS NULL OR LENGTH(title) <= 10)"""
+    async def _ingest_batch(self, client, batch_id: str) -> dict:
+        """Store a finished batch's results in one transaction."""
+        cursor = await self.db.execute(
+            """SELECT id, title, url, published_at FROM articles
+               WHERE batch_id = ? AND analysis_status = 'batched'""",
+            (batch_id,),
         )
-        await self.db.commit()
+        articles = {f"article-{r['id']}": r for r in await cursor.fetchall()}
+
+        parsed = []
+        errored = []
+        requeue = []
+        usage = {field: 0 for field in USAGE_FIELDS}
+        async for entry in await client.messages.batches.results(batch_id):
+            article = articles.pop(entry.custom_id, None)
+            if article is None:
+                continue
+            outcome = entry.result
+            if outcome.type == "succeeded":
+                _add_usage(usage, outcome.message.usage)
+                try:
+                    parsed.append(
+                        (article, self._parse_result(outcome.message.content[0].text))
+                    )
+                except Exception as e:
+                    logger.error(f"Error parsing batch result for article {article['id']}: {e}")
+                    errored.append(article["id"])
+            elif outcome.type == "errored":
+                errored.append(article["id"])
+            else:
+                # canceled / expired: never processed, analyze again later
+                requeue.append(article["id"])
+        # Articles the batch has no result for go back to the queue too
+        requeue.extend(article["id"] for article in articles.values())
 
+        async with writer_lock(self.db):
+            for article, result in parsed:
+                await self._store_signals(article, result)
+            await self._record_failures(errored)
+            await self.db.executemany(
+                "UPDATE articles SET analysis_status = 'pending' WHERE id = ?",
+                [(article_id,) for article_id in requeue],
+            )
+            await self._release(requeue)
+            await self.db.execute(
+                """UPDATE analysis_batches SET status = 'ended', ended_at = datetime('now')
+                   WHERE id = ?""",
+                (batch_id,),
+            )
+            await self.db.commit()
+        bump_generation()
+
+        return {
+            "analyzed": len(parsed),
+            "errors": len(errored),
+            "requeued": len(requeue),
+            **usage,
+        }
+
+    async def _derive_cluster_members(self) -> int:
+        """Give 'clustered' articles the outcome of their cluster's representative.
+
+        Analyzed representatives have their signals copied onto each member
+        (with the member's own title, URL and date); filtered or skipped ones
+        pass that status on. Members of representatives still in flight
+        wait for a later run, and clusters whose representative was
+        dead-lettered get a new one (see _promote_dead_representatives).
+        """
+        await self._promote_dead_representatives()
+
+        cursor = await self.db.execute(
+            """SELECT m.id, m.title, m.url, m.published_at,
+                      r.id AS rep_id, r.analysis_status AS rep_status
+               FROM articles m
+               JOIN articles r ON r.id = m.cluster_id
+               WHERE m.analysis_status = 'clustered'
+                 AND r.analysis_status IN ('analyzed', 'filtered', 'skipped')"""
+        )
+        members = await cursor.fetchall()
+        if not members:
+            return 0
+
+        rep_ids = sorted({m["rep_id"] for m in members})
+        placeholders = ",".join("?" * len(rep_ids))
+        cursor = await self.db.execute(
+            f"""SELECT article_id, thesis_id, direction, strength, confidence,
+                       evidence_quote, reasoning
+                FROM signals WHERE article_id IN ({placeholders})""",
+            rep_ids,
+        )
+        rep_signals: dict[int, list] = {}
+        for r in await cursor.fetchall():
+            rep_signals.setdefault(r["article_id"], []).append(r)
+
+        rows = []
+        for m in members:
+            for s in rep_signals.get(m["rep_id"], []):
+                rows.append((
+                    m["id"],
+                    s["thesis_id"],
+                    s["direction"],
+                    s["strength"],
+                    s["confidence"],
+                    s["evidence_quote"],
+                    s["reasoning"],
+                    m["title"],
+                    m["url"],
+                    self._signal_date(m),
+                    title_key(m["title"]),
+                    quote_key(s["evidence_quote"]),
+                ))
+
+        async with writer_lock(self.db):
+            await self.db.executemany(
+                """INSERT INTO signals
+                       (article_id, thesis_id, direction, strength,
+                        confidence, evidence_quote, reasoning,
+                        source_title, source_url, signal_date, is_manual,
+                        title_key, quote_key)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)""",
+                rows,
+            )
+            await self.db.executemany(
+                "UPDATE articles SET analysis_status = ? WHERE id = ?",
+                [(m["rep_status"], m["id"]) for m in members],
+            )
+            await self.db.commit()
+        bump_generation()
+        logger.info(
+            f"Derived {len(rows)} signals for {len(members)} clustered articles"
+        )
+        return len(members)
+
+    async def _promote_dead_representatives(self) -> int:
+        """Hand each dead-lettered representative's cluster to its oldest member.
+
+        The member goes back to 'pending' to be analyzed in the representative's
+        place, and the cluster (dead article included) takes its id, so later
+        copies of the story join it instead of the dead article.
+        """
+        async with writer_lock(self.db):
+            cursor = await self.db.execute(
+                """SELECT r.id AS old_id, MIN(m.id) AS new_id
+                   FROM articles r
+                   JOIN articles m ON m.cluster_id = r.id AND m.id != r.id
+                   WHERE r.analysis_status = 'dead' AND r.cluster_id = r.id
+                     AND m.analysis_status = 'clustered'
+                   GROUP BY r.id"""
+            )
+            promotions = await cursor.fetchall()
+            if not promotions:
+                return 0
+            await self.db.executemany(
+                "UPDATE articles SET cluster_id = ? WHERE cluster_id = ?",
+                [(p["new_id"], p["old_id"]) for p in promotions],
+            )
+            await self.db.executemany(
+                "UPDATE articles SET analysis_status = 'pending' WHERE id = ?",
+                [(p["new_id"],) for p in promotions],
+            )
+            await self.db.commit()
+        logger.info(
+            f"Promoted new representatives for {len(promotions)} clusters "
+            f"with dead-lettered representatives"
+        )
+        return len(promotions)
+
+    # ── Shared helpers ──
+
+    @staticmethod
+    def _signal_date(article) -> str:
+        signal_date = (article["published_at"] or "")[:10]
+        if not signal_date:
+            signal_date = datetime.utcnow().strftime("%Y-%m-%d")
+        return signal_date
+
+    def _client(self, max_retries: int = 2):
+        # Lazy import to avoid issues when key is not set
+        import anthropic
+
+        return anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url or None,
+            max_retries=max_retries,
+        )
+
+    # ── Work queue ──
+    #
+    # Pending articles are leased, not just selected: one UPDATE claims up
+    # to N of them for this service instance (claimed_by / lease_until), so
+    # overlapping runs — the scheduler plus POST /ingest/run, or another
+    # process — never analyze the same article twice. A lease left behind
+    # by a crashed run expires after settings.analysis_lease_seconds. Each
+    # claim counts as an attempt; failures back off exponentially via
+    # next_attempt_at, and after settings.analysis_max_attempts the article
+    # is moved to the 'dead' (dead-letter) state.
+
+    async def _claim_pending(
+        self, limit: int, article_ids: list[int] | None = None
+    ) -> tuple[list, int, int]:
+        """Return (claimed articles, newly skipped, newly filtered as irrelevant)."""
+        id_filter = ""
+        if article_ids is not None:
+            placeholders = ",".join("?" * len(article_ids)) or "NULL"
+            id_filter = f"AND id IN ({placeholders})"
+        async with writer_lock(self.db):
+            # Skip articles with no meaningful title
+            skip_cursor = await self.db.execute(
+                """UPDATE articles SET analysis_status = 'skipped'
+                   WHERE analysis_status = 'pending'
+                     AND (title IS NULL OR LENGTH(title) <= 10)"""
+            )
+
+            # Claim pending articles — title alone is enough (min 10 chars)
+            cursor = await self.db.execute(
+                f"""UPDATE articles
+                   SET claimed_by = ?,
+                       lease_until = datetime('now', ?),
+                       attempts = attempts + 1
+                   WHERE id IN (
+                       SELECT id FROM articles
+                       WHERE analysis_status = 'pending'
+                         AND title IS NOT NULL AND LENGTH(title) > 10
+                         AND (next_attempt_at IS NULL OR next_attempt_at <= datetime('now'))
+                         AND (lease_until IS NULL OR lease_until < datetime('now'))
+                         {id_filter}
+                       ORDER BY ingested_at ASC
+                       LIMIT ?
+                   )
+                   RETURNING id, title, url, content, published_at, ingested_at""",
+                (
+                    self.worker_id,
+                    f"+{settings.analysis_lease_seconds} seconds",
+                    *(article_ids or ()),
+                    limit,
+                ),
+            )
+            articles = sorted(
+                await cursor.fetchall(), key=lambda a: (a["ingested_at"], a["id"])
+            )
+            await self.db.commit()
+
+        filtered = 0
+        if settings.relevance_filter_enabled and articles:
+            relevance = await get_relevance_filter(self.db)
+            async with writer_lock(self.db):
+                articles, filtered = await relevance.apply(articles)
+                await self.db.commit()
+        return articles, skip_cursor.rowcount, filtered
+
+    async def _record_failures(self, article_ids: list[int]):
+        """Back off failed articles, or dead-letter them (doesn't commit)."""
+        await self.db.executemany(
+            """UPDATE articles
+               SET analysis_status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END,
+                   next_attempt_at = datetime(
+                       'now',
+                       '+' || MIN(?, ? * (1 << MAX(attempts - 1, 0))) || ' seconds'
+                   ),
+                   claimed_by = NULL,
+                   lease_until = NULL
+               WHERE id = ?""",
+            [
+                (
+                    settings.analysis_max_attempts,
+                    settings.analysis_retry_max_seconds,
+                    settings.analysis_retry_base_seconds,
+                    article_id,
+                )
+                for article_id in article_ids
+            ],
+        )
+
+    async def _release(self, article_ids: list[int]):
+        """Return claimed articles to the queue without charging an attempt."""
+        await self.db.executemany(
+            """UPDATE articles
+               SET claimed_by = NULL, lease_until = NULL,
+                   attempts = MAX(attempts - 1, 0)
+               WHERE id = ?""",
+            [(article_id,) for article_id in article_ids],
+        )
+
+    async def _load_theses(self) -> list[dict]:
         theses_cursor = await self.db.execute(
             "SELECT id, name, description FROM theses"
         )
-        theses = [dict(t) for t in await theses_cursor.fetchall()]
+        return [dict(t) for t in await theses_cursor.fetchall()]
 
-        stats = {"analyzed": 0, "skipped": skip_cursor.rowcount, "errors": 0}
+    @staticmethod
+    def _message_params(system_prompt: str, article) -> dict:
+        return {
+            "model": ANALYSIS_MODEL,
+            "max_tokens": 2048,
+            # Not marked for prompt caching: at about 700 tokens the system
+            # prompt is below the model's minimum cacheable prefix
+            "system": system_prompt,
+            "messages": [{"role": "user", "content": build_user_content(dict(article))}],
+        }
 
-        system_prompt = build_system_prompt(theses)
+    @staticmethod
+    def _strip_fences(text: str) -> str:
+        # Parse response — handle both raw JSON and markdown-wrapped JSON
+        text = text.strip()
 
-        for article in articles:
+        # Strip markdown code fences if present
+        if text.startswith("```"):
+            text = re.sub(r"^```(?:json)?\s*", "", text)
+            text = re.sub(r"\s*```$", "", text)
+        return text
+
+    @classmethod
+    def _parse_result(cls, text: str) -> ArticleAnalysisResult:
+        return ArticleAnalysisResult.model_validate_json(cls._strip_fences(text))
+
+    @classmethod
+    def _parse_packed(cls, text: str, pack: list) -> dict[int, ArticleAnalysisResult]:
+        """Map article id -> result for every item of a packed response that validates."""
+        data = json.loads(cls._strip_fences(text))
+        items = data.get("results", []) if isinstance(data, dict) else data
+
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("article")
+            if not isinstance(index, int) or not 1 <= index <= len(pack):
+                continue
+            article_id = pack[index - 1]["id"]
+            if article_id in results:
+                continue
             try:
-                user_content = build_user_content(dict(article))
+                results[article_id] = ArticleAnalysisResult.model_validate(item)
+            except ValueError as e:
+                logger.warning(f"Invalid packed result for article {article_id}: {e}")
+        return results
 
-                response = await client.messages.create(
-                    model="claude-haiku-4-5-20251001",
-                    max_tokens=2048,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": user_content}],
-                )
+    async def _analyze_article(
+        self, client, limiter, system_prompt: str, article, stats: dict
+    ) -> ArticleAnalysisResult:
+        """Call Claude for one article, retrying on 429/529 via the limiter."""
+        params = self._message_params(system_prompt, article)
+        text = await self._create_message(
+            client, limiter, params, stats, f"article {article['id']}"
+        )
+        return self._parse_result(text)
 
-                # Parse response — handle both raw JSON and markdown-wrapped JSON
-                text = response.content[0].text.strip()
-
-                # Strip markdown code fences if present
-                if text.startswith("```"):
-                    text = re.sub(r"^```(?:json)?\s*", "", text)
-                    text = re.sub(r"\s*```$", "", text)
-
-                result = ArticleAnalysisResult.model_validate_json(text)
-
-                # Store relevant signals
-                for signal in result.signals:
-                    if not signal.is_relevant:
-                        continue
-
-                    signal_date = (article["published_at"] or "")[:10]
-                    if not signal_date:
-                        signal_date = datetime.utcnow().strftime("%Y-%m-%d")
-
-                    await self.db.execute(
-                        """INSERT INTO signals
-                               (article_id, thesis_id, direction, strength,
-                                confidence, evidence_quote, reasoning,
-                                source_title, source_url, signal_date, is_manual)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)""",
-                        (
-                            article["id"],
-                            signal.thesis_id,
-                            signal.direction,
-                            signal.strength,
-                            signal.confidence,
-                            signal.evidence_quote,
-                            signal.reasoning,
-                            article["title"],
-                            article["url"],
-                            signal_date,
-                        ),
-                    )
+    async def _analyze_pack(
+        self, client, limiter, system_prompt: str, pack: list, stats: dict
+    ) -> dict[int, ArticleAnalysisResult]:
+        """Analyze several headline-only articles in one request."""
+        params = self._message_params(system_prompt, pack[0])
+        params["messages"] = [
+            {"role": "user", "content": build_packed_user_content([dict(a) for a in pack])}
+        ]
+        # Roughly 3 short signals per article; truncated tails are retried singly
+        params["max_tokens"] = min(1024 * len(pack), 16384)
+        text = await self._create_message(
+            client, limiter, params, stats, f"pack of {len(pack)} articles"
+        )
+        return self._parse_packed(text, pack)
 
-                await self.db.execute(
-                    "UPDATE articles SET analysis_status = 'analyzed' WHERE id = ?",
-                    (article["id"],),
-                )
-                await self.db.commit()
-                stats["analyzed"] += 1
-                logger.info(
-                    f"Analyzed article {article['id']}: "
-                    f"{sum(1 for s in result.signals if s.is_relevant)} signals found"
-                )
+    async def _create_message(
+        self, client, limiter, params: dict, stats: dict, label: str
+    ) -> str:
+        """Send one Messages request, retrying on 429/529; returns the text."""
+        import anthropic
 
-            except Exception as e:
-                logger.error(f"Error analyzing article {article['id']}: {e}")
-                await self.db.execute(
-                    "UPDATE articles SET analysis_status = 'error' WHERE id = ?",
-                    (article["id"],),
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            try:
+                raw = await client.messages.with_raw_response.create(**params)
+                break
+            except anthropic.APIStatusError as e:
+                if e.status_code not in (429, 529) or attempt >= settings.analysis_max_retries:
+                    raise
+                delay = limiter.back_off(e.response.headers, attempt)
+                logger.warning(
+                    f"Claude returned {e.status_code} for {label}, "
+                    f"retrying in {delay:.1f}s"
                 )
-                await self.db.commit()
-                stats["errors"] += 1
+                attempt += 1
 
-        return stats
+        limiter.update_from_headers(raw.headers)
+        response = await raw.parse()
+        _add_usage(stats, response.usage)
+        return response.content[0].text
+
+    async def _store_signals(self, article, result: ArticleAnalysisResult):
+        """Insert an article's relevant signals and mark it analyzed.
+
+        Doesn't commit. Callers run it in a WriteQueue transaction, or hold
+        writer_lock until they commit, so concurrent tasks sharing the
+        connection never commit each other's half-written articles.
+        """
+        for signal in result.signals:
+            if not signal.is_relevant:
+                continue
+
+            await self.db.execute(
+                """INSERT INTO signals
+                       (article_id, thesis_id, direction, strength,
+                        confidence, evidence_quote, reasoning,
+                        source_title, source_url, signal_date, is_manual,
+                        title_key, quote_key)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)""",
+                (
+                    article["id"],
+                    signal.thesis_id,
+                    signal.direction,
+                    signal.strength,
+                    signal.confidence,
+                    signal.evidence_quote,
+                    signal.reasoning,
+                    article["title"],
+                    article["url"],
+                    self._signal_date(article),
+                    title_key(article["title"]),
+                    quote_key(signal.evidence_quote),
+                ),
+            )
+
+        await self.db.execute(
+            """UPDATE articles
+               SET analysis_status = 'analyzed', claimed_by = NULL, lease_until = NULL
+               WHERE id = ?""",
+            (article["id"],),
+        )
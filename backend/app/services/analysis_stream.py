@@ -0,0 +1,114 @@
+"""
+Streaming handoff from ingestion to analysis.
+
+The scheduled analysis job runs every settings.analysis_interval_minutes,
+so an article could wait that long in 'pending' before its signals reached
+the dashboard. IngestionService now submit()s the ids of new (non-clustered)
+articles here as each feed is stored, and a background task analyzes them
+right away: it waits up to settings.analysis_stream_linger_seconds for more
+ids so a feed's articles share requests (and headline packs), then runs
+AnalysisService.analyze_pending restricted to those ids.
+
+The scheduled job stays as the catch-up sweep for anything the stream
+missed: retries after backoff, ids dropped while the queue was full, and
+articles ingested by another process. Both paths claim through the
+articles work queue, so they never analyze the same article twice.
+
+How long articles take to get their first signal is reported by
+signal_latency() (and GET /api/ingest/status).
+"""
+import asyncio
+import logging
+import statistics
+
+import aiosqlite
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStream:
+    def __init__(self, db: aiosqlite.Connection, score_refresher=None):
+        self.db = db
+        self.score_refresher = score_refresher
+        self._queue: asyncio.Queue[int] = asyncio.Queue(
+            maxsize=settings.analysis_stream_max_queued
+        )
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def submit(self, article_ids: list[int]):
+        """Queue articles for immediate analysis (non-blocking)."""
+        dropped = 0
+        for article_id in article_ids:
+            try:
+                self._queue.put_nowait(article_id)
+            except asyncio.QueueFull:
+                # Left pending for the scheduled sweep
+                dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logger.warning(
+                f"Analysis stream full: {dropped} new articles left for the "
+                f"scheduled sweep ({self.dropped} since start)"
+            )
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        from app.services.analysis import AnalysisService
+
+        loop = asyncio.get_running_loop()
+        while True:
+            article_ids = [await self._queue.get()]
+            deadline = loop.time() + settings.analysis_stream_linger_seconds
+            while len(article_ids) < settings.analysis_stream_batch_size:
+                try:
+                    article_ids.append(
+                        await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                svc = AnalysisService(self.db)
+                stats = await svc.analyze_pending(
+                    batch_size=len(article_ids), article_ids=article_ids
+                )
+                logger.info(f"Streamed analysis of {len(article_ids)} new articles: {stats}")
+            except Exception as e:
+                logger.error(f"Streamed analysis error (sweep will retry): {e}")
+                continue
+            if self.score_refresher is not None and stats.get("analyzed"):
+                self.score_refresher.request()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def signal_latency(db: aiosqlite.Connection, hours: int = 24) -> dict:
+    """Seconds from ingestion to an article's first signal, over recent articles.
+
+    Counts articles ingested within `hours` that have news signals; a
+    backfilled article's ingested_at is its publish date, so those fall
+    outside the window.
+    """
+    cursor = await db.execute(
+        """SELECT (julianday(MIN(s.created_at)) - julianday(a.ingested_at)) * 86400
+               AS seconds
+           FROM articles a
+           JOIN signals s ON s.article_id = a.id
+           WHERE a.ingested_at >= datetime('now', ?)
+           GROUP BY a.id""",
+        (f"-{hours} hours",),
+    )
+    seconds = sorted(max(r["seconds"], 0.0) for r in await cursor.fetchall())
+    if not seconds:
+        return {"samples": 0, "p50_seconds": None, "p95_seconds": None}
+    return {
+        "samples": len(seconds),
+        "p50_seconds": round(statistics.median(seconds), 1),
+        "p95_seconds": round(seconds[max(int(len(seconds) * 0.95) - 1, 0)], 1),
+    }
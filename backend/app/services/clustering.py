@@ -0,0 +1,143 @@
+"""
+Near-duplicate story clustering at ingestion time (MinHash LSH).
+
+Wire stories get rewritten by dozens of outlets, so exact title matching
+misses most copies. Each new article's title (plus its summary, when it
+has a real one) becomes a token set, summarized by a MinHash signature of
+NUM_PERM values. The signature is split into BANDS bands of ROWS values. Every band is stored in article_lsh, so
+any earlier article sharing a band is a candidate. Candidates are then
+confirmed by exact Jaccard similarity of their token sets against
+settings.cluster_similarity_threshold.
+
+A new article joins the cluster of its most similar confirmed candidate
+ingested within settings.cluster_window_days. It is marked 'clustered'
+and is never sent to Claude: AnalysisService derives its signals from the
+cluster's representative (the cluster's first article, whose id is the
+cluster_id) once that has been analyzed. If the representative is
+dead-lettered instead, the oldest member takes its place.
+"""
+import hashlib
+import logging
+import random
+import zlib
+
+import aiosqlite
+
+from app.config import settings
+from app.services.relevance import tokenize
+from app.services.signal_keys import normalize_title
+from app.services.write_queue import writer_lock
+
+logger = logging.getLogger(__name__)
+
+# 10 bands of 3 rows: pairs at Jaccard 0.75 become candidates >99% of the
+# time, pairs at 0.3 about 24% of the time (then rejected by the exact check)
+NUM_PERM = 30
+BANDS = 10
+ROWS = NUM_PERM // BANDS
+
+# Fewer distinct tokens than this is too little text to call a duplicate
+MIN_TOKENS = 4
+
+# A summary must add this many words beyond the headline to be compared
+SUMMARY_MIN_NEW_TOKENS = 8
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20250601)  # fixed: signatures must be stable across runs
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+
+def token_set(title: str | None, content: str | None) -> set[str]:
+    tokens = set(tokenize(normalize_title(title or "")))
+    # Google News content is just "<title>. <title> <outlet>"; outlet names
+    # would only add noise, so a summary counts when it brings real text
+    summary = set(tokenize((content or "")[:600]))
+    if len(summary - tokens) >= SUMMARY_MIN_NEW_TOKENS:
+        tokens |= summary
+    return tokens
+
+
+def minhash(tokens: set[str]) -> list[int]:
+    hashes = [zlib.crc32(t.encode()) for t in tokens]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature: list[int]) -> list[str]:
+    keys = []
+    for band in range(BANDS):
+        chunk = ",".join(str(v) for v in signature[band * ROWS : (band + 1) * ROWS])
+        digest = hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()
+        keys.append(f"{band}:{digest}")
+    return keys
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class ArticleClusterer:
+    def __init__(self, db: aiosqlite.Connection):
+        self.db = db
+
+    async def assign(self, article_id: int, title: str, content: str | None) -> int:
+        """Index a just-inserted article and set its cluster (doesn't commit).
+
+        Returns the cluster id; equal to article_id for a new cluster.
+        """
+        tokens = token_set(title, content)
+        cluster_id = article_id
+        if len(tokens) >= MIN_TOKENS:
+            keys = band_keys(minhash(tokens))
+            placeholders = ",".join("?" * len(keys))
+            # A dead-lettered representative will never be analyzed, so
+            # its cluster takes no new members
+            cursor = await self.db.execute(
+                f"""SELECT DISTINCT a.id, a.title, a.content, r.id AS cluster_id
+                    FROM article_lsh l
+                    JOIN articles a ON a.id = l.article_id
+                    JOIN articles r ON r.id = COALESCE(a.cluster_id, a.id)
+                    WHERE l.band_key IN ({placeholders})
+                      AND a.id != ?
+                      AND a.ingested_at >= datetime('now', ?)
+                      AND r.analysis_status != 'dead'""",
+                (*keys, article_id, f"-{settings.cluster_window_days} days"),
+            )
+            best = settings.cluster_similarity_threshold
+            for candidate in await cursor.fetchall():
+                similarity = jaccard(tokens, token_set(candidate["title"], candidate["content"]))
+                if similarity >= best:
+                    best = similarity
+                    cluster_id = candidate["cluster_id"]
+
+            await self.db.executemany(
+                "INSERT OR IGNORE INTO article_lsh (band_key, article_id) VALUES (?, ?)",
+                [(key, article_id) for key in keys],
+            )
+
+        if cluster_id == article_id:
+            await self.db.execute(
+                "UPDATE articles SET cluster_id = ? WHERE id = ?", (cluster_id, article_id)
+            )
+        else:
+            await self.db.execute(
+                """UPDATE articles SET cluster_id = ?, analysis_status = 'clustered'
+                   WHERE id = ? AND analysis_status = 'pending'""",
+                (cluster_id, article_id),
+            )
+        return cluster_id
+
+    async def prune(self) -> int:
+        """Drop index entries for articles too old to be matched again."""
+        async with writer_lock(self.db):
+            cursor = await self.db.execute(
+                """DELETE FROM article_lsh WHERE article_id IN (
+                       SELECT id FROM articles WHERE ingested_at < datetime('now', ?)
+                   )""",
+                (f"-{settings.cluster_window_days} days",),
+            )
+            await self.db.commit()
+        return cursor.rowcount
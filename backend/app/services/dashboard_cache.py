@@ -0,0 +1,87 @@
+"""
+In-process cache for the serialized /api/dashboard response.
+
+Cached entries remember the version they were built at and are discarded
+as soon as it moves. The version pairs:
+
+- the database's dashboard_generation, which triggers bump on every change
+  to a table the dashboard reads (see app.database.DASHBOARD_TABLE_EVENTS),
+  whichever connection or process commits it (backfill scripts, a
+  separate worker). Other commits, like the pipeline leader renewing its
+  lease every few seconds, leave it alone.
+- an in-process generation: write paths call bump_generation() after
+  they commit, and also when in-process state the payload shows changes
+  (a score refresh being queued).
+
+A short TTL bounds drift of the sliding 24h counts.
+"""
+import hashlib
+import time
+
+import aiosqlite
+
+# Upper bound on entry age even when nothing was written
+DASHBOARD_CACHE_TTL_SECONDS = 60.0
+
+_generation = 0
+
+
+def bump_generation():
+    """Mark dashboard data as changed (call after committing writes)."""
+    global _generation
+    _generation += 1
+
+
+async def dashboard_version_key(db: aiosqlite.Connection) -> tuple[int, int]:
+    """Cache version: (in-process generation, database dashboard_generation)."""
+    cursor = await db.execute("SELECT generation FROM dashboard_generation")
+    row = await cursor.fetchone()
+    return _generation, row[0] if row else 0
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against our ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class DashboardCache:
+    def __init__(self, ttl: float = DASHBOARD_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[int, tuple[tuple, float, bytes, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, days: int, version: tuple) -> tuple[bytes, str] | None:
+        """Return (body, etag) if a fresh entry exists for this version."""
+        entry = self._entries.get(days)
+        if entry is not None:
+            entry_version, created, body, etag = entry
+            if entry_version == version and time.monotonic() - created < self.ttl:
+                self.hits += 1
+                return body, etag
+        self.misses += 1
+        return None
+
+    def put(self, days: int, version: tuple, body: bytes) -> str:
+        etag = make_etag(body)
+        # Keys are bounded by the `days` query range (7-365)
+        self._entries[days] = (version, time.monotonic(), body, etag)
+        return etag
+
+
+dashboard_cache = DashboardCache()
@@ -10,6 +10,8 @@ import aiosqlite
 import httpx
 
 from app.config import settings
+from app.services.dashboard_cache import bump_generation
+from app.services.write_queue import get_write_queue
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,9 @@ METACULUS_API = "https://www.metaculus.com/api/posts"
 class DataSeriesFetcher:
     def __init__(self, db: aiosqlite.Connection):
         self.db = db
+        # Points are grouped with other small writes but awaited, so a failed
+        # write surfaces in the provider (and its count) like any other error
+        self.write_queue = get_write_queue(db)
 
     async def fetch_all(self) -> dict:
         """Fetch data for all enabled data series."""
@@ -60,11 +65,11 @@ class DataSeriesFetcher:
                     stats["skipped"] += 1
                     continue
 
-                await self.db.execute(
+                await self.write_queue.execute(
                     "UPDATE data_series SET last_fetched_at = datetime('now') WHERE id = ?",
                     (series["id"],),
                 )
-                await self.db.commit()
+                bump_generation()
                 stats["fetched"] += 1
                 stats["new_points"] += count
                 logger.info(f"Fetched {count} new points for {series['id']}")
@@ -132,7 +137,7 @@ class DataSeriesFetcher:
 
     async def _store_fred_observations(self, series_id: str, observations: list[tuple]) -> int:
         """Store date/value pairs from FRED into data_points."""
-        new_count = 0
+        rows = []
         for date_str, value_str in observations:
             if value_str == "." or not value_str:
                 continue  # Missing data point
@@ -140,18 +145,15 @@ class DataSeriesFetcher:
                 value = float(value_str)
             except ValueError:
                 continue
-            try:
-                await self.db.execute(
-                    """INSERT OR IGNORE INTO data_points (series_id, date, value)
-                       VALUES (?, ?, ?)""",
-                    (series_id, date_str, value),
-                )
-                new_count += 1
-            except Exception:
-                pass  # Duplicate, ignore
+            rows.append((series_id, date_str, value))
 
-        await self.db.commit()
-        return new_count
+        await self.write_queue.executemany(
+            """INSERT INTO data_points (series_id, date, value)
+               VALUES (?, ?, ?)
+               ON CONFLICT(series_id, date) DO NOTHING""",
+            rows,
+        )
+        return len(rows)
 
     async def _fetch_bls(self, series_id: str, config: dict) -> int:
         """Fetch data from BLS API v2."""
@@ -177,7 +179,7 @@ class DataSeriesFetcher:
             logger.error(f"BLS API error for {bls_series}: {data.get('message')}")
             return 0
 
-        new_count = 0
+        rows = []
         for series_data in data.get("Results", {}).get("series", []):
             for point in series_data.get("data", []):
                 year = point["year"]
@@ -195,18 +197,15 @@ class DataSeriesFetcher:
                 except ValueError:
                     continue
 
-                try:
-                    await self.db.execute(
-                        """INSERT OR IGNORE INTO data_points (series_id, date, value)
-                           VALUES (?, ?, ?)""",
-                        (series_id, date_str, value),
-                    )
-                    new_count += 1
-                except Exception:
-                    pass
-
-        await self.db.commit()
-        return new_count
+                rows.append((series_id, date_str, value))
+
+        await self.write_queue.executemany(
+            """INSERT INTO data_points (series_id, date, value)
+               VALUES (?, ?, ?)
+               ON CONFLICT(series_id, date) DO NOTHING""",
+            rows,
+        )
+        return len(rows)
 
     async def _fetch_sec_edgar(self, series_id: str, config: dict) -> int:
         """Fetch quarterly capex from SEC EDGAR XBRL API."""
@@ -250,7 +249,6 @@ class DataSeriesFetcher:
 
         # Filter for quarterly filings (10-Q and 10-K) and deduplicate
         seen_periods = set()
-        new_count = 0
 
         # Sort by filed date descending to get the most recent values
         quarterly_data = []
@@ -274,19 +272,13 @@ class DataSeriesFetcher:
             })
 
         # Store the data points
-        for point in quarterly_data:
-            try:
-                await self.db.execute(
-                    """INSERT OR IGNORE INTO data_points (series_id, date, value)
-                       VALUES (?, ?, ?)""",
-                    (series_id, point["date"], round(point["value"], 2)),
-                )
-                new_count += 1
-            except Exception:
-                pass
-
-        await self.db.commit()
-        return new_count
+        await self.write_queue.executemany(
+            """INSERT INTO data_points (series_id, date, value)
+               VALUES (?, ?, ?)
+               ON CONFLICT(series_id, date) DO NOTHING""",
+            [(series_id, p["date"], round(p["value"], 2)) for p in quarterly_data],
+        )
+        return len(quarterly_data)
 
     # ── Prediction Market Fetchers ──
 
@@ -337,12 +329,11 @@ class DataSeriesFetcher:
         today = datetime.utcnow().strftime("%Y-%m-%d")
 
         try:
-            await self.db.execute(
+            await self.write_queue.execute(
                 """INSERT OR REPLACE INTO data_points (series_id, date, value)
                    VALUES (?, ?, ?)""",
                 (series_id, today, round(probability, 2)),
-            )
-            await self.db.commit()
+                )
             logger.info(f"Polymarket {slug}: {probability:.1f}%")
             return 1
         except Exception:
@@ -378,12 +369,11 @@ class DataSeriesFetcher:
         today = datetime.utcnow().strftime("%Y-%m-%d")
 
         try:
-            await self.db.execute(
+            await self.write_queue.execute(
                 """INSERT OR REPLACE INTO data_points (series_id, date, value)
                    VALUES (?, ?, ?)""",
                 (series_id, today, round(probability, 2)),
-            )
-            await self.db.commit()
+                )
             logger.info(f"Kalshi {ticker}: {probability:.0f}%")
             return 1
         except Exception:
@@ -430,12 +420,11 @@ class DataSeriesFetcher:
         today = datetime.utcnow().strftime("%Y-%m-%d")
 
         try:
-            await self.db.execute(
+            await self.write_queue.execute(
                 """INSERT OR REPLACE INTO data_points (series_id, date, value)
                    VALUES (?, ?, ?)""",
                 (series_id, today, round(value, 2)),
-            )
-            await self.db.commit()
+                )
             logger.info(f"Metaculus Q{question_id}: {value:.2f}")
             return 1
         except Exception:
@@ -10,6 +10,10 @@ from datetime import datetime
 
 import aiosqlite
 
+from app.services.dashboard_cache import bump_generation
+from app.services.signal_keys import quote_key, title_key
+from app.services.write_queue import writer_lock
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,20 +59,22 @@ class DataSignalGenerator:
 
         stats = {"generated": 0, "skipped_no_data": 0, "skipped_duplicate": 0, "errors": 0}
 
-        for series in series_list:
-            try:
-                created = await self._generate_for_series(series)
-                if created is None:
-                    stats["skipped_no_data"] += 1
-                elif created:
-                    stats["generated"] += 1
-                else:
-                    stats["skipped_duplicate"] += 1
-            except Exception as e:
-                logger.error(f"Error generating data signal for {series['id']}: {e}")
-                stats["errors"] += 1
-
-        await self.db.commit()
+        async with writer_lock(self.db):
+            for series in series_list:
+                try:
+                    created = await self._generate_for_series(series)
+                    if created is None:
+                        stats["skipped_no_data"] += 1
+                    elif created:
+                        stats["generated"] += 1
+                    else:
+                        stats["skipped_duplicate"] += 1
+                except Exception as e:
+                    logger.error(f"Error generating data signal for {series['id']}: {e}")
+                    stats["errors"] += 1
+
+            await self.db.commit()
+        bump_generation()
         logger.info(f"Data signal generation complete: {stats}")
         return stats
 
@@ -153,8 +159,9 @@ class DataSignalGenerator:
             """INSERT INTO signals
                    (article_id, thesis_id, direction, strength, confidence,
                     evidence_quote, reasoning, source_title, source_url,
-                    signal_date, is_manual, signal_type, data_point_id)
-               VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, NULL, ?, 0, 'data', ?)""",
+                    signal_date, is_manual, signal_type, data_point_id,
+                    title_key, quote_key)
+               VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, NULL, ?, 0, 'data', ?, ?, ?)""",
             (
                 series["thesis_id"],
                 direction,
@@ -165,6 +172,8 @@ class DataSignalGenerator:
                 series_name,
                 latest["date"],
                 latest["id"],
+                title_key(series_name),
+                quote_key(evidence_quote),
             ),
         )
         logger.info(
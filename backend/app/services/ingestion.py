@@ -1,16 +1,27 @@
+import asyncio
 import hashlib
 import json
 import logging
+import math
+import multiprocessing
 import re
-from datetime import datetime
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
 from html import unescape
+from urllib.parse import urlparse
 
 import feedparser
 import httpx
 import aiosqlite
 
 from app.config import settings
+from app.services.clustering import ArticleClusterer
+from app.services.dashboard_cache import bump_generation
+from app.services.write_queue import get_write_queue, writer_lock
 
 logger = logging.getLogger(__name__)
 
@@ -28,111 +39,384 @@ def strip_html(text: str) -> str:
     return clean
 
 
+def parse_feed(text: str) -> list[dict]:
+    """Parse an RSS/Atom document into article dicts (CPU-bound, no I/O)."""
+    feed = feedparser.parse(text)
+    articles = []
+    for entry in feed.entries:
+        pub_date = None
+        if hasattr(entry, "published"):
+            try:
+                pub_date = parsedate_to_datetime(entry.published).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                )
+            except Exception:
+                pub_date = entry.published
+
+        title = strip_html(entry.get("title", ""))
+        summary = strip_html(
+            entry.get("summary", entry.get("description", ""))
+        )
+
+        # Combine title + summary for richer content for analysis
+        content = f"{title}. {summary}" if summary else title
+
+        articles.append(
+            {
+                "title": title,
+                "url": entry.get("link", ""),
+                "author": entry.get("author", ""),
+                "content": content,
+                "published_at": pub_date,
+            }
+        )
+    return articles
+
+
+def poll_schedule(source: dict, new: int, now: datetime) -> dict:
+    """A source's updated new-item rate and next poll time after a poll.
+
+    new_item_rate is new articles per hour, smoothed with a weight that
+    grows with the time since the last poll (a poll right after another
+    barely moves it; one a full settings.ingestion_rate_window_hours later
+    mostly replaces it). The next poll is when about
+    settings.ingestion_target_new_per_poll new articles are expected,
+    clamped to the min/max polling interval. Sources with no history yet
+    use settings.ingestion_interval_hours.
+    """
+    rate = source["new_item_rate"]
+    last = None
+    if source["last_fetched_at"]:
+        try:
+            last = datetime.strptime(source["last_fetched_at"], "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            pass
+    if last is not None:
+        elapsed_hours = max((now - last).total_seconds() / 3600, 1 / 60)
+        observed = new / elapsed_hours
+        if rate is None:
+            rate = observed
+        else:
+            weight = 1 - math.exp(-elapsed_hours / settings.ingestion_rate_window_hours)
+            rate += weight * (observed - rate)
+
+    if rate is None:
+        interval = settings.ingestion_interval_hours * 60
+    elif rate <= 0:
+        interval = settings.ingestion_max_interval_minutes
+    else:
+        interval = 60 * settings.ingestion_target_new_per_poll / rate
+    interval = min(
+        max(interval, settings.ingestion_min_interval_minutes),
+        settings.ingestion_max_interval_minutes,
+    )
+    return {
+        "new_item_rate": rate,
+        "poll_interval_minutes": round(interval, 1),
+        "next_poll_at": (now + timedelta(minutes=interval)).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+async def reset_poll_schedule(db: aiosqlite.Connection):
+    """Make every source due, so the next due-only ingestion polls them all."""
+    async with writer_lock(db):
+        await db.execute("UPDATE sources SET next_poll_at = NULL")
+        await db.commit()
+
+
+# Feed parsing runs in worker processes: feedparser is pure Python, so on a
+# thread it would still hold the GIL against the event loop serving API
+# requests. parse_feed_offloaded waits for a slot once
+# settings.feed_parse_queue_depth parses are queued or running. The slots
+# belong to the event loop (scripts and tests run several in turn), the
+# pool to the process.
+_parse_pool: ProcessPoolExecutor | None = None
+_parse_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def parse_feed_offloaded(text: str) -> list[dict]:
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn, not fork: the server process has live database threads
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=settings.feed_parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    loop = asyncio.get_running_loop()
+    if loop not in _parse_slots:
+        _parse_slots[loop] = asyncio.Semaphore(settings.feed_parse_queue_depth)
+    async with _parse_slots[loop]:
+        pool = _parse_pool
+        try:
+            return await loop.run_in_executor(pool, parse_feed, text)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge feed); start fresh next time
+            if _parse_pool is pool:
+                _parse_pool = None
+            raise
+
 class IngestionService:
-    def __init__(self, db: aiosqlite.Connection):
+    def __init__(self, db: aiosqlite.Connection, analysis_stream=None):
         self.db = db
+        # New articles are handed to this AnalysisStream as they're stored
+        self.analysis_stream = analysis_stream
+
+    async def run_full_ingestion(self, due_only: bool = False) -> dict:
+        """Fetch enabled sources concurrently, dedupe, store new articles.
 
-    async def run_full_ingestion(self) -> dict:
-        """Fetch all enabled sources, dedupe, store new articles."""
+        With due_only, only sources whose next_poll_at has passed are polled
+        (see poll_schedule); otherwise all of them are.
+
+        At most settings.ingestion_concurrency feeds are in flight, and at most
+        settings.ingestion_per_host_concurrency per host (most seeded feeds are
+        news.google.com). Each source gets its own timeout and its own entry in
+        stats["sources"], so a slow or failing feed only affects itself.
+
+        RSS feeds are polled conditionally (see _fetch_rss); an unchanged feed
+        is counted in stats["unchanged"] and costs no parsing or article work.
+        """
         cursor = await self.db.execute(
-            "SELECT id, name, source_type, url, config FROM sources WHERE enabled = 1"
+            """SELECT id, name, source_type, url, config, last_fetched_at,
+                      http_etag, http_last_modified, content_hash,
+                      new_item_rate, poll_interval_minutes
+               FROM sources
+               WHERE enabled = 1
+                 AND (? = 0 OR next_poll_at IS NULL OR next_poll_at <= datetime('now'))""",
+            (int(due_only),),
         )
         sources = await cursor.fetchall()
 
-        stats = {"fetched": 0, "new": 0, "duplicate": 0, "errors": 0}
+        stats = {
+            "fetched": 0, "new": 0, "duplicate": 0, "clustered": 0,
+            "unchanged": 0, "errors": 0,
+        }
+        clusterer = ArticleClusterer(self.db)
+        slots = asyncio.Semaphore(settings.ingestion_concurrency)
+        host_slots: dict[str, asyncio.Semaphore] = {}
 
-        async with httpx.AsyncClient(
-            timeout=30.0, follow_redirects=True
-        ) as client:
-            for source in sources:
-                try:
-                    if source["source_type"] == "rss":
-                        articles = await self._fetch_rss(client, source)
-                    elif source["source_type"] == "newsapi":
-                        articles = await self._fetch_newsapi(client, source)
-                    else:
-                        continue
-
-                    for article in articles:
-                        stats["fetched"] += 1
-                        ext_id = self._compute_external_id(
-                            article.get("url", article["title"])
+        async def ingest(source) -> dict | None:
+            if source["source_type"] not in ("rss", "newsapi"):
+                return None
+            source_stats = {
+                "id": source["id"],
+                "name": source["name"],
+                "fetched": 0,
+                "new": 0,
+                "duplicate": 0,
+                "clustered": 0,
+                "unchanged": False,
+                "seconds": 0.0,
+                "error": None,
+                "next_poll_at": None,
+            }
+            host = self._source_host(source)
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(settings.ingestion_per_host_concurrency)
+            try:
+                # Host slot first, so feeds queued behind a busy host don't
+                # hold global slots other hosts could use
+                async with host_slots[host], slots:
+                    started = time.perf_counter()
+                    try:
+                        articles, validators = await asyncio.wait_for(
+                            self._fetch_source(client, source),
+                            timeout=settings.ingestion_source_timeout_seconds,
                         )
+                    finally:
+                        source_stats["seconds"] = round(time.perf_counter() - started, 2)
 
-                        existing = await (
-                            await self.db.execute(
-                                "SELECT id FROM articles WHERE external_id = ?",
-                                (ext_id,),
-                            )
-                        ).fetchone()
-
-                        if existing:
-                            stats["duplicate"] += 1
-                            continue
-
-                        await self.db.execute(
-                            """INSERT INTO articles
-                                   (source_id, external_id, title, url, author,
-                                    content, published_at, analysis_status)
-                               VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')""",
-                            (
-                                source["id"],
-                                ext_id,
-                                article["title"],
-                                article.get("url"),
-                                article.get("author"),
-                                article.get("content", ""),
-                                article.get("published_at"),
-                            ),
+                if articles is None:
+                    source_stats["unchanged"] = True
+                else:
+                    source_stats["fetched"] = len(articles)
+                    async with writer_lock(self.db):
+                        new, to_analyze = await self._store_articles(
+                            source["id"], articles, clusterer, validators
                         )
-                        stats["new"] += 1
+                    source_stats["new"] = new
+                    source_stats["duplicate"] = len(articles) - new
+                    source_stats["clustered"] = new - len(to_analyze)
+                    bump_generation()
+                    if self.analysis_stream is not None and to_analyze:
+                        self.analysis_stream.submit(to_analyze)
+            except asyncio.TimeoutError:
+                source_stats["error"] = (
+                    f"timed out after {settings.ingestion_source_timeout_seconds}s"
+                )
+                logger.error(f"Error fetching source {source['name']}: {source_stats['error']}")
+            except Exception as e:
+                source_stats["error"] = str(e) or type(e).__name__
+                logger.error(f"Error fetching source {source['name']}: {e}")
+            await self._reschedule(source, source_stats)
+            return source_stats
 
-                    await self.db.execute(
-                        "UPDATE sources SET last_fetched_at = datetime('now') WHERE id = ?",
-                        (source["id"],),
-                    )
-                    await self.db.commit()
+        async with httpx.AsyncClient(
+            timeout=30.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=settings.ingestion_concurrency),
+        ) as client:
+            results = await asyncio.gather(*(ingest(source) for source in sources))
 
-                except Exception as e:
-                    logger.error(f"Error fetching source {source['name']}: {e}")
-                    stats["errors"] += 1
+        stats["sources"] = [r for r in results if r is not None]
+        for source_stats in stats["sources"]:
+            for field in ("fetched", "new", "duplicate", "clustered"):
+                stats[field] += source_stats[field]
+            if source_stats["unchanged"]:
+                stats["unchanged"] += 1
+            if source_stats["error"]:
+                stats["errors"] += 1
 
+        await clusterer.prune()
         return stats
 
-    async def _fetch_rss(
-        self, client: httpx.AsyncClient, source: dict
-    ) -> list[dict]:
-        response = await client.get(source["url"])
-        feed = feedparser.parse(response.text)
-        articles = []
-        for entry in feed.entries:
-            pub_date = None
-            if hasattr(entry, "published"):
-                try:
-                    pub_date = parsedate_to_datetime(entry.published).strftime(
-                        "%Y-%m-%d %H:%M:%S"
-                    )
-                except Exception:
-                    pub_date = entry.published
-
-            title = strip_html(entry.get("title", ""))
-            summary = strip_html(
-                entry.get("summary", entry.get("description", ""))
+    async def _store_articles(
+        self,
+        source_id: int,
+        articles: list[dict],
+        clusterer: ArticleClusterer,
+        validators: dict | None = None,
+    ) -> tuple[int, list[int]]:
+        """Insert a source's articles in one transaction.
+
+        Returns (number of new articles, ids of those needing analysis: the
+        new ones that didn't join an existing cluster).
+
+        UNIQUE(external_id) does the dedupe: one INSERT ... ON CONFLICT DO
+        NOTHING for the whole feed, and the rows it actually inserted are the new articles. The feed's
+        validators are saved in the same transaction, so a failed store is
+        fetched in full again next time.
+        """
+        rows = []
+        for article in articles:
+            ext_id = self._compute_external_id(article.get("url", article["title"]))
+            rows.append(
+                (
+                    source_id,
+                    ext_id,
+                    article["title"],
+                    article.get("url"),
+                    article.get("author"),
+                    article.get("content", ""),
+                    article.get("published_at"),
+                )
             )
 
-            # Combine title + summary for richer content for analysis
-            content = f"{title}. {summary}" if summary else title
-
-            articles.append(
-                {
-                    "title": title,
-                    "url": entry.get("link", ""),
-                    "author": entry.get("author", ""),
-                    "content": content,
-                    "published_at": pub_date,
-                }
+        # Take the write lock first so the id watermark can't go stale
+        if not self.db.in_transaction:
+            await self.db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = await self.db.execute("SELECT COALESCE(MAX(id), 0) FROM articles")
+            watermark = (await cursor.fetchone())[0]
+            # rowcount is the summed changes() of every row: duplicates add 0.
+            # Only the external_id conflict is skipped; any other constraint
+            # failure still raises and rolls the source back
+            cursor = await self.db.executemany(
+                """INSERT INTO articles
+                       (source_id, external_id, title, url, author,
+                        content, published_at, analysis_status)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+                   ON CONFLICT(external_id) DO NOTHING""",
+                rows,
             )
-        return articles
+            new = cursor.rowcount
+
+            to_analyze = []
+            if new:
+                cursor = await self.db.execute(
+                    """SELECT id, title, content FROM articles
+                       WHERE id > ? AND source_id = ? ORDER BY id""",
+                    (watermark, source_id),
+                )
+                for row in await cursor.fetchall():
+                    # Rewrites of an already-seen story join its cluster
+                    # and get their signals from its representative
+                    cluster_id = await clusterer.assign(row["id"], row["title"], row["content"])
+                    if cluster_id == row["id"]:
+                        to_analyze.append(row["id"])
+
+            validators = validators or {}
+            assignments = "".join(f", {column} = ?" for column in validators)
+            await self.db.execute(
+                f"UPDATE sources SET last_fetched_at = datetime('now'){assignments} WHERE id = ?",
+                (*validators.values(), source_id),
+            )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        return new, to_analyze
+
+    async def _reschedule(self, source: dict, source_stats: dict):
+        """Queue the source's next poll time (and rate) after this poll."""
+        now = datetime.utcnow()
+        if source_stats["error"]:
+            # A failed poll tells us nothing about the rate; retry on schedule
+            interval = source["poll_interval_minutes"] or settings.ingestion_interval_hours * 60
+            columns = {
+                "next_poll_at": (now + timedelta(minutes=interval)).strftime("%Y-%m-%d %H:%M:%S")
+            }
+        else:
+            columns = poll_schedule(source, source_stats["new"], now)
+            if source_stats["unchanged"]:
+                # Stored feeds got this with their articles
+                columns["last_fetched_at"] = now.strftime("%Y-%m-%d %H:%M:%S")
+        source_stats["next_poll_at"] = columns["next_poll_at"]
+
+        # Grouped with the other feeds' updates into one commit
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        await get_write_queue(self.db).execute(
+            f"UPDATE sources SET {assignments} WHERE id = ?",
+            (*columns.values(), source["id"]),
+            wait=False,
+        )
+
+    async def _fetch_source(
+        self, client: httpx.AsyncClient, source: dict
+    ) -> tuple[list[dict] | None, dict]:
+        """(articles, validators to save); articles is None if unchanged."""
+        if source["source_type"] == "newsapi":
+            return await self._fetch_newsapi(client, source), {}
+        return await self._fetch_rss(client, source)
+
+    @staticmethod
+    def _source_host(source: dict) -> str:
+        if source["source_type"] == "newsapi":
+            return "newsapi.org"
+        return urlparse(source["url"] or "").hostname or ""
+
+    async def _fetch_rss(
+        self, client: httpx.AsyncClient, source: dict
+    ) -> tuple[list[dict] | None, dict]:
+        """Conditional GET with the validators saved from the last fetch.
+
+        Returns (None, {}) when the server answers 304 Not Modified, or, for
+        feeds without ETag/Last-Modified, when the body hashes the same as
+        last time.
+        """
+        headers = {}
+        if source["http_etag"]:
+            headers["If-None-Match"] = source["http_etag"]
+        if source["http_last_modified"]:
+            headers["If-Modified-Since"] = source["http_last_modified"]
+        response = await client.get(source["url"], headers=headers)
+        if response.status_code == 304:
+            return None, {}
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if response.is_success and content_hash == source["content_hash"]:
+            return None, {}
+        validators = {}
+        if response.is_success:
+            validators = {
+                "http_etag": response.headers.get("etag"),
+                "http_last_modified": response.headers.get("last-modified"),
+                "content_hash": content_hash,
+            }
+
+        articles = await parse_feed_offloaded(response.text)
+        return articles, validators
 
     async def _fetch_newsapi(
         self, client: httpx.AsyncClient, source: dict
@@ -0,0 +1,85 @@
+"""
+SQLite-backed leader lease.
+
+Several processes may open the same database (`uvicorn --workers N`, extra
+`app.worker` processes). A named lease in leader_leases picks exactly one
+of them: the holder renews it well before lease_until, and anyone may take
+it over once it has expired, so leadership fails over within
+settings.leader_lease_seconds of the holder dying.
+
+The lease needs a connection of its own (PipelineHost opens one). On the
+shared writer connection, a renewal would wait behind writer_lock and the
+WriteQueue, i.e. behind whatever long transaction the pipeline is running,
+and the lease could expire while its holder is still working. On its own
+connection it only waits for SQLite's write lock, for at most
+settings.db_busy_timeout_ms.
+"""
+import logging
+import os
+import socket
+import time
+import uuid
+
+import aiosqlite
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    def __init__(self, db: aiosqlite.Connection, name: str):
+        # Used only by this lease: it commits without writer_lock
+        self.db = db
+        self.name = name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Local deadline, so a holder that can't reach the database steps
+        # down before anyone else can have taken over
+        self._expires_at = 0.0
+
+    async def try_acquire(self) -> bool:
+        """Take or renew the lease; True while this process holds it.
+
+        A lease with more than half its term left isn't renewed yet, so
+        polling often doesn't mean committing often.
+        """
+        started = time.monotonic()
+        if started < self._expires_at - settings.leader_lease_seconds / 2:
+            return True
+        try:
+            cursor = await self.db.execute(
+                """INSERT INTO leader_leases (name, holder, lease_until, acquired_at)
+                   VALUES (?, ?, datetime('now', ?), datetime('now'))
+                   ON CONFLICT(name) DO UPDATE SET
+                       holder = excluded.holder,
+                       lease_until = excluded.lease_until,
+                       acquired_at = CASE WHEN leader_leases.holder = excluded.holder
+                                          THEN leader_leases.acquired_at
+                                          ELSE excluded.acquired_at END
+                   WHERE leader_leases.holder = excluded.holder
+                      OR leader_leases.lease_until < datetime('now')""",
+                (self.name, self.holder, f"+{settings.leader_lease_seconds} seconds"),
+            )
+            await self.db.commit()
+        except Exception as e:
+            logger.error(f"Lease {self.name}: renewal failed: {e}")
+            return self.held
+
+        if cursor.rowcount > 0:
+            self._expires_at = started + settings.leader_lease_seconds
+        else:
+            self._expires_at = 0.0
+        return self.held
+
+    @property
+    def held(self) -> bool:
+        return time.monotonic() < self._expires_at
+
+    async def release(self):
+        """Give the lease up now instead of letting it expire."""
+        self._expires_at = 0.0
+        await self.db.execute(
+            "DELETE FROM leader_leases WHERE name = ? AND holder = ?",
+            (self.name, self.holder),
+        )
+        await self.db.commit()
@@ -0,0 +1,213 @@
+"""
+Coordination between the API and the process running the pipeline.
+
+Ingestion, analysis, aggregation and data fetching run in exactly one
+process: whichever holds the "pipeline" leader lease (app.services.leader).
+That is one of the uvicorn workers with APP_ROLE=all, or
+`python -m app.worker` when the API runs with APP_ROLE=api. Processes
+share state only through the database:
+
+- pipeline_jobs: the leader publishes each scheduler job's next run time
+  (shown on the dashboard), and the manual trigger endpoints of any other
+  process set requested_at, which the leader turns into an immediate run.
+- score_dirty_dates: signal writes already mark stale score days through
+  triggers, so the leader refreshes scores whenever rows appear there.
+- Dashboard caches see the leader's commits through dashboard_generation.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import aiosqlite
+
+from app.config import settings
+from app.database import get_db
+from app.services.leader import LeaderLease
+from app.services.write_queue import writer_lock
+
+logger = logging.getLogger(__name__)
+
+
+def runs_pipeline(app) -> bool:
+    """True when this process currently runs pipeline jobs itself."""
+    return getattr(app.state, "scheduler", None) is not None
+
+
+async def request_jobs(db: aiosqlite.Connection, job_ids: list[str]):
+    """Ask the pipeline leader to run these scheduler jobs as soon as it polls."""
+    async with writer_lock(db):
+        await db.executemany(
+            """INSERT INTO pipeline_jobs (job_id, requested_at, updated_at)
+               VALUES (?, datetime('now'), datetime('now'))
+               ON CONFLICT(job_id) DO UPDATE SET
+                   requested_at = excluded.requested_at,
+                   updated_at = excluded.updated_at""",
+            [(job_id,) for job_id in job_ids],
+        )
+        await db.commit()
+
+
+async def scheduled_runs(db: aiosqlite.Connection) -> dict[str, str | None]:
+    """Next run time (UTC) of each job, as last published by the leader."""
+    cursor = await db.execute("SELECT job_id, next_run_at FROM pipeline_jobs")
+    return {r["job_id"]: r["next_run_at"] for r in await cursor.fetchall()}
+
+
+class WorkerBridge:
+    """Leader side of the coordination: publishes schedules, takes requests."""
+
+    def __init__(self, db: aiosqlite.Connection, scheduler, score_refresher):
+        self.db = db
+        self.scheduler = scheduler
+        self.score_refresher = score_refresher
+
+    async def sync(self):
+        # APScheduler returns tz-aware datetimes; store UTC like everything else
+        next_runs = {
+            job.id: job.next_run_time.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            if job.next_run_time else None
+            for job in self.scheduler.get_jobs()
+        }
+        cursor = await self.db.execute(
+            "SELECT job_id, next_run_at, requested_at FROM pipeline_jobs"
+        )
+        published = {r["job_id"]: r for r in await cursor.fetchall()}
+        changed = [
+            (job_id, next_run)
+            for job_id, next_run in next_runs.items()
+            if job_id not in published or published[job_id]["next_run_at"] != next_run
+        ]
+
+        # Most polls find nothing to do; those don't write at all
+        requested = []
+        if changed or any(r["requested_at"] for r in published.values()):
+            async with writer_lock(self.db):
+                await self.db.executemany(
+                    """INSERT INTO pipeline_jobs (job_id, next_run_at, updated_at)
+                       VALUES (?, ?, datetime('now'))
+                       ON CONFLICT(job_id) DO UPDATE SET
+                           next_run_at = excluded.next_run_at,
+                           updated_at = excluded.updated_at""",
+                    changed,
+                )
+                cursor = await self.db.execute(
+                    """UPDATE pipeline_jobs SET requested_at = NULL
+                       WHERE requested_at IS NOT NULL
+                       RETURNING job_id"""
+                )
+                requested = [r["job_id"] for r in await cursor.fetchall()]
+                await self.db.commit()
+
+        for job_id in requested:
+            if self.scheduler.get_job(job_id) is None:
+                logger.warning(f"Ignoring request for unknown job {job_id}")
+                continue
+            logger.info(f"Running {job_id} on request")
+            self.scheduler.modify_job(job_id, next_run_time=datetime.now(timezone.utc))
+
+        cursor = await self.db.execute("SELECT EXISTS(SELECT 1 FROM score_dirty_dates)")
+        if (await cursor.fetchone())[0] and not self.score_refresher.pending:
+            self.score_refresher.request()
+
+
+class PipelineHost:
+    """Runs the scheduler and score refresher while this process is leader.
+
+    `state` (app.state in the API) gets .scheduler and .score_refresher
+    while leading, and None otherwise.
+    """
+
+    def __init__(self, db: aiosqlite.Connection, state=None, startup_delay: float = 5.0):
+        self.db = db
+        self.state = state
+        self.startup_delay = startup_delay
+        self.lease: LeaderLease | None = None
+        self.scheduler = None
+        self.score_refresher = None
+        self.analysis_stream = None
+        self._startup_task: asyncio.Task | None = None
+        self._publish()
+
+    async def run(self, stop: asyncio.Event):
+        """Acquire/renew leadership and sync every settings.worker_poll_seconds."""
+        # Renewals get their own connection, so they never queue behind
+        # the pipeline's transactions on the shared writer
+        lease_db = await get_db()
+        self.lease = LeaderLease(lease_db, "pipeline")
+        try:
+            while not stop.is_set():
+                leading = await self.lease.try_acquire()
+                if leading and self.scheduler is None:
+                    try:
+                        self._start()
+                    except Exception as e:
+                        logger.error(f"Scheduler failed to start (will retry): {e}")
+                elif not leading and self.scheduler is not None:
+                    logger.warning("Lost pipeline leadership, stopping scheduler")
+                    await self._stop()
+                if self.scheduler is not None:
+                    try:
+                        await WorkerBridge(self.db, self.scheduler, self.score_refresher).sync()
+                    except Exception as e:
+                        logger.error(f"Worker sync error: {e}")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.worker_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self.scheduler is not None:
+                await self._stop()
+                try:
+                    await self.lease.release()
+                except Exception as e:
+                    logger.error(f"Releasing pipeline lease failed: {e}")
+            await lease_db.close()
+
+    def _start(self):
+        from app.services.analysis_stream import AnalysisStream
+        from app.services.scheduler import create_scheduler, run_startup_pipeline
+        from app.services.score_refresh import ScoreRefresher
+
+        score_refresher = ScoreRefresher(self.db)
+        analysis_stream = (
+            AnalysisStream(self.db, score_refresher)
+            if settings.analysis_stream_enabled else None
+        )
+        scheduler = create_scheduler(self.db, score_refresher, analysis_stream)
+        scheduler.start()
+        self.scheduler = scheduler
+        self.score_refresher = score_refresher
+        self.analysis_stream = analysis_stream
+        self._publish()
+        logger.info(f"Pipeline leader ({self.lease.holder}): scheduler started")
+
+        # Bring today's scores (and any stale history) up to date
+        score_refresher.request()
+
+        # Kick off initial ingestion without blocking the server
+        self._startup_task = asyncio.create_task(
+            run_startup_pipeline(
+                self.db,
+                self.score_refresher,
+                delay=self.startup_delay,
+                analysis_stream=self.analysis_stream,
+            )
+        )
+
+    async def _stop(self):
+        if self._startup_task is not None:
+            self._startup_task.cancel()
+            self._startup_task = None
+        self.scheduler.shutdown(wait=False)
+        if self.analysis_stream is not None:
+            await self.analysis_stream.close()
+        await self.score_refresher.close()
+        self.scheduler = None
+        self.score_refresher = None
+        self.analysis_stream = None
+        self._publish()
+
+    def _publish(self):
+        if self.state is not None:
+            self.state.scheduler = self.scheduler
+            self.state.score_refresher = self.score_refresher
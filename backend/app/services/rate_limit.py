@@ -0,0 +1,123 @@
+"""
+Client-side rate limiting for Anthropic API calls.
+
+A token bucket paces request starts across all concurrent analysis tasks.
+Its rate starts from settings.analysis_requests_per_minute and is then
+tuned from the `anthropic-ratelimit-*` headers on every response: the
+bucket adopts the advertised request limit, never holds more tokens than
+the API says remain, and pauses until the reset time when any limit
+(requests or tokens) is exhausted. 429 / 529 responses pause everyone for
+`retry-after` seconds, or an exponential backoff when the header is absent.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Limits reported as anthropic-ratelimit-<kind>-{limit,remaining,reset}
+_LIMIT_KINDS = ("requests", "tokens", "input-tokens", "output-tokens")
+
+# Backoff when a 429/529 carries no retry-after header
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _seconds_until(reset: str | None) -> float | None:
+    """Seconds until an RFC 3339 reset timestamp (None if unparseable)."""
+    if not reset:
+        return None
+    try:
+        when = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60.0  # tokens per second
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """Wait until a request may be sent (FIFO across callers)."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers):
+        """Adopt the limits reported on a successful response."""
+        limit = _parse_int(headers.get("anthropic-ratelimit-requests-limit"))
+        if limit and limit != self.capacity:
+            self._refill(time.monotonic())
+            self.capacity = float(limit)
+            self.rate = self.capacity / 60.0
+
+        remaining = _parse_int(headers.get("anthropic-ratelimit-requests-remaining"))
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+
+        for kind in _LIMIT_KINDS:
+            left = _parse_int(headers.get(f"anthropic-ratelimit-{kind}-remaining"))
+            if left == 0:
+                delay = _seconds_until(headers.get(f"anthropic-ratelimit-{kind}-reset"))
+                if delay:
+                    logger.info(f"Anthropic {kind} limit exhausted, pausing {delay:.1f}s")
+                    self._pause(delay)
+
+    def back_off(self, headers, attempt: int) -> float:
+        """Pause all callers after a 429/529; returns the delay applied."""
+        retry_after = None
+        try:
+            retry_after = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+        if retry_after is None:
+            backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+            retry_after = backoff * random.uniform(0.5, 1.0)
+        self.tokens = 0.0
+        self._pause(retry_after)
+        return retry_after
+
+
+_limiter: RateLimiter | None = None
+
+
+def get_anthropic_limiter() -> RateLimiter:
+    """Process-wide limiter, so back-to-back analysis runs share one budget."""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(settings.analysis_requests_per_minute)
+    return _limiter
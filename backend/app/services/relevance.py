@@ -0,0 +1,206 @@
+"""
+Local relevance pre-filter, run before articles are sent to Claude.
+
+Each thesis is represented by its curated keyword phrases and a TF-IDF
+vector of its name, description and keywords. An article scores the best,
+over all theses, of:
+
+    1.0 if any keyword phrase appears in its title/content, plus
+    the cosine similarity of its TF-IDF vector with the thesis vector.
+
+IDF weights come from recent article titles, so words every headline
+shares ("AI", "says") count for little. Articles scoring below
+settings.relevance_filter_threshold are marked 'filtered' without an API
+call. The fitted model is kept per writer connection (get_relevance_filter)
+and refitted every settings.relevance_refit_seconds or when the theses
+change. report() replays the filter over already-analyzed articles to show
+what a threshold would have dropped, and how much of that Claude had
+found relevant.
+"""
+import json
+import logging
+import math
+import re
+import time
+from collections import Counter
+
+import aiosqlite
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "this", "to",
+    "was", "will", "with",
+}
+
+# Recent titles used to estimate IDF
+CORPUS_SIZE = 5000
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens without stopwords, with plurals folded."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        # Crude plural folding: "layoffs" matches "layoff"
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class RelevanceFilter:
+    def __init__(self, db: aiosqlite.Connection):
+        self.db = db
+        self._phrases: dict[str, list[str]] = {}
+        self._vectors: dict[str, dict[str, float]] = {}
+        self._idf: dict[str, float] = {}
+        self._default_idf = 1.0
+        self._theses: list[tuple] | None = None
+        self._fitted_at = 0.0
+
+    async def _load_theses(self) -> list[tuple]:
+        cursor = await self.db.execute(
+            "SELECT id, name, description, keywords FROM theses ORDER BY id"
+        )
+        return [tuple(t) for t in await cursor.fetchall()]
+
+    async def prepare(self):
+        """Load theses and fit IDF weights on recent article titles."""
+        theses = await self._load_theses()
+        cursor = await self.db.execute(
+            "SELECT title FROM articles ORDER BY id DESC LIMIT ?", (CORPUS_SIZE,)
+        )
+        corpus = [r["title"] or "" for r in await cursor.fetchall()]
+
+        thesis_docs = {}
+        for thesis_id, name, description, keywords in theses:
+            keywords = json.loads(keywords or "[]")
+            self._phrases[thesis_id] = [
+                " " + " ".join(tokenize(k)) + " " for k in keywords if tokenize(k)
+            ]
+            thesis_docs[thesis_id] = " ".join([name, description, *keywords])
+
+        documents = [set(tokenize(doc)) for doc in [*thesis_docs.values(), *corpus]]
+        df = Counter(term for doc in documents for term in doc)
+        n = len(documents)
+        self._idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self._default_idf = math.log(1 + n) + 1
+        self._vectors = {tid: self._vector(doc) for tid, doc in thesis_docs.items()}
+        self._theses = theses
+        self._fitted_at = time.monotonic()
+
+    async def refresh(self):
+        """prepare() again if the fit is stale or the theses have changed."""
+        stale = time.monotonic() - self._fitted_at >= settings.relevance_refit_seconds
+        if self._theses is None or stale or await self._load_theses() != self._theses:
+            await self.prepare()
+
+    def _vector(self, text: str) -> dict[str, float]:
+        counts = Counter(tokenize(text))
+        vector = {
+            term: count * self._idf.get(term, self._default_idf)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {term: w / norm for term, w in vector.items()} if norm else {}
+
+    def score(self, article) -> float:
+        text = f"{article['title'] or ''} {(article['content'] or '')[:4000]}"
+        padded = " " + " ".join(tokenize(text)) + " "
+        vector = self._vector(text)
+
+        best = 0.0
+        for tid, thesis_vector in self._vectors.items():
+            keyword_hit = any(p in padded for p in self._phrases.get(tid, []))
+            cosine = sum(w * thesis_vector.get(term, 0.0) for term, w in vector.items())
+            best = max(best, (1.0 if keyword_hit else 0.0) + cosine)
+        return best
+
+    async def apply(self, articles: list) -> tuple[list, int]:
+        """Mark low-scoring articles 'filtered' and drop their leases (doesn't commit).
+
+        Returns (kept, filtered count).
+        """
+        threshold = settings.relevance_filter_threshold
+        kept, filtered = [], []
+        for article in articles:
+            (kept if self.score(article) >= threshold else filtered).append(article)
+        if filtered:
+            await self.db.executemany(
+                """UPDATE articles
+                   SET analysis_status = 'filtered', claimed_by = NULL, lease_until = NULL
+                   WHERE id = ?""",
+                [(a["id"],) for a in filtered],
+            )
+            logger.info(f"Relevance filter: {len(filtered)}/{len(articles)} articles filtered")
+        return kept, len(filtered)
+
+    async def report(self, thresholds: list[float]) -> dict:
+        """What each threshold would have filtered among analyzed and pending articles.
+
+        Claude's output is the label: an analyzed article is relevant if it
+        produced at least one signal.
+        """
+        cursor = await self.db.execute(
+            """SELECT a.id, a.title, a.content,
+                      EXISTS (SELECT 1 FROM signals s WHERE s.article_id = a.id) AS relevant
+               FROM articles a WHERE a.analysis_status = 'analyzed'"""
+        )
+        labeled = [(self.score(r), bool(r["relevant"])) for r in await cursor.fetchall()]
+        cursor = await self.db.execute(
+            "SELECT id, title, content FROM articles WHERE analysis_status = 'pending'"
+        )
+        pending = [self.score(r) for r in await cursor.fetchall()]
+
+        total_relevant = sum(1 for _, relevant in labeled if relevant)
+        total_irrelevant = len(labeled) - total_relevant
+        rows = []
+        for threshold in sorted(thresholds):
+            dropped = [relevant for score, relevant in labeled if score < threshold]
+            relevant_lost = sum(dropped)
+            irrelevant_caught = len(dropped) - relevant_lost
+            rows.append({
+                "threshold": threshold,
+                "analyzed_filtered": len(dropped),
+                "relevant_lost": relevant_lost,
+                # Share of Claude-relevant articles still sent for analysis
+                "recall": (
+                    round(1 - relevant_lost / total_relevant, 4) if total_relevant else None
+                ),
+                # Share of filtered articles Claude also found irrelevant
+                "precision": (
+                    round(irrelevant_caught / len(dropped), 4) if dropped else None
+                ),
+                # Share of irrelevant articles the filter would have saved a call on
+                "irrelevant_filtered": (
+                    round(irrelevant_caught / total_irrelevant, 4) if total_irrelevant else None
+                ),
+                "pending_filtered": sum(1 for score in pending if score < threshold),
+            })
+
+        return {
+            "enabled": settings.relevance_filter_enabled,
+            "current_threshold": settings.relevance_filter_threshold,
+            "analyzed_articles": len(labeled),
+            "analyzed_relevant": total_relevant,
+            "pending_articles": len(pending),
+            "thresholds": rows,
+        }
+
+
+_filters: dict[int, RelevanceFilter] = {}
+
+
+async def get_relevance_filter(db: aiosqlite.Connection) -> RelevanceFilter:
+    """The fitted RelevanceFilter for this connection, refitted when stale."""
+    relevance = _filters.get(id(db))
+    if relevance is None or relevance.db is not db:
+        relevance = _filters[id(db)] = RelevanceFilter(db)
+    await relevance.refresh()
+    return relevance
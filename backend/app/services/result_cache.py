@@ -0,0 +1,90 @@
+"""
+Content-addressed cache of LLM analysis results.
+
+The same story reaches us through several Google News queries with
+different redirect URLs, so each copy is a distinct article. Results are
+keyed by a hash of the prompt version plus the normalized title and content
+(headline-only articles key on the title alone, with the " - Outlet"
+suffix stripped). A duplicate reuses the cached ArticleAnalysisResult, and
+its signals are stored against the new article instead of calling Claude.
+Entries expire after settings.analysis_cache_ttl_days, and the least
+recently used are evicted beyond settings.analysis_cache_max_entries.
+"""
+import hashlib
+
+import aiosqlite
+
+from app.config import settings
+from app.models import ArticleAnalysisResult
+from app.prompts.signal_extraction import is_headline_only
+from app.services.signal_keys import normalize_quote, normalize_title
+
+
+class AnalysisResultCache:
+    def __init__(self, db: aiosqlite.Connection):
+        self.db = db
+
+    @staticmethod
+    def key_for(article: dict, version: str) -> str:
+        title = normalize_title(article.get("title") or "")
+        content = "" if is_headline_only(article) else normalize_quote(article.get("content") or "")
+        return hashlib.sha256(f"{version}\n{title}\n{content}".encode()).hexdigest()
+
+    async def get_many(self, keys) -> dict[str, ArticleAnalysisResult]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        cursor = await self.db.execute(
+            f"""SELECT cache_key, result_json FROM analysis_cache
+                WHERE cache_key IN ({placeholders})
+                  AND created_at >= datetime('now', ?)""",
+            (*keys, f"-{settings.analysis_cache_ttl_days} days"),
+        )
+        return {
+            r["cache_key"]: ArticleAnalysisResult.model_validate_json(r["result_json"])
+            for r in await cursor.fetchall()
+        }
+
+    async def put(self, key: str, article_id: int, result: ArticleAnalysisResult):
+        """Store a fresh result (doesn't commit)."""
+        await self.db.execute(
+            """INSERT OR REPLACE INTO analysis_cache
+                   (cache_key, article_id, result_json, created_at, last_used_at, hit_count)
+               VALUES (?, ?, ?, datetime('now'), datetime('now'), 0)""",
+            (key, article_id, result.model_dump_json()),
+        )
+
+    async def record_hit(self, key: str):
+        """Count a reuse and refresh its LRU position (doesn't commit)."""
+        await self.db.execute(
+            """UPDATE analysis_cache
+               SET hit_count = hit_count + 1, last_used_at = datetime('now')
+               WHERE cache_key = ?""",
+            (key,),
+        )
+
+    async def evict(self) -> int:
+        """Drop expired entries, then the least recently used beyond the cap."""
+        expired = await self.db.execute(
+            "DELETE FROM analysis_cache WHERE created_at < datetime('now', ?)",
+            (f"-{settings.analysis_cache_ttl_days} days",),
+        )
+        overflow = await self.db.execute(
+            """DELETE FROM analysis_cache WHERE cache_key IN (
+                   SELECT cache_key FROM analysis_cache
+                   ORDER BY last_used_at DESC
+                   LIMIT -1 OFFSET ?
+               )""",
+            (settings.analysis_cache_max_entries,),
+        )
+        await self.db.commit()
+        return expired.rowcount + overflow.rowcount
+
+    async def stats(self) -> dict:
+        """Lifetime numbers: entries held and total reuses."""
+        cursor = await self.db.execute(
+            "SELECT COUNT(*) as entries, COALESCE(SUM(hit_count), 0) as hits FROM analysis_cache"
+        )
+        row = await cursor.fetchone()
+        return {"entries": row["entries"], "hits": row["hits"]}
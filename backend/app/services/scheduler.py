@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -11,13 +12,17 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 
-def create_scheduler(db) -> AsyncIOScheduler:
+def create_scheduler(db, score_refresher=None, analysis_stream=None) -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler()
 
+    def request_score_refresh():
+        if score_refresher is not None:
+            score_refresher.request()
+
     async def run_ingestion():
         try:
-            svc = IngestionService(db)
-            stats = await svc.run_full_ingestion()
+            svc = IngestionService(db, analysis_stream)
+            stats = await svc.run_full_ingestion(due_only=True)
             logger.info(f"Ingestion complete: {stats}")
         except Exception as e:
             logger.error(f"Ingestion error: {e}")
@@ -25,28 +30,37 @@ def create_scheduler(db) -> AsyncIOScheduler:
     async def run_analysis():
         try:
             svc = AnalysisService(db)
+            # Resume/ingest any Message Batches submitted by backfill runs
+            batch_stats = await svc.poll_batches()
+            if batch_stats["batches"]:
+                logger.info(f"Analysis batches ingested: {batch_stats}")
             stats = await svc.analyze_pending(batch_size=50)
             logger.info(f"Analysis complete: {stats}")
         except Exception as e:
             logger.error(f"Analysis error: {e}")
+        request_score_refresh()
 
     async def run_aggregation():
         try:
             svc = AggregationService(db)
+            dirty_stats = await svc.recompute_dirty_scores()
             await svc.compute_daily_scores()
-            logger.info("Aggregation complete")
+            logger.info(f"Aggregation complete: {dirty_stats}")
         except Exception as e:
             logger.error(f"Aggregation error: {e}")
 
     scheduler.add_job(
         run_ingestion,
         "interval",
-        hours=settings.ingestion_interval_hours,
+        # Each source has its own next poll time; this only checks for due ones
+        minutes=settings.ingestion_min_interval_minutes,
         id="ingestion",
     )
     scheduler.add_job(
         run_analysis,
         "interval",
+        # Catch-up sweep; new articles are analyzed as they arrive when
+        # an analysis_stream is given
         minutes=settings.analysis_interval_minutes,
         id="analysis",
     )
@@ -73,6 +87,7 @@ def create_scheduler(db) -> AsyncIOScheduler:
             logger.info(f"Data signal generation complete: {ds_stats}")
         except Exception as e:
             logger.error(f"Data signal generation error: {e}")
+        request_score_refresh()
 
     scheduler.add_job(
         run_data_series,
@@ -82,3 +97,31 @@ def create_scheduler(db) -> AsyncIOScheduler:
     )
 
     return scheduler
+
+
+async def run_startup_pipeline(
+    db, score_refresher=None, delay: float = 5.0, analysis_stream=None
+):
+    """Initial ingestion and data signals, run in the background at startup."""
+    await asyncio.sleep(delay)  # Let the server fully start first
+    try:
+        logger.info("Running initial article ingestion (background)...")
+        ingestion_svc = IngestionService(db, analysis_stream)
+        stats = await ingestion_svc.run_full_ingestion(due_only=True)
+        logger.info(f"Initial ingestion complete: {stats}")
+    except Exception as e:
+        logger.error(f"Initial ingestion failed (will retry on schedule): {e}")
+
+    # Generate data signals from existing data points
+    try:
+        from app.services.data_signals import DataSignalGenerator
+
+        logger.info("Generating data signals (background)...")
+        generator = DataSignalGenerator(db)
+        ds_stats = await generator.generate_all()
+        logger.info(f"Data signal generation complete: {ds_stats}")
+    except Exception as e:
+        logger.error(f"Data signal generation failed (will retry on schedule): {e}")
+
+    if score_refresher is not None:
+        score_refresher.request()
@@ -0,0 +1,259 @@
+"""
+Running decayed-sum state for each thesis's composite score.
+
+The 30-day score is sum(strength * confidence * sign * exp(-0.05 * d)) over
+sum(confidence * exp(-0.05 * d)). Both sums can be carried forward day to
+day: multiply by exp(-0.05) per elapsed day, add the signals that enter the
+window and subtract the ones that fall out of it. The state is persisted in
+score_accumulators so rolling to a new day only reads the signals that
+changed rather than the whole 30-day window.
+
+Deletes and edits of signals already folded into the state can't be undone
+incrementally; they show up as score_dirty_dates marks and force a rebuild.
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+
+import aiosqlite
+
+from app.services.aggregation import (
+    DECAY_RATE,
+    WINDOW_DAYS,
+    AggregationService,
+    composite_from_sums,
+    is_rounding_tie,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _contribution(sig, as_of: datetime) -> tuple[float, float]:
+    """(weighted_sum, weight_total) contribution of one signal as of a day."""
+    sig_date = datetime.strptime(sig["signal_date"][:10], "%Y-%m-%d")
+    days_ago = max((as_of - sig_date).days, 0)
+    weight = sig["confidence"] * math.exp(-DECAY_RATE * days_ago)
+    direction_sign = 1.0 if sig["direction"] == "supporting" else -1.0
+    return sig["strength"] * weight * direction_sign, weight
+
+
+class ScoreAccumulator:
+    def __init__(self, db: aiosqlite.Connection):
+        self.db = db
+
+    async def roll_forward(
+        self, thesis_id: str, as_of_date: str, verify: bool = False
+    ) -> dict:
+        """Advance a thesis's state to as_of_date and return its score.
+
+        Returns the same dict shape as AggregationService._compute_score.
+        With verify=True the result is cross-checked against the full
+        window query; a mismatch is logged and the state is rebuilt from
+        scratch.
+        """
+        target = datetime.strptime(as_of_date, "%Y-%m-%d")
+        state = await self._load(thesis_id)
+
+        if state is None or not await self._advance(state, thesis_id, target):
+            state = await self._rebuild(thesis_id, target)
+        await self._save(thesis_id, state)
+
+        result = await self._result(thesis_id, as_of_date, state)
+        if verify:
+            expected = await AggregationService(self.db)._compute_score(
+                thesis_id, as_of_date
+            )
+            if expected != result:
+                logger.warning(
+                    f"Score accumulator drift for {thesis_id} on {as_of_date}: "
+                    f"accumulated={result} expected={expected}"
+                )
+                state = await self._rebuild(thesis_id, target)
+                await self._save(thesis_id, state)
+                result = expected
+        return result
+
+    async def _result(self, thesis_id: str, as_of_date: str, state: dict) -> dict:
+        signal_count = state["supporting_count"] + state["weakening_count"]
+        if signal_count == 0:
+            return AggregationService._score_signals([], as_of_date)
+        if is_rounding_tie(state["weighted_sum"], state["weight_total"]):
+            return await AggregationService(self.db)._compute_score(
+                thesis_id, as_of_date
+            )
+        return {
+            "composite_score": composite_from_sums(
+                state["weighted_sum"], state["weight_total"]
+            ),
+            "signal_count": signal_count,
+            "supporting_count": state["supporting_count"],
+            "weakening_count": state["weakening_count"],
+        }
+
+    async def _snapshot(self) -> tuple[int, int]:
+        """Current (max signal id, max dirty-mark id), read in one statement."""
+        cursor = await self.db.execute(
+            """SELECT (SELECT COALESCE(MAX(id), 0) FROM signals) as max_signal_id,
+                      (SELECT COALESCE(MAX(id), 0) FROM score_dirty_dates) as dirty_watermark"""
+        )
+        row = await cursor.fetchone()
+        return row["max_signal_id"], row["dirty_watermark"]
+
+    async def _rebuild(self, thesis_id: str, target: datetime) -> dict:
+        """Recompute the state for `target` from the full 30-day window."""
+        max_signal_id, dirty_watermark = await self._snapshot()
+        as_of_date = target.strftime("%Y-%m-%d")
+        cutoff = (target - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+
+        cursor = await self.db.execute(
+            """SELECT direction, strength, confidence, signal_date
+               FROM signals
+               WHERE thesis_id = ? AND signal_date >= ? AND signal_date <= ?
+                 AND id <= ?
+               ORDER BY signal_date, id""",
+            (thesis_id, cutoff, as_of_date, max_signal_id),
+        )
+        state = {
+            "as_of_date": target,
+            "weighted_sum": 0.0,
+            "weight_total": 0.0,
+            "supporting_count": 0,
+            "weakening_count": 0,
+            "max_signal_id": max_signal_id,
+            "dirty_watermark": dirty_watermark,
+        }
+        self._apply(state, await cursor.fetchall(), target, sign=1)
+        return state
+
+    async def _advance(self, state: dict, thesis_id: str, target: datetime) -> bool:
+        """Roll `state` forward to `target` in place.
+
+        Returns False when the state can't be advanced incrementally (the
+        target is in the past, more than a full window has elapsed, or
+        signals inside the accumulated window were deleted or edited).
+        """
+        as_of = state["as_of_date"]
+        if target < as_of or (target - as_of).days > WINDOW_DAYS:
+            return False
+
+        max_signal_id, dirty_watermark = await self._snapshot()
+        as_of_date = as_of.strftime("%Y-%m-%d")
+        cutoff = (as_of - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+
+        # 1) Changes since the last roll that land inside the current window.
+        #    Every insert leaves exactly one mark; if the marks aren't all
+        #    accounted for by new rows, something was deleted or edited.
+        cursor = await self.db.execute(
+            """SELECT COUNT(*) as cnt FROM score_dirty_dates
+               WHERE id > ? AND id <= ? AND thesis_id = ?
+                 AND signal_date >= ? AND signal_date <= ?""",
+            (state["dirty_watermark"], dirty_watermark, thesis_id, cutoff, as_of_date),
+        )
+        mark_count = (await cursor.fetchone())["cnt"]
+        if mark_count:
+            cursor = await self.db.execute(
+                """SELECT direction, strength, confidence, signal_date
+                   FROM signals
+                   WHERE thesis_id = ? AND id > ? AND id <= ?
+                     AND substr(signal_date, 1, 10) >= ?
+                     AND substr(signal_date, 1, 10) <= ?""",
+                (thesis_id, state["max_signal_id"], max_signal_id, cutoff, as_of_date),
+            )
+            inserted = await cursor.fetchall()
+            if len(inserted) != mark_count:
+                return False
+            self._apply(
+                state,
+                [s for s in inserted if cutoff <= s["signal_date"] <= as_of_date],
+                as_of,
+                sign=1,
+            )
+
+        # 2) Decay by the elapsed days, then add entering / drop leaving signals
+        elapsed = (target - as_of).days
+        if elapsed:
+            factor = math.exp(-DECAY_RATE * elapsed)
+            state["weighted_sum"] *= factor
+            state["weight_total"] *= factor
+
+            target_date = target.strftime("%Y-%m-%d")
+            new_cutoff = (target - timedelta(days=WINDOW_DAYS)).strftime("%Y-%m-%d")
+            cursor = await self.db.execute(
+                """SELECT direction, strength, confidence, signal_date
+                   FROM signals
+                   WHERE thesis_id = ? AND signal_date > ? AND signal_date <= ?
+                     AND id <= ?""",
+                (thesis_id, as_of_date, target_date, max_signal_id),
+            )
+            self._apply(state, await cursor.fetchall(), target, sign=1)
+
+            cursor = await self.db.execute(
+                """SELECT direction, strength, confidence, signal_date
+                   FROM signals
+                   WHERE thesis_id = ? AND signal_date >= ? AND signal_date < ?
+                     AND id <= ?""",
+                (thesis_id, cutoff, new_cutoff, max_signal_id),
+            )
+            self._apply(state, await cursor.fetchall(), target, sign=-1)
+
+        state["as_of_date"] = target
+        state["max_signal_id"] = max_signal_id
+        state["dirty_watermark"] = dirty_watermark
+        return True
+
+    @staticmethod
+    def _apply(state: dict, signals, as_of: datetime, sign: int):
+        for sig in signals:
+            weighted, weight = _contribution(sig, as_of)
+            state["weighted_sum"] += sign * weighted
+            state["weight_total"] += sign * weight
+            if sig["direction"] == "supporting":
+                state["supporting_count"] += sign
+            else:
+                state["weakening_count"] += sign
+        if state["supporting_count"] + state["weakening_count"] == 0:
+            # Empty window: drop accumulated rounding noise
+            state["weighted_sum"] = 0.0
+            state["weight_total"] = 0.0
+
+    async def _load(self, thesis_id: str) -> dict | None:
+        cursor = await self.db.execute(
+            """SELECT as_of_date, weighted_sum, weight_total, supporting_count,
+                      weakening_count, max_signal_id, dirty_watermark
+               FROM score_accumulators WHERE thesis_id = ?""",
+            (thesis_id,),
+        )
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        state = dict(row)
+        state["as_of_date"] = datetime.strptime(row["as_of_date"], "%Y-%m-%d")
+        return state
+
+    async def _save(self, thesis_id: str, state: dict):
+        await self.db.execute(
+            """INSERT INTO score_accumulators
+                   (thesis_id, as_of_date, weighted_sum, weight_total,
+                    supporting_count, weakening_count, max_signal_id,
+                    dirty_watermark)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(thesis_id) DO UPDATE SET
+                   as_of_date = excluded.as_of_date,
+                   weighted_sum = excluded.weighted_sum,
+                   weight_total = excluded.weight_total,
+                   supporting_count = excluded.supporting_count,
+                   weakening_count = excluded.weakening_count,
+                   max_signal_id = excluded.max_signal_id,
+                   dirty_watermark = excluded.dirty_watermark,
+                   updated_at = datetime('now')""",
+            (
+                thesis_id,
+                state["as_of_date"].strftime("%Y-%m-%d"),
+                state["weighted_sum"],
+                state["weight_total"],
+                state["supporting_count"],
+                state["weakening_count"],
+                state["max_signal_id"],
+                state["dirty_watermark"],
+            ),
+        )
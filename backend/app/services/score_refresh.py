@@ -0,0 +1,70 @@
+"""
+Write-driven, debounced recomputation of daily scores.
+
+Anything that writes signals (analysis, data signal generation, manual
+signals) calls request() afterwards. Requests arriving within the debounce
+window are coalesced into a single aggregation pass, so read endpoints
+never have to compute scores themselves.
+"""
+import asyncio
+import logging
+import aiosqlite
+
+from app.config import settings
+from app.services.aggregation import AggregationService
+from app.services.dashboard_cache import bump_generation
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreRefresher:
+    def __init__(self, db: aiosqlite.Connection, delay: float | None = None):
+        self.db = db
+        self.delay = (
+            settings.score_refresh_debounce_seconds if delay is None else delay
+        )
+        self._requested = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> bool:
+        """True while a requested refresh hasn't finished yet."""
+        return self._task is not None and not self._task.done()
+
+    def request(self):
+        """Schedule a score refresh (non-blocking, coalesced)."""
+        self._requested = True
+        # scores_refresh_pending is part of the cached dashboard payload
+        bump_generation()
+        if not self.pending:
+            self._task = asyncio.create_task(self._run())
+
+    async def refresh_now(self) -> dict:
+        """Recompute dirty historical ranges and today's scores immediately."""
+        agg = AggregationService(self.db)
+        stats = await agg.recompute_dirty_scores()
+        await agg.compute_daily_scores()
+        return stats
+
+    async def _run(self):
+        # Requests made while sleeping or computing are folded into the
+        # next loop iteration instead of spawning another task.
+        while self._requested:
+            await asyncio.sleep(self.delay)
+            self._requested = False
+            try:
+                stats = await self.refresh_now()
+                logger.info(f"Score refresh complete: {stats}")
+            except Exception as e:
+                logger.error(f"Score refresh error: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+
+
+def request_score_refresh(app):
+    """Ask the app's ScoreRefresher (if it started) to recompute scores."""
+    refresher = getattr(app.state, "score_refresher", None)
+    if refresher is not None:
+        refresher.request()
@@ -0,0 +1,74 @@
+"""
+Dedup keys for signals, computed once at insert time.
+
+The dashboard shows at most one signal per article and per piece of
+evidence. Articles are matched by normalized source_title (the same story
+arrives from several feeds with different " - Outlet" suffixes) and
+evidence by normalized evidence_quote. Both are stored as short hashes in
+signals.title_key / signals.quote_key so the read path can dedupe in SQL.
+An empty string means there was nothing to normalize; NULL means the key
+hasn't been computed yet.
+"""
+import hashlib
+import re
+
+import aiosqlite
+
+
+def normalize_quote(quote: str) -> str:
+    """Normalize a quote for fuzzy dedup: lowercase, strip punctuation/hyphens, collapse whitespace."""
+    if not quote:
+        return ""
+    q = quote.lower()
+    q = re.sub(r"[^a-z0-9\s]", " ", q)  # strip non-alphanumeric
+    q = re.sub(r"\s+", " ", q).strip()
+    return q
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for dedup: strip trailing source attribution
+    (e.g. ' - Fortune', ' - AOL.com', ' | WSJ'), lowercase, strip punctuation."""
+    if not title:
+        return ""
+    # Strip trailing " - Source Name" or " | Source Name"
+    t = re.sub(r"\s*[\-–—|]\s*[A-Za-z][A-Za-z0-9 .,'&]+$", "", title)
+    t = t.lower()
+    t = re.sub(r"[^a-z0-9\s]", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+
+def _key(normalized: str) -> str:
+    if not normalized:
+        return ""
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+def title_key(title: str | None) -> str:
+    return _key(normalize_title(title or ""))
+
+
+def quote_key(quote: str | None) -> str:
+    return _key(normalize_quote(quote or ""))
+
+
+async def backfill_signal_keys(db: aiosqlite.Connection) -> int:
+    """Compute title_key/quote_key for rows inserted before the columns existed.
+
+    Doesn't commit (runs inside init_database's transaction).
+    """
+    cursor = await db.execute(
+        """SELECT id, source_title, evidence_quote FROM signals
+           WHERE title_key IS NULL OR quote_key IS NULL"""
+    )
+    rows = await cursor.fetchall()
+    if not rows:
+        return 0
+    await db.executemany(
+        "UPDATE signals SET title_key = ?, quote_key = ? WHERE id = ?",
+        [
+            (title_key(r["source_title"]), quote_key(r["evidence_quote"]), r["id"])
+            for r in rows
+        ],
+    )
+    return len(rows)
@@ -0,0 +1,187 @@
+"""
+Group commit for small writes on the shared writer connection.
+
+Every commit is a WAL fsync. Paths that write a row or two at a time (the
+tracking pixel, each analyzed article, each data series) hand their
+statements to the connection's WriteQueue instead of committing on their
+own. A background task applies whatever has queued up within
+settings.write_queue_max_delay_ms, or as soon as
+settings.write_queue_max_batch writes are waiting, in a single
+transaction.
+
+Callers choose the guarantee they need:
+
+- execute()/executemany()/transaction() return once the group holding the
+  write has committed (a durability acknowledgement), with the statement's
+  lastrowid and rowcount;
+- wait=False only enqueues. Failures are logged. Writes are applied in
+  order, so a later acknowledged write implies the earlier ones were
+  applied too.
+
+transaction(fn) runs `await fn()`, which may issue several statements on
+the writer connection, inside a savepoint, so a unit that fails is rolled
+back alone and the rest of the group still commits.
+
+Code writing on the same connection outside the queue must hold
+writer_lock(db) from its first write until it commits; otherwise its
+commit lands in the middle of a group (committing half of it) and the
+group's savepoints no longer exist when it tries to release them. Don't
+wait on the queue while holding the lock: the group can't flush until
+the lock is free.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import aiosqlite
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WriteResult:
+    lastrowid: int | None
+    rowcount: int
+
+
+class WriteQueue:
+    def __init__(self, db: aiosqlite.Connection):
+        self.db = db
+        self.max_delay = settings.write_queue_max_delay_ms / 1000
+        self.max_batch = settings.write_queue_max_batch
+        self._pending: list[tuple[Callable[[], Awaitable[Any]], bool, asyncio.Future | None]] = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        # Serializes write transactions on this connection (see writer_lock)
+        self.lock = asyncio.Lock()
+        self.writes = 0
+        self.commits = 0
+
+    async def execute(self, sql: str, params=(), wait: bool = True) -> WriteResult | None:
+        async def unit():
+            cursor = await self.db.execute(sql, params)
+            return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+        return await self._submit(unit, savepoint=False, wait=wait)
+
+    async def executemany(self, sql: str, rows, wait: bool = True) -> WriteResult | None:
+        rows = list(rows)
+
+        async def unit():
+            cursor = await self.db.executemany(sql, rows)
+            return WriteResult(None, cursor.rowcount)
+
+        return await self._submit(unit, savepoint=False, wait=wait)
+
+    async def transaction(self, fn: Callable[[], Awaitable[Any]], wait: bool = True):
+        """Run fn's statements atomically in the next group; returns fn's result."""
+        return await self._submit(fn, savepoint=True, wait=wait)
+
+    async def _submit(self, fn, savepoint: bool, wait: bool):
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._pending.append((fn, savepoint, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if future is not None:
+            return await future
+        return None
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Give other writers a moment to join this group
+            if len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            if self._pending:
+                self._wakeup.set()
+            if batch:
+                await self._flush(batch)
+            if self._closing and not self._pending:
+                return
+
+    async def _flush(self, batch):
+        outcomes = []
+        async with self.lock:
+            try:
+                if not self.db.in_transaction:
+                    await self.db.execute("BEGIN")
+                for fn, savepoint, future in batch:
+                    if savepoint:
+                        await self.db.execute("SAVEPOINT write_unit")
+                    try:
+                        value = await fn()
+                    except Exception as e:
+                        if savepoint:
+                            await self.db.execute("ROLLBACK TO write_unit")
+                            await self.db.execute("RELEASE write_unit")
+                        outcomes.append((future, None, e))
+                        continue
+                    if savepoint:
+                        await self.db.execute("RELEASE write_unit")
+                    outcomes.append((future, value, None))
+                await self.db.commit()
+            except Exception as e:
+                # Nothing in this group is durable
+                logger.error(f"Write group of {len(batch)} failed: {e}")
+                try:
+                    await self.db.rollback()
+                except Exception:
+                    pass
+                outcomes = [(future, None, e) for _, _, future in batch]
+            else:
+                self.commits += 1
+                self.writes += len(batch)
+
+        for future, value, error in outcomes:
+            if future is None:
+                if error is not None:
+                    logger.error(f"Queued write failed: {error}")
+            elif not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(value)
+
+    async def close(self):
+        """Commit anything still queued and stop the background task."""
+        self._closing = True
+        if self._task is not None and not self._task.done():
+            self._full.set()
+            self._wakeup.set()
+            await self._task
+
+
+_queues: dict[int, WriteQueue] = {}
+
+
+def get_write_queue(db: aiosqlite.Connection) -> WriteQueue:
+    """The WriteQueue for this connection (one per writer connection)."""
+    queue = _queues.get(id(db))
+    if queue is None or queue.db is not db:
+        queue = _queues[id(db)] = WriteQueue(db)
+    return queue
+
+
+def writer_lock(db: aiosqlite.Connection) -> asyncio.Lock:
+    """Lock to hold while writing on this connection outside its WriteQueue."""
+    return get_write_queue(db).lock
+
+
+async def close_write_queue(db: aiosqlite.Connection):
+    queue = _queues.pop(id(db), None)
+    if queue is not None:
+        await queue.close()
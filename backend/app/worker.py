@@ -0,0 +1,53 @@
+"""
+Pipeline worker: runs the scheduled jobs (ingestion, analysis, aggregation,
+data series) in their own process, so they never compete with API requests
+for the web server's event loop or database connection.
+
+Run it next to an API started with APP_ROLE=api, from the backend directory:
+
+    python -m app.worker
+
+Both processes open the same SQLite file and coordinate through it (see
+app.services.pipeline).
+"""
+import asyncio
+import logging
+import signal
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    from app.database import get_db, prepare_database
+    from app.services.pipeline import PipelineHost
+
+    db = await get_db()
+    await prepare_database(db)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+
+    # Several workers may run; the pipeline leader lease picks one to
+    # schedule jobs and the rest stand by to take over
+    logger.info("Pipeline worker started")
+    try:
+        await PipelineHost(db, startup_delay=0).run(stop)
+    finally:
+        from app.services.write_queue import close_write_queue
+
+        await close_write_queue(db)
+        await db.close()
+        logger.info("Pipeline worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
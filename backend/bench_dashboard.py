@@ -0,0 +1,148 @@
+"""
+Benchmark: /api/dashboard build latency while an ingestion is writing.
+
+Works on a copy of the database. A background writer replays the ingestion
+write pattern (per article: dedupe SELECT, INSERT, cluster assignment;
+one commit per source), while dashboard clients rebuild the payload
+uncached, first on the shared writer connection (the old setup) and then
+on read-pool connections.
+
+Usage (from backend/):
+    python bench_dashboard.py                       # copy of settings.db_path
+    python bench_dashboard.py --db data/signals.db --clients 4 --seconds 20
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--db", help="database to copy (default: settings.db_path)")
+parser.add_argument("--clients", type=int, default=4, help="concurrent dashboard clients")
+parser.add_argument("--seconds", type=float, default=15.0, help="duration of each run")
+parser.add_argument("--articles-per-source", type=int, default=100)
+parser.add_argument(
+    "--write-rate", type=float, default=500.0,
+    help="articles/second the writer aims for, so both runs do the same writes",
+)
+args = parser.parse_args()
+
+# Point the app at a scratch copy before settings are loaded
+_tmp = Path(tempfile.mkdtemp(prefix="bench_dashboard_"))
+if args.db:
+    _source = Path(args.db).resolve()
+else:
+    from app.config import settings as _settings
+
+    _source = _settings.db_path
+if not _source.exists():
+    sys.exit(f"No database at {_source}")
+shutil.copy2(_source, _tmp / "bench.db")
+os.environ["DATABASE_PATH"] = str(_tmp / "bench.db")
+
+from app.config import settings  # noqa: E402
+
+settings.database_path = str(_tmp / "bench.db")
+
+from app.database import ReadPool, get_db, init_database  # noqa: E402
+from app.routers.dashboard import _build_dashboard  # noqa: E402
+from app.services.clustering import ArticleClusterer  # noqa: E402
+
+# Enough of a Request for _build_dashboard: no scheduler, no refresher
+_request = SimpleNamespace(
+    app=SimpleNamespace(state=SimpleNamespace(scheduler=None, score_refresher=None))
+)
+
+
+async def ingest_forever(db, stop: asyncio.Event) -> int:
+    """Write synthetic articles like IngestionService.run_full_ingestion."""
+    clusterer = ArticleClusterer(db)
+    written = 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        for _ in range(args.articles_per_source):
+            ext_id = f"bench-{time.time_ns()}"
+            cursor = await db.execute("SELECT id FROM articles WHERE external_id = ?", (ext_id,))
+            await cursor.fetchone()
+            cursor = await db.execute(
+                """INSERT INTO articles
+                       (source_id, external_id, title, url, content, analysis_status)
+                   VALUES (NULL, ?, ?, ?, ?, 'pending')""",
+                (
+                    ext_id,
+                    f"Benchmark headline {written} about AI layoffs and datacenter capex",
+                    f"https://example.com/{ext_id}",
+                    "Benchmark summary text " * 20,
+                ),
+            )
+            await clusterer.assign(cursor.lastrowid, f"Benchmark headline {written}", "")
+            written += 1
+        await db.commit()
+        # Hold the write rate steady (sleeping 0 still yields to clients)
+        ahead = written / args.write_rate - (time.perf_counter() - started)
+        await asyncio.sleep(max(ahead, 0))
+    return written
+
+
+async def dashboard_client(get_connection, latencies: list, stop: asyncio.Event):
+    while not stop.is_set():
+        async with get_connection() as db:
+            started = time.perf_counter()
+            await _build_dashboard(_request, db, 270)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run(label: str, writer, get_connection, with_ingestion: bool):
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    ingestion = asyncio.create_task(ingest_forever(writer, stop)) if with_ingestion else None
+    clients = [
+        asyncio.create_task(dashboard_client(get_connection, latencies, stop))
+        for _ in range(args.clients)
+    ]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*clients)
+    written = await ingestion if ingestion else 0
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(
+        f"{label:<36} builds={len(latencies):>5}  "
+        f"p50={statistics.median(latencies):7.1f}ms  p95={p95:7.1f}ms  "
+        f"max={latencies[-1]:7.1f}ms  articles written={written}"
+    )
+
+
+async def main():
+    writer = await get_db()
+    await init_database(writer)
+    pool = ReadPool(max(settings.db_read_pool_size, args.clients))
+    await pool.open()
+
+    class _Shared:
+        async def __aenter__(self):
+            return writer
+
+        async def __aexit__(self, *exc):
+            return False
+
+    print(f"Database copy: {settings.db_path}  clients={args.clients}  seconds={args.seconds}")
+    await run("idle, shared writer connection", writer, _Shared, with_ingestion=False)
+    await run("idle, read pool", writer, pool.acquire, with_ingestion=False)
+    await run("ingesting, shared writer connection", writer, _Shared, with_ingestion=True)
+    await run("ingesting, read pool", writer, pool.acquire, with_ingestion=True)
+
+    await pool.close()
+    await writer.close()
+    shutil.rmtree(_tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
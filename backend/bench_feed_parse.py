@@ -0,0 +1,80 @@
+"""
+Benchmark: event-loop stalls while a large feed is parsed.
+
+A ticker task sleeps 1ms at a time and records how late each wakeup is,
+which is what a dashboard request arriving mid-parse would wait. The same
+synthetic feed (HTML summaries, like Google News) is parsed inline on the
+event loop, as _fetch_rss used to, and through parse_feed_offloaded.
+
+Usage (from backend/):
+    python bench_feed_parse.py
+    python bench_feed_parse.py --items 5000 --feeds 4
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.ingestion import parse_feed, parse_feed_offloaded
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--items", type=int, default=2000, help="entries per feed")
+parser.add_argument("--feeds", type=int, default=3, help="feeds parsed concurrently")
+args = parser.parse_args()
+
+
+def synthetic_feed(items: int) -> str:
+    entries = "".join(
+        f"""<item>
+  <title>AI layoffs hit company {i} as automation spreads - Outlet {i % 50}</title>
+  <link>https://news.example.com/articles/{i}</link>
+  <pubDate>Mon, 06 Oct 2025 {i % 24:02d}:{i % 60:02d}:00 GMT</pubDate>
+  <description>&lt;a href="https://news.example.com/articles/{i}"&gt;Company {i}
+  cuts &amp;amp; restructures&lt;/a&gt;&amp;nbsp;&lt;font color="#6f6f6f"&gt;Outlet
+  {i % 50}&lt;/font&gt; {"datacenter capex credit spreads widen " * 5}</description>
+</item>"""
+        for i in range(items)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Synthetic</title>{entries}</channel></rss>"""
+
+
+async def measure(label: str, parse):
+    lateness: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lateness.append((time.perf_counter() - started - 0.001) * 1000)
+
+    text = synthetic_feed(args.items)
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    await asyncio.gather(*(parse(text) for _ in range(args.feeds)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick
+
+    lateness.sort()
+    p99 = lateness[int(len(lateness) * 0.99) - 1]
+    print(
+        f"{label:<10} parse={elapsed:6.2f}s  loop stall: max={lateness[-1]:8.1f}ms  "
+        f"p99={p99:6.1f}ms  over 50ms={sum(v > 50 for v in lateness)}"
+    )
+
+
+async def inline(text: str):
+    return parse_feed(text)
+
+
+async def main():
+    print(f"{args.feeds} feeds x {args.items} entries")
+    await parse_feed_offloaded(synthetic_feed(1))  # start the worker processes
+    await measure("inline", inline)
+    await measure("offloaded", parse_feed_offloaded)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
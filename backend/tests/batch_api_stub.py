@@ -0,0 +1,131 @@
+"""
+Local stand-in for the Message Batches endpoints, for AnalysisService's
+batch mode (point settings.anthropic_base_url at BatchApiStub.url).
+
+Serves create, retrieve and results for batches held in memory. A batch
+stays in_progress until the test calls end(batch_id, outcomes), where
+outcomes maps custom_id to a result: the text of a succeeded message, or
+"errored" / "expired" / "canceled". custom_ids left out of outcomes get
+no result line at all.
+"""
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BATCHES_PATH = "/v1/messages/batches"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BatchApiStub:
+    def __init__(self):
+        self.batches: dict[str, dict] = {}
+        self.requests: dict[str, list[dict]] = {}
+        self._outcomes: dict[str, dict[str, str]] = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def end(self, batch_id: str, outcomes: dict[str, str]):
+        """Finish a batch; its results become available."""
+        self._outcomes[batch_id] = outcomes
+        batch = self.batches[batch_id]
+        batch["processing_status"] = "ended"
+        batch["ended_at"] = _now()
+        batch["results_url"] = f"{self.url}{BATCHES_PATH}/{batch_id}/results"
+
+    def _results(self, batch_id: str) -> list[dict]:
+        lines = []
+        for custom_id, outcome in self._outcomes[batch_id].items():
+            if outcome in ("errored", "expired", "canceled"):
+                result = {"type": outcome}
+                if outcome == "errored":
+                    result["error"] = {
+                        "type": "error",
+                        "error": {"type": "invalid_request_error", "message": "bad request"},
+                    }
+            else:
+                result = {
+                    "type": "succeeded",
+                    "message": {
+                        "id": f"msg_{custom_id}",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": "claude-haiku-4-5-20251001",
+                        "content": [{"type": "text", "text": outcome}],
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": 100, "output_tokens": 20},
+                    },
+                }
+            lines.append({"custom_id": custom_id, "result": result})
+        return lines
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path != BATCHES_PATH:
+                    return self._send(404, b"{}")
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                batch_id = f"msgbatch_{len(stub.batches) + 1:04d}"
+                stub.requests[batch_id] = body["requests"]
+                stub.batches[batch_id] = {
+                    "id": batch_id,
+                    "type": "message_batch",
+                    "processing_status": "in_progress",
+                    "request_counts": {
+                        "processing": len(body["requests"]),
+                        "succeeded": 0,
+                        "errored": 0,
+                        "canceled": 0,
+                        "expired": 0,
+                    },
+                    "created_at": _now(),
+                    "expires_at": _now(),
+                    "ended_at": None,
+                    "archived_at": None,
+                    "cancel_initiated_at": None,
+                    "results_url": None,
+                }
+                self._send(200, json.dumps(stub.batches[batch_id]).encode())
+
+            def do_GET(self):
+                parts = self.path.split("?")[0][len(BATCHES_PATH) + 1 :].split("/")
+                batch = stub.batches.get(parts[0])
+                if not self.path.startswith(BATCHES_PATH + "/") or batch is None:
+                    return self._send(404, b"{}")
+                if len(parts) == 1:
+                    return self._send(200, json.dumps(batch).encode())
+                if parts[1] == "results" and batch["processing_status"] == "ended":
+                    body = "".join(json.dumps(line) + "\n" for line in stub._results(parts[0]))
+                    return self._send(200, body.encode(), "application/binary")
+                self._send(404, b"{}")
+
+        return Handler
@@ -0,0 +1,60 @@
+"""
+Shared setup for tests that need a real (temporary) SQLite database.
+
+Tests written as ``async def`` run in their own event loop (see
+pytest_pyfunc_call below). Asking for the ``db`` fixture gives them a
+writer connection to a fresh, migrated database with seeded theses; it
+and its WriteQueue are closed when the test ends. Tests that need more
+than one connection to the same file (e.g. to simulate a restart) open
+them with temp_db.
+"""
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+import pytest
+
+from app.database import init_database, seed_theses
+from app.services.write_queue import close_write_queue
+
+
+@asynccontextmanager
+async def temp_db(tmp_path: Path):
+    """A writer connection to tmp_path/signals.db, migrated and seeded."""
+    db = await aiosqlite.connect(str(tmp_path / "signals.db"))
+    try:
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA foreign_keys=ON")
+        await init_database(db)
+        await seed_theses(db)
+        await db.commit()
+        yield db
+    finally:
+        await close_write_queue(db)
+        await db.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Only the directory is known here: the connection has to be opened in
+    # the test's own event loop, which pytest_pyfunc_call does
+    return tmp_path
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+
+    async def run():
+        if "db" not in kwargs:
+            return await pyfuncitem.obj(**kwargs)
+        async with temp_db(kwargs["db"]) as db:
+            return await pyfuncitem.obj(**{**kwargs, "db": db})
+
+    asyncio.run(run())
+    return True
@@ -0,0 +1,105 @@
+import random
+from datetime import datetime, timedelta
+
+from app.services.aggregation import AggregationService
+from app.services.signal_keys import quote_key, title_key
+
+THESES = ("ai_job_displacement", "ai_deflation")
+
+
+def _day(start: datetime, offset: int) -> str:
+    return (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def random_signals(rng: random.Random, start: datetime, days: int, count: int) -> list[tuple]:
+    """Signal rows (thesis_id, direction, strength, confidence, signal_date)."""
+    rows = []
+    for _ in range(count):
+        signal_date = _day(start, rng.randrange(days))
+        if rng.random() < 0.1:
+            # Some dates carry a time, which sorts after the bare date
+            signal_date += " 12:00:00"
+        rows.append(
+            (
+                rng.choice(THESES),
+                rng.choice(("supporting", "weakening")),
+                rng.randint(1, 10),
+                round(rng.uniform(0.1, 1.0), 3),
+                signal_date,
+            )
+        )
+    return rows
+
+
+async def insert_signals(db, rows: list[tuple]):
+    await db.executemany(
+        """INSERT INTO signals
+               (thesis_id, direction, strength, confidence, evidence_quote,
+                reasoning, signal_date, title_key, quote_key)
+           VALUES (?, ?, ?, ?, 'quote', 'reasoning', ?, ?, ?)""",
+        [(*row, title_key(None), quote_key("quote")) for row in rows],
+    )
+    await db.commit()
+
+
+async def test_score_history_matches_scalar_score(db):
+    start = datetime(2026, 1, 1)
+    agg = AggregationService(db)
+    mismatches = []
+    for seed in range(5):
+        await db.execute("DELETE FROM signals")
+        await insert_signals(db, random_signals(random.Random(seed), start, 90, 150))
+        for thesis_id in THESES:
+            history = await agg._compute_score_history(
+                thesis_id, _day(start, 20), _day(start, 100)
+            )
+            assert [d for d, _ in history] == [_day(start, i) for i in range(20, 101)]
+            for score_date, result in history:
+                expected = await agg._compute_score(thesis_id, score_date)
+                if result != expected:
+                    mismatches.append((seed, thesis_id, score_date, result, expected))
+    assert mismatches == []
+
+
+async def _stored_vs_scalar(agg, db, start: datetime, days: int) -> list:
+    cursor = await db.execute(
+        "SELECT thesis_id, score_date, composite_score, signal_count FROM daily_scores"
+    )
+    stored = {
+        (r["thesis_id"], r["score_date"]): (r["composite_score"], r["signal_count"])
+        for r in await cursor.fetchall()
+    }
+    wrong = []
+    for thesis_id in THESES:
+        for offset in range(days):
+            score_date = _day(start, offset)
+            expected = await agg._compute_score(thesis_id, score_date)
+            got = stored.get((thesis_id, score_date))
+            if got != (expected["composite_score"], expected["signal_count"]):
+                wrong.append((thesis_id, score_date, got, expected))
+    return wrong
+
+
+async def test_recompute_dirty_scores_after_inserts_and_deletes(db):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=80)
+    agg = AggregationService(db)
+    rng = random.Random(7)
+    await insert_signals(db, [(THESES[0], "supporting", 5, 0.5, _day(start, 0))])
+    await insert_signals(db, random_signals(rng, start, 81, 120))
+    await agg.backfill_daily_scores()
+
+    # Backdated inserts, deletes and an edit, all in the past
+    await insert_signals(db, random_signals(rng, start + timedelta(days=10), 40, 15))
+    await db.execute(
+        "DELETE FROM signals WHERE id IN (SELECT id FROM signals ORDER BY id LIMIT 20 OFFSET 5)"
+    )
+    await db.execute("UPDATE signals SET strength = 10 WHERE id = 100")
+    await db.commit()
+    assert await _stored_vs_scalar(agg, db, start, 81) != []
+
+    stats = await agg.recompute_dirty_scores()
+    assert stats["ranges"] > 0
+    assert await _stored_vs_scalar(agg, db, start, 81) == []
+    cursor = await db.execute("SELECT COUNT(*) FROM score_dirty_dates")
+    assert (await cursor.fetchone())[0] == 0
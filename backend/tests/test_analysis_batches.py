@@ -0,0 +1,96 @@
+import json
+
+from app.config import settings
+from app.services.analysis import AnalysisService
+from tests.batch_api_stub import BatchApiStub
+from tests.conftest import temp_db
+
+RESULT = json.dumps(
+    {
+        "signals": [
+            {
+                "thesis_id": "ai_job_displacement",
+                "is_relevant": True,
+                "direction": "supporting",
+                "strength": 7,
+                "confidence": 0.9,
+                "evidence_quote": "cuts 4,000 jobs",
+                "reasoning": "Layoffs attributed to AI.",
+            }
+        ],
+        "summary": "Layoffs.",
+    }
+)
+
+
+async def _articles(db):
+    cursor = await db.execute(
+        "SELECT id, analysis_status, batch_id, attempts, next_attempt_at FROM articles ORDER BY id"
+    )
+    return {r["id"]: dict(r) for r in await cursor.fetchall()}
+
+
+async def test_batch_submit_poll_resume_and_requeue(tmp_path, monkeypatch):
+    with BatchApiStub() as stub:
+        monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+        monkeypatch.setattr(settings, "anthropic_base_url", stub.url)
+
+        async with temp_db(tmp_path) as db:
+            await db.executemany(
+                """INSERT INTO articles (external_id, title, published_at)
+                   VALUES (?, ?, '2026-03-02 09:00:00')""",
+                [
+                    (f"ext-{i}", f"Acme Corp announces AI restructuring, part {i}")
+                    for i in range(4)
+                ],
+            )
+            await db.commit()
+
+            svc = AnalysisService(db)
+            batch_id = await svc.submit_batch(max_articles=10)
+            # Not finished yet: nothing to ingest
+            still_running = await svc.poll_batches()
+            submitted = await _articles(db)
+
+        assert [r["custom_id"] for r in stub.requests[batch_id]] == [
+            f"article-{i}" for i in submitted
+        ]
+        assert still_running["in_progress"] == 1 and still_running["batches"] == 0
+        assert {a["analysis_status"] for a in submitted.values()} == {"batched"}
+        assert {a["batch_id"] for a in submitted.values()} == {batch_id}
+
+        succeeded, errored, expired, missing = sorted(submitted)
+        stub.end(
+            batch_id,
+            {
+                f"article-{succeeded}": RESULT,
+                f"article-{errored}": "errored",
+                f"article-{expired}": "expired",
+            },
+        )
+
+        # A fresh connection and service, as after a process restart
+        async with temp_db(tmp_path) as db:
+            stats = await AnalysisService(db).poll_batches()
+            articles = await _articles(db)
+            cursor = await db.execute("SELECT article_id, strength FROM signals")
+            signals = [tuple(r) for r in await cursor.fetchall()]
+            cursor = await db.execute("SELECT status FROM analysis_batches")
+            batch_status = (await cursor.fetchone())["status"]
+
+    assert stats["batches"] == 1
+    assert (stats["analyzed"], stats["errors"], stats["requeued"]) == (1, 1, 2)
+    assert stats["input_tokens"] == 100
+    assert batch_status == "ended"
+    assert signals == [(succeeded, 7)]
+
+    assert articles[succeeded]["analysis_status"] == "analyzed"
+    # An errored request is a failed attempt: retried after backoff
+    assert articles[errored]["analysis_status"] == "pending"
+    assert articles[errored]["attempts"] == 1
+    assert articles[errored]["next_attempt_at"] is not None
+    # Expired or missing requests were never processed: requeued as-is
+    for article_id in (expired, missing):
+        assert articles[article_id]["analysis_status"] == "pending"
+        assert articles[article_id]["attempts"] == 0
+        assert articles[article_id]["next_attempt_at"] is None
@@ -0,0 +1,48 @@
+from app.services.analysis import AnalysisService
+from app.services.clustering import ArticleClusterer
+
+TITLE = "Acme Corp cuts 4,000 jobs as AI agents take over customer support"
+
+
+async def _insert(db, external_id, title, status="pending", cluster_id=None):
+    cursor = await db.execute(
+        """INSERT INTO articles (external_id, title, content, analysis_status, cluster_id)
+           VALUES (?, ?, '', ?, ?)""",
+        (external_id, title, status, cluster_id),
+    )
+    return cursor.lastrowid
+
+
+async def _statuses(db):
+    cursor = await db.execute("SELECT id, analysis_status, cluster_id FROM articles ORDER BY id")
+    return [tuple(r) for r in await cursor.fetchall()]
+
+
+async def test_dead_representative_hands_cluster_to_oldest_member(db):
+    rep = await _insert(db, "a", TITLE, "dead")
+    await db.execute("UPDATE articles SET cluster_id = id WHERE id = ?", (rep,))
+    first = await _insert(db, "b", TITLE + " - Reuters", "clustered", rep)
+    second = await _insert(db, "c", TITLE + " - AP", "clustered", rep)
+    await db.commit()
+
+    assert await AnalysisService(db)._derive_cluster_members() == 0
+    assert await _statuses(db) == [
+        (rep, "dead", first),
+        (first, "pending", first),
+        (second, "clustered", first),
+    ]
+
+
+async def test_new_articles_do_not_join_a_dead_representative(db):
+    clusterer = ArticleClusterer(db)
+    rep = await _insert(db, "a", TITLE)
+    await clusterer.assign(rep, TITLE, "")
+    live_copy = await _insert(db, "b", TITLE)
+    assert await clusterer.assign(live_copy, TITLE, "") == rep
+
+    # Neither the dead article nor its clustered copy is a match now
+    await db.execute("UPDATE articles SET analysis_status = 'dead' WHERE id = ?", (rep,))
+    late_copy = await _insert(db, "c", TITLE)
+    assert await clusterer.assign(late_copy, TITLE, "") == late_copy
+    await db.commit()
+    assert (await _statuses(db))[-1] == (late_copy, "pending", late_copy)
@@ -0,0 +1,93 @@
+import random
+from datetime import datetime, timedelta
+
+from app.routers.dashboard import _TOP_SIGNALS_SQL
+from app.services.signal_keys import normalize_quote, normalize_title, quote_key, title_key
+
+THESES = ("ai_job_displacement", "ai_deflation", "datacenter_credit_crisis")
+OUTLETS = ("", " - Reuters", " | WSJ", " — AOL.com")
+
+
+def greedy_top_signals(rows) -> list[int]:
+    """The dashboard's original in-Python dedup over the 50 strongest rows."""
+    seen_urls, seen_titles, seen_quotes = set(), set(), set()
+    kept = []
+    for r in rows:
+        if len(kept) >= 10:
+            break
+        url = r["source_url"] or ""
+        norm_title = normalize_title(r["source_title"] or "")
+        norm_quote = normalize_quote(r["evidence_quote"] or "")
+        if url and url in seen_urls:
+            continue
+        if norm_title and norm_title in seen_titles:
+            continue
+        if norm_quote and norm_quote in seen_quotes:
+            continue
+        if url:
+            seen_urls.add(url)
+        if norm_title:
+            seen_titles.add(norm_title)
+        if norm_quote:
+            seen_quotes.add(norm_quote)
+        kept.append(r["id"])
+    return kept
+
+
+def _random_rows(rng: random.Random, today: datetime, count: int) -> list[tuple]:
+    rows = []
+    for _ in range(count):
+        story = rng.randrange(25)
+        title = None if rng.random() < 0.1 else f"Story {story} about AI{rng.choice(OUTLETS)}"
+        url = None if rng.random() < 0.2 else f"https://example.com/{rng.randrange(40)}"
+        quote = rng.choice(("", f"cash flow {story % 8}", f"Cash-flow {story % 8}!"))
+        signal_date = (today - timedelta(days=rng.choice((0, 0, 1, 2)))).strftime("%Y-%m-%d")
+        rows.append(
+            (
+                rng.choice(THESES),
+                rng.randint(1, 10),
+                round(rng.uniform(0.1, 1.0), 6),
+                quote,
+                title,
+                url,
+                signal_date,
+                title_key(title),
+                quote_key(quote),
+            )
+        )
+    return rows
+
+
+async def test_top_signals_sql_matches_greedy_filter(db):
+    today = datetime.utcnow()
+    cutoff = (today - timedelta(hours=24)).strftime("%Y-%m-%d")
+    mismatches = []
+    for seed in range(5):
+        await db.execute("DELETE FROM signals")
+        await db.executemany(
+            """INSERT INTO signals
+                   (thesis_id, direction, strength, confidence, evidence_quote,
+                    reasoning, source_title, source_url, signal_date,
+                    title_key, quote_key)
+               VALUES (?, 'supporting', ?, ?, ?, 'r', ?, ?, ?, ?, ?)""",
+            _random_rows(random.Random(seed), today, 300),
+        )
+        await db.commit()
+
+        cursor = await db.execute(_TOP_SIGNALS_SQL, (cutoff,))
+        from_sql: dict[str, list[int]] = {}
+        for r in await cursor.fetchall():
+            from_sql.setdefault(r["thesis_id"], []).append(r["id"])
+
+        for thesis_id in THESES:
+            cursor = await db.execute(
+                """SELECT id, source_url, source_title, evidence_quote FROM signals
+                   WHERE thesis_id = ? AND signal_date >= ?
+                   ORDER BY strength DESC, confidence DESC
+                   LIMIT 50""",
+                (thesis_id, cutoff),
+            )
+            expected = greedy_top_signals(await cursor.fetchall())
+            if from_sql.get(thesis_id, []) != expected:
+                mismatches.append((seed, thesis_id, from_sql.get(thesis_id), expected))
+    assert mismatches == []
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services.dashboard_cache import dashboard_version_key
+from app.services.leader import LeaderLease
+from app.services.pipeline import WorkerBridge
+from tests.conftest import temp_db
+
+
+class _Scheduler:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def get_jobs(self):
+        return self.jobs
+
+    def get_job(self, job_id):
+        return next((job for job in self.jobs if job.id == job_id), None)
+
+
+async def test_pipeline_bookkeeping_keeps_dashboard_version(db, tmp_path):
+    job = SimpleNamespace(
+        id="ingestion", next_run_time=datetime(2026, 1, 1, tzinfo=timezone.utc)
+    )
+    refresher = SimpleNamespace(pending=True, request=lambda: None)
+    bridge = WorkerBridge(db, _Scheduler([job]), refresher)
+    async with temp_db(tmp_path) as lease_db:
+        lease = LeaderLease(lease_db, "pipeline")
+        standby = LeaderLease(lease_db, "pipeline")
+
+        await lease.try_acquire()
+        await bridge.sync()
+        before = await dashboard_version_key(db)
+        for _ in range(3):
+            await lease.try_acquire()
+            await standby.try_acquire()
+            await bridge.sync()
+        idle = await dashboard_version_key(db)
+    assert idle == before
+
+    # A new schedule is shown on the dashboard (API-only mode)
+    job.next_run_time = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    await bridge.sync()
+    rescheduled = await dashboard_version_key(db)
+    assert rescheduled != idle
+
+    await db.execute(
+        """INSERT INTO signals (thesis_id, direction, strength, confidence,
+                                evidence_quote, reasoning, signal_date)
+           VALUES ('ai_deflation', 'supporting', 5, 0.8, 'q', 'r', '2026-01-01')"""
+    )
+    await db.commit()
+    assert await dashboard_version_key(db) != rescheduled
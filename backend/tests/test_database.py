@@ -0,0 +1,33 @@
+import asyncio
+
+from app.config import settings
+from app.database import SEED_SOURCES, SEED_THESES, get_db, prepare_database
+from app.services.leader import LeaderLease
+from app.services.write_queue import writer_lock
+
+
+async def test_concurrent_startups_prepare_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_path", str(tmp_path / "signals.db"))
+    connections = [await get_db() for _ in range(4)]
+    try:
+        # Every uvicorn worker runs this at the same time
+        await asyncio.gather(*(prepare_database(db) for db in connections))
+        db = connections[0]
+        for table, seeded in (("theses", SEED_THESES), ("sources", SEED_SOURCES)):
+            cursor = await db.execute(f"SELECT COUNT(*) FROM {table}")
+            assert (await cursor.fetchone())[0] == len(seeded)
+    finally:
+        for db in connections:
+            await db.close()
+
+
+async def test_lease_renews_while_the_writer_is_busy(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "database_path", str(tmp_path / "signals.db"))
+    lease_db = await get_db()
+    try:
+        # A long job holding the shared writer doesn't hold up the lease
+        async with writer_lock(db):
+            lease = LeaderLease(lease_db, "pipeline")
+            assert await asyncio.wait_for(lease.try_acquire(), timeout=2)
+    finally:
+        await lease_db.close()
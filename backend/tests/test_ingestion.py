@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import ingestion
+from app.services.clustering import ArticleClusterer
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>AI layoffs spread</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+
+def test_parse_slots_work_across_event_loops(monkeypatch):
+    monkeypatch.setattr(settings, "feed_parse_workers", 1)
+    count = settings.feed_parse_queue_depth + 2
+
+    async def parse_several():
+        # More parses than slots, so some wait on the semaphore
+        return await asyncio.gather(
+            *(ingestion.parse_feed_offloaded(FEED) for _ in range(count))
+        )
+
+    try:
+        for _ in range(2):
+            results = asyncio.run(parse_several())
+            assert [len(r) for r in results] == [1] * count
+    finally:
+        if ingestion._parse_pool is not None:
+            ingestion._parse_pool.shutdown()
+            ingestion._parse_pool = None
+
+
+async def test_store_skips_duplicates_but_not_bad_rows(db):
+    cursor = await db.execute("INSERT INTO sources (name, source_type) VALUES ('Feed', 'rss')")
+    source_id = cursor.lastrowid
+    await db.commit()
+    svc = ingestion.IngestionService(db)
+    clusterer = ArticleClusterer(db)
+    article = {"title": "AI layoffs spread", "url": "https://example.com/1"}
+    new, _ = await svc._store_articles(source_id, [article, article], clusterer)
+    assert new == 1
+    new, _ = await svc._store_articles(source_id, [article], clusterer)
+    assert new == 0
+
+    # A NOT NULL violation fails the store instead of being dropped silently
+    with pytest.raises(Exception, match="NOT NULL"):
+        bad = {"title": None, "url": "https://example.com/2"}
+        await svc._store_articles(source_id, [bad], clusterer)
+    cursor = await db.execute("SELECT COUNT(*) FROM articles")
+    assert (await cursor.fetchone())[0] == 1
@@ -0,0 +1,41 @@
+from app.config import settings
+from app.services.analysis import AnalysisService
+from app.services.relevance import get_relevance_filter
+
+
+async def _insert(db, external_id, title):
+    cursor = await db.execute(
+        "INSERT INTO articles (external_id, title, content) VALUES (?, ?, '')",
+        (external_id, title),
+    )
+    return cursor.lastrowid
+
+
+async def test_filtered_articles_leave_the_queue(db, monkeypatch):
+    monkeypatch.setattr(settings, "relevance_filter_enabled", True)
+    relevant = await _insert(db, "a", "Acme Corp announces AI layoffs across support teams")
+    irrelevant = await _insert(db, "b", "Local bakery wins regional pie contest again")
+    await db.commit()
+
+    articles, skipped, filtered = await AnalysisService(db)._claim_pending(10)
+    assert [a["id"] for a in articles] == [relevant]
+    assert (skipped, filtered) == (0, 1)
+    assert not db.in_transaction
+
+    cursor = await db.execute(
+        "SELECT analysis_status, claimed_by, lease_until FROM articles WHERE id = ?",
+        (irrelevant,),
+    )
+    assert tuple(await cursor.fetchone()) == ("filtered", None, None)
+
+
+async def test_fitted_filter_is_reused_until_theses_change(db):
+    relevance = await get_relevance_filter(db)
+    fitted_at = relevance._fitted_at
+    assert await get_relevance_filter(db) is relevance
+    assert relevance._fitted_at == fitted_at
+
+    await db.execute("UPDATE theses SET description = 'Edited' WHERE id = 'ai_deflation'")
+    await db.commit()
+    await get_relevance_filter(db)
+    assert relevance._fitted_at > fitted_at
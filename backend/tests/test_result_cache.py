@@ -0,0 +1,37 @@
+from app.config import settings
+from app.models import ArticleAnalysisResult
+from app.prompts.signal_extraction import build_system_prompt, prompt_version
+from app.services.analysis import AnalysisService
+from app.services.result_cache import AnalysisResultCache
+
+TITLE = "Acme Corp cuts 4,000 jobs as AI agents take over customer support"
+
+
+async def test_failed_cache_hit_is_backed_off(db, monkeypatch):
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    cursor = await db.execute(
+        "INSERT INTO articles (external_id, title, content) VALUES ('a', ?, '')", (TITLE,)
+    )
+    article_id = cursor.lastrowid
+    svc = AnalysisService(db)
+    version = prompt_version(build_system_prompt(await svc._load_theses()))
+    cache = AnalysisResultCache(db)
+    key = cache.key_for({"title": TITLE, "content": ""}, version)
+    await cache.put(key, article_id, ArticleAnalysisResult(signals=[]))
+    await db.commit()
+
+    async def fail(article, result):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(svc, "_store_signals", fail)
+    stats = await svc.analyze_pending()
+    assert (stats["analyzed"], stats["errors"]) == (0, 1)
+
+    cursor = await db.execute(
+        """SELECT analysis_status, attempts, claimed_by, next_attempt_at
+           FROM articles WHERE id = ?""",
+        (article_id,),
+    )
+    status, attempts, claimed_by, next_attempt_at = await cursor.fetchone()
+    assert (status, attempts, claimed_by) == ("pending", 1, None)
+    assert next_attempt_at is not None
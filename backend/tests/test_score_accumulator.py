@@ -0,0 +1,41 @@
+import random
+from datetime import datetime, timedelta
+
+from app.services.aggregation import AggregationService
+from app.services.score_accumulator import ScoreAccumulator
+from tests.test_aggregation import THESES, insert_signals, random_signals
+
+
+async def test_roll_forward_matches_scalar_score(db):
+    start = datetime(2026, 1, 1)
+    agg = AggregationService(db)
+    mismatches = []
+    for seed in range(3):
+        rng = random.Random(seed)
+        await db.execute("DELETE FROM signals")
+        await db.execute("DELETE FROM score_accumulators")
+        await insert_signals(db, random_signals(rng, start, 40, 60))
+        accumulator = ScoreAccumulator(db)
+
+        day = start + timedelta(days=30)
+        for _ in range(40):
+            # Mostly daily rolls, sometimes a gap (or a gap over a window)
+            day += timedelta(days=rng.choice((0, 1, 1, 1, 2, 5, 31)))
+            # New signals, some backdated into the current window
+            await insert_signals(
+                db, random_signals(rng, day - timedelta(days=35), 36, rng.randint(0, 4))
+            )
+            if rng.random() < 0.15:
+                await db.execute(
+                    "DELETE FROM signals WHERE id = (SELECT MAX(id) FROM signals)"
+                )
+                await db.commit()
+
+            as_of_date = day.strftime("%Y-%m-%d")
+            for thesis_id in THESES:
+                result = await accumulator.roll_forward(thesis_id, as_of_date)
+                expected = await agg._compute_score(thesis_id, as_of_date)
+                if result != expected:
+                    mismatches.append((seed, thesis_id, as_of_date, result, expected))
+            await db.commit()
+    assert mismatches == []
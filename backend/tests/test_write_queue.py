@@ -0,0 +1,68 @@
+import asyncio
+
+from app.services.pipeline import request_jobs
+from app.services.write_queue import get_write_queue
+
+
+async def test_grouped_units_commit_alongside_direct_writers(db):
+    """Direct writes committing mid-group must not split or break a group."""
+    queue = get_write_queue(db)
+    done = asyncio.Event()
+
+    async def unit(i):
+        async def write():
+            await db.execute(
+                "INSERT INTO page_views (visitor_id, path) VALUES (?, '/')",
+                (f"v{i}",),
+            )
+            await asyncio.sleep(0)
+            await db.execute(
+                "UPDATE page_views SET referer = 'r' WHERE visitor_id = ?",
+                (f"v{i}",),
+            )
+            return i
+
+        return await queue.transaction(write)
+
+    async def request():
+        requests = 0
+        while not done.is_set():
+            await request_jobs(db, ["ingestion"])
+            requests += 1
+            await asyncio.sleep(0)
+        return requests
+
+    requester = asyncio.create_task(request())
+    results = await asyncio.gather(
+        *(unit(i) for i in range(400)), return_exceptions=True
+    )
+    done.set()
+    assert results == list(range(400))
+    assert await requester > 0
+
+    cursor = await db.execute(
+        "SELECT COUNT(*), SUM(referer = 'r') FROM page_views"
+    )
+    assert tuple(await cursor.fetchone()) == (400, 400)
+
+
+async def test_failed_unit_rolls_back_alone(db):
+    queue = get_write_queue(db)
+
+    async def good():
+        await db.execute("INSERT INTO page_views (visitor_id, path) VALUES ('ok', '/')")
+
+    async def bad():
+        await db.execute("INSERT INTO page_views (visitor_id, path) VALUES ('bad', '/')")
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(
+        queue.transaction(good),
+        queue.transaction(bad),
+        queue.transaction(good),
+        return_exceptions=True,
+    )
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], RuntimeError)
+    cursor = await db.execute("SELECT visitor_id FROM page_views ORDER BY id")
+    assert [r[0] for r in await cursor.fetchall()] == ["ok", "ok"]
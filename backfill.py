@@ -6,6 +6,7 @@ Usage:
     python backfill.py                   # fetch + analyze
     python backfill.py --fetch-only      # fetch articles only (no analysis)
     python backfill.py --analyze-only    # analyze pending articles only
+    python backfill.py --batch           # analyze via Message Batches (resumable)
 """
 
 import asyncio
@@ -142,9 +143,7 @@ async def fetch_articles(db: aiosqlite.Connection):
                     log.warning(f"    {start_date}: fetch error: {e}")
                     continue
 
-                month_new = 0
-                month_dup = 0
-
+                rows = []
                 for entry in feed.entries:
                     total_fetched += 1
                     title = strip_html(entry.get("title", ""))
@@ -155,18 +154,6 @@ async def fetch_articles(db: aiosqlite.Connection):
 
                     ext_id = compute_external_id(link or title)
 
-                    # Check for duplicates
-                    existing = await (
-                        await db.execute(
-                            "SELECT id FROM articles WHERE external_id = ?",
-                            (ext_id,),
-                        )
-                    ).fetchone()
-                    if existing:
-                        month_dup += 1
-                        total_dup += 1
-                        continue
-
                     # Parse publish date
                     pub_date = None
                     if hasattr(entry, "published"):
@@ -185,11 +172,7 @@ async def fetch_articles(db: aiosqlite.Connection):
                     # Insert with ingested_at = published_at (so it looks historical)
                     ingested_at = pub_date or f"{start_date} 12:00:00"
 
-                    await db.execute(
-                        """INSERT INTO articles
-                               (source_id, external_id, title, url, author,
-                                content, published_at, ingested_at, analysis_status)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')""",
+                    rows.append(
                         (
                             default_source_id,
                             ext_id,
@@ -199,14 +182,27 @@ async def fetch_articles(db: aiosqlite.Connection):
                             content,
                             pub_date,
                             ingested_at,
-                        ),
+                        )
                     )
-                    month_new += 1
-                    query_new += 1
-                    total_new += 1
 
+                # One statement per month; UNIQUE(external_id) skips duplicates,
+                # so rowcount (the summed changes()) is the number inserted
+                cursor = await db.executemany(
+                    """INSERT INTO articles
+                           (source_id, external_id, title, url, author,
+                            content, published_at, ingested_at, analysis_status)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')
+                       ON CONFLICT(external_id) DO NOTHING""",
+                    rows,
+                )
                 await db.commit()
 
+                month_new = cursor.rowcount
+                month_dup = len(rows) - month_new
+                query_new += month_new
+                total_new += month_new
+                total_dup += month_dup
+
                 if month_new > 0 or month_dup > 0:
                     log.info(
                         f"    {start_date[:7]}: {month_new} new, {month_dup} dup"
@@ -223,15 +219,15 @@ async def fetch_articles(db: aiosqlite.Connection):
 
 # ── Phase 2: Analyze ──
 
-async def analyze_articles(db: aiosqlite.Connection):
+async def analyze_articles(db: aiosqlite.Connection, use_batches: bool = False):
     """Run Claude Haiku analysis on all pending articles."""
     log.info("=" * 60)
     log.info("PHASE 2: Analyzing pending articles with Claude Haiku")
     log.info("=" * 60)
 
-    # Check how many pending
+    # Check how many pending (including any left in an unfinished batch)
     cur = await db.execute(
-        "SELECT COUNT(*) as cnt FROM articles WHERE analysis_status = 'pending' AND LENGTH(title) > 10"
+        "SELECT COUNT(*) as cnt FROM articles WHERE analysis_status IN ('pending', 'batched') AND LENGTH(title) > 10"
     )
     pending = (await cur.fetchone())["cnt"]
     log.info(f"Pending articles to analyze: {pending}")
@@ -242,14 +238,22 @@ async def analyze_articles(db: aiosqlite.Connection):
 
     # Import the analysis service (needs app config for API key)
     sys.path.insert(0, "backend")
+    from app.database import init_database
     from app.services.analysis import AnalysisService
 
+    # Bring the schema up to date (batch tracking, dedup key columns)
+    await init_database(db)
     svc = AnalysisService(db)
 
+    if use_batches:
+        await analyze_articles_batched(svc)
+        return
+
     analyzed_total = 0
     errors_total = 0
     batch_num = 0
-    batch_size = 10
+    # Each batch is analyzed concurrently (settings.analysis_concurrency)
+    batch_size = 100
 
     while True:
         batch_num += 1
@@ -263,20 +267,48 @@ async def analyze_articles(db: aiosqlite.Connection):
         log.info(
             f"    Analyzed: {stats['analyzed']}, "
             f"Errors: {stats['errors']}, "
-            f"Skipped: {stats['skipped']} "
+            f"Skipped: {stats['skipped']}, "
+            f"Filtered: {stats['filtered']} "
             f"(total so far: {analyzed_total}/{pending})"
         )
 
-        # Stop if no more pending articles
-        if stats["analyzed"] == 0 and stats["errors"] == 0:
+        # Stop once a run finds nothing to do; a batch can be entirely filtered
+        # or skipped while pending articles remain
+        if not any(stats[key] for key in ("analyzed", "errors", "skipped", "filtered")):
             break
 
-        # Small delay between batches to avoid rate limits
-        await asyncio.sleep(1.0)
-
     log.info(f"\nAnalysis complete: {analyzed_total} analyzed, {errors_total} errors")
 
 
+async def analyze_articles_batched(svc):
+    """Analyze pending articles as Message Batches, resuming unfinished ones."""
+    from app.config import settings
+
+    batch_size = 500
+    totals = {"analyzed": 0, "errors": 0, "requeued": 0}
+
+    while True:
+        # Ingest anything that finished (including batches from a previous run)
+        stats = await svc.poll_batches()
+        for key in totals:
+            totals[key] += stats[key]
+        if stats["batches"]:
+            log.info(f"    Ingested {stats['batches']} batch(es): {stats}")
+
+        if stats["in_progress"] == 0:
+            batch_id = await svc.submit_batch(max_articles=batch_size)
+            if batch_id is None:
+                break
+            log.info(f"\n  Submitted batch {batch_id}")
+
+        await asyncio.sleep(settings.analysis_batch_poll_seconds)
+
+    log.info(
+        f"\nBatch analysis complete: {totals['analyzed']} analyzed, "
+        f"{totals['errors']} errors, {totals['requeued']} requeued"
+    )
+
+
 # ── Phase 3: Regenerate scores ──
 
 async def regenerate_scores(db: aiosqlite.Connection):
@@ -289,8 +321,10 @@ async def regenerate_scores(db: aiosqlite.Connection):
     from app.services.aggregation import AggregationService
 
     svc = AggregationService(db)
+    # Backdated signals invalidate historical scores, not just today's
+    dirty_stats = await svc.recompute_dirty_scores()
     await svc.compute_daily_scores()
-    log.info("Daily scores regenerated")
+    log.info(f"Daily scores regenerated: {dirty_stats}")
 
 
 # ── Main ──
@@ -298,6 +332,7 @@ async def regenerate_scores(db: aiosqlite.Connection):
 async def main():
     fetch_only = "--fetch-only" in sys.argv
     analyze_only = "--analyze-only" in sys.argv
+    use_batches = "--batch" in sys.argv
 
     db = await aiosqlite.connect(DB_PATH)
     db.row_factory = aiosqlite.Row
@@ -311,7 +346,7 @@ async def main():
             new_count = None
 
         if not fetch_only:
-            await analyze_articles(db)
+            await analyze_articles(db, use_batches=use_batches)
             await regenerate_scores(db)
 
         # Summary
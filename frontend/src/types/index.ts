@@ -50,6 +50,8 @@ export interface DashboardResponse {
   total_data_points: number;
   data_points_24h: number;
   prediction_market_series: number;
+  scores_computed_at: string | null;
+  scores_refresh_pending: boolean;
 }
 
 export interface ManualSignalCreate {